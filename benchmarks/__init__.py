@@ -0,0 +1,14 @@
+"""Скрипты измерения производительности бота.
+
+Скрипты запускаются из корня проекта, например: python -m benchmarks.game_cities_move
+
+Modules:
+    game_cities_move: Ход бота в игре Города - запрос к БД и индекс городов в памяти
+    markup_cache: Создание клавиатур и листание календаря с кэшем и без него
+    logging_overhead: Накладные расходы логирования на вызов обработчика
+    startup_profile: Профиль холодного старта - время импорта модулей и подготовки баз данных
+    fake_servers: Локальные имитации Telegram Bot API и API Hotels.com
+    load_test: Нагрузочный тест диалога /lowprice с виртуальными пользователями
+    bestdeal_ranking: Ранжирование отелей bestdeal в NumPy и циклом Python
+    city_geo_index: Поиск ближайших городов по индексу координат и полным перебором
+"""
@@ -0,0 +1,117 @@
+"""Сравнивает скорость ранжирования отелей bestdeal в NumPy и циклом Python.
+
+Сравниваются:
+    python: Парето-фронт циклом по отелям, упорядоченным по цене (каждый отель сравнивается с уже найденным
+            фронтом), взвешенная оценка и сортировка средствами Python
+    numpy: rank_hotels - загрузка показателей в массив, векторное исключение доминируемых отелей и lexsort
+
+Отели генерируются случайно в формате ответа API Hotels.com (properties/v2/list), результаты обоих способов
+сверяются между собой.
+
+Usage:
+    python -m benchmarks.bestdeal_ranking [--hotels 10000] [--results 10] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from config_data.config import (BESTDEAL_DISTANCE_WEIGHT,
+                                BESTDEAL_PRICE_WEIGHT, BESTDEAL_SCORE_WEIGHT)
+from database.api_requests.ranking import (hotel_features, pareto_front,
+                                           rank_hotels)
+from utils.hotel_info import parse_price
+
+
+def make_hotels(count: int) -> List[Dict[str, Any]]:
+    """Создает отели со случайными ценой, расстоянием до центра и оценкой гостей."""
+    hotels = list()
+    for index in range(count):
+        price = random.randint(20, 1500)
+        hotels.append(
+            {
+                "id": str(index),
+                "name": f"Hotel {index}",
+                "price": {"lead": {"formatted": f"${price:,}"}},
+                "destinationInfo": {"distanceFromDestination": {"value": round(random.uniform(0, 25), 1)}},
+                "reviews": {"score": round(random.uniform(5, 10), 1)},
+            }
+        )
+    return hotels
+
+
+def python_rank(hotels: List[Dict[str, Any]], results_size: int) -> List[Dict[str, Any]]:
+    """Ранжирует отели так же, как rank_hotels, без NumPy."""
+    rows = [
+        (
+            parse_price(hotel["price"]["lead"]["formatted"]),
+            hotel["destinationInfo"]["distanceFromDestination"]["value"],
+            hotel["reviews"]["score"],
+            index,
+        )
+        for index, hotel in enumerate(hotels)
+    ]
+    front = set()
+    front_rows: List[tuple] = list()
+    for price, distance, score, index in sorted(rows, key=lambda row: (row[0], row[1], -row[2])):
+        dominated = False
+        for other_price, other_distance, other_score in front_rows:
+            if other_price <= price and other_distance <= distance and other_score >= score and (
+                other_price < price or other_distance < distance or other_score > score
+            ):
+                dominated = True
+                break
+        if not dominated:
+            front.add(index)
+            front_rows.append((price, distance, score))
+
+    lows = [min(row[column] for row in rows) for column in range(3)]
+    spreads = [(max(row[column] for row in rows) - lows[column]) or 1 for column in range(3)]
+
+    def weighted(row: tuple) -> float:
+        return (
+            BESTDEAL_PRICE_WEIGHT * (1 - (row[0] - lows[0]) / spreads[0])
+            + BESTDEAL_DISTANCE_WEIGHT * (1 - (row[1] - lows[1]) / spreads[1])
+            + BESTDEAL_SCORE_WEIGHT * (row[2] - lows[2]) / spreads[2]
+        )
+
+    ranked = sorted(rows, key=lambda row: (row[3] not in front, -weighted(row), row[0]))
+    return [hotels[row[3]] for row in ranked[:results_size]]
+
+
+def measure(name: str, repeat: int, rank: Callable[[], List[Dict[str, Any]]]) -> float:
+    """Выполняет ранжирование repeat раз и выводит лучшее время."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rank()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<8} {best * 1000:>10.1f} ms")
+    return best
+
+
+def main() -> None:
+    """Запускает сравнение на случайных отелях."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotels", type=int, default=10000, help="количество отелей-кандидатов")
+    parser.add_argument("--results", type=int, default=10, help="количество выводимых отелей")
+    parser.add_argument("--repeat", type=int, default=3, help="количество повторов каждого способа")
+    args = parser.parse_args()
+
+    random.seed(1)
+    hotels = make_hotels(args.hotels)
+    front_size = int(pareto_front(hotel_features(hotels)).sum())
+    print(f"{args.hotels} hotels, Pareto front: {front_size}")
+    expected = [hotel["id"] for hotel in python_rank(hotels, args.results)]
+    actual = [hotel["id"] for hotel in rank_hotels(hotels, args.results)]
+    if expected != actual:
+        raise SystemExit(f"Rankings differ: python {expected}, numpy {actual}")
+
+    baseline = measure("python", args.repeat, lambda: python_rank(hotels, args.results))
+    features = measure("features", args.repeat, lambda: hotel_features(hotels))
+    vectorized = measure("numpy", args.repeat, lambda: rank_hotels(hotels, args.results))
+    print(f"speedup: numpy x{baseline / vectorized:.1f}, ranking only x{baseline / (vectorized - features):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Сравнивает скорость поиска ближайших городов игры Города по индексу координат и полным перебором.
+
+Сравниваются:
+    scan: Расстояния до всех городов одной векторной операцией NumPy и выбор ближайших (argpartition)
+    index: GeoIndex - расстояния только до городов из ячеек сетки, покрывающих радиус поиска
+
+Для каждого способа выполняются запросы "limit ближайших городов" и "города в радиусе radius км"
+от случайных городов таблицы cities; результаты обоих способов сверяются между собой.
+
+Usage:
+    python -m benchmarks.city_geo_index [--queries 2000] [--limit 5] [--radius 100]
+"""
+import argparse
+import math
+import random
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from database.game_cities.city_index import CityIndex
+from database.game_cities.geo_index import GeoIndex, haversine_km
+
+
+def scan_nearest(geo: GeoIndex, lat: float, lng: float, limit: int) -> List[Tuple[int, float]]:
+    """Находит limit ближайших городов полным перебором."""
+    distances = haversine_km(math.radians(lat), math.radians(lng), geo.lats, geo.lngs)
+    nearest = np.argpartition(distances, limit)[:limit]
+    nearest = nearest[np.lexsort((nearest, distances[nearest]))]
+    return [(int(number), float(distances[number])) for number in nearest]
+
+
+def scan_within(geo: GeoIndex, lat: float, lng: float, radius: float) -> List[Tuple[int, float]]:
+    """Находит города в радиусе radius км полным перебором."""
+    distances = haversine_km(math.radians(lat), math.radians(lng), geo.lats, geo.lngs)
+    inside = np.flatnonzero(distances <= radius)
+    inside = inside[np.lexsort((inside, distances[inside]))]
+    return [(int(number), float(distances[number])) for number in inside]
+
+
+def measure(name: str, points: List[Tuple[float, float]], query: Callable[[float, float], object]) -> float:
+    """Выполняет запросы от всех точек и выводит среднее время запроса."""
+    started = time.perf_counter()
+    for lat, lng in points:
+        query(lat, lng)
+    per_query = (time.perf_counter() - started) / len(points)
+    print(f"{name:<16} {per_query * 1e6:>10.1f} us/query")
+    return per_query
+
+
+def main() -> None:
+    """Запускает сравнение на городах из game.db."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000, help="количество запросов каждого вида")
+    parser.add_argument("--limit", type=int, default=5, help="количество ближайших городов")
+    parser.add_argument("--radius", type=float, default=100, help="радиус поиска, км")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    city_index = CityIndex.load()
+    geo = city_index.geo
+    print(f"index loaded: {len(geo)} cities in {(time.perf_counter() - started) * 1000:.1f} ms")
+    random.seed(1)
+    points = [city_index.coordinates[random.randrange(len(geo))] for _ in range(args.queries)]
+    for lat, lng in points[:200]:
+        if geo.nearest(lat, lng, args.limit) != scan_nearest(geo, lat, lng, args.limit):
+            raise SystemExit(f"Nearest cities differ at ({lat}, {lng})")
+        if geo.within(lat, lng, args.radius) != scan_within(geo, lat, lng, args.radius):
+            raise SystemExit(f"Cities within {args.radius} km differ at ({lat}, {lng})")
+
+    scan = measure("scan nearest", points, lambda lat, lng: scan_nearest(geo, lat, lng, args.limit))
+    indexed = measure("index nearest", points, lambda lat, lng: geo.nearest(lat, lng, args.limit))
+    scan_radius = measure("scan within", points, lambda lat, lng: scan_within(geo, lat, lng, args.radius))
+    indexed_radius = measure("index within", points, lambda lat, lng: geo.within(lat, lng, args.radius))
+    print(f"speedup: nearest x{scan / indexed:.1f}, within x{scan_radius / indexed_radius:.1f}")
+
+
+if __name__ == "__main__":
+    main()
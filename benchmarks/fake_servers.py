@@ -0,0 +1,211 @@
+"""Локальные HTTP серверы, имитирующие Telegram Bot API и API сайта Hotels.com, для нагрузочных тестов.
+
+Серверы работают в фоновых потоках (по потоку на соединение) и отвечают с заданной задержкой.
+Fake Bot API запоминает последнюю клавиатуру и сообщение бота в каждом чате, чтобы виртуальный пользователь
+мог нажимать кнопки, которые ему показал бот.
+
+Classes:
+    FakeServer: Базовый класс сервера со счетчиком запросов по методам
+    FakeTelegram: Имитация Telegram Bot API (apihelper.API_URL)
+    FakeHotels: Имитация API Hotels.com (HOTELS_API_URL)
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeServer:
+    """Класс FakeServer, описывающий локальный HTTP сервер с JSON ответами.
+
+    Attributes:
+        latency: Задержка ответа, с
+        calls: Количество запросов по методам
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Создает сервер на свободном порту 127.0.0.1."""
+        self.latency = latency
+        self.calls: Dict[str, int] = dict()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                server._handle(self)
+
+            def do_POST(self) -> None:
+                server._handle(self)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Адрес сервера."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeServer":
+        """Запускает сервер в фоновом потоке."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path: str, params: Dict[str, Any]) -> Tuple[str, Any]:
+        """Формирует ответ на запрос.
+
+        :param path: Путь запроса без начального "/"
+        :param params: Параметры строки запроса и JSON тела запроса
+        :return: Кортеж из названия метода (для счетчика) и ответа для сериализации в JSON
+        """
+        raise NotImplementedError
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        """Читает запрос, выдерживает задержку и отправляет JSON ответ."""
+        parts = urlsplit(request.path)
+        params: Dict[str, Any] = dict(parse_qsl(parts.query))
+        length = int(request.headers.get("Content-Length") or 0)
+        if length:
+            body = request.rfile.read(length)
+            if request.headers.get("Content-Type", "").startswith("application/json"):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body.decode()))
+        method, response = self.respond(parts.path.lstrip("/"), params)
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        data = json.dumps(response).encode()
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class FakeTelegram(FakeServer):
+    """Класс FakeTelegram, описывающий имитацию Telegram Bot API.
+
+    Все чаты - личные, id чата совпадает с id пользователя.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Создает сервер."""
+        super().__init__(latency)
+        self._message_id = 0
+        self._markups: Dict[int, Tuple[int, List[str]]] = dict()
+
+    @property
+    def api_url(self) -> str:
+        """Шаблон ссылки на метод Bot API для apihelper.API_URL."""
+        return self.url + "bot{0}/{1}"
+
+    def buttons(self, chat_id: int) -> Tuple[int, List[str]]:
+        """Возвращает id последнего сообщения бота с клавиатурой в чате и callback data его кнопок."""
+        with self._lock:
+            return self._markups.get(chat_id, (0, list()))
+
+    def _message(self, chat_id: int, message_id: Optional[int], text: str) -> Dict[str, Any]:
+        """Формирует сообщение бота (новое, если message_id не указан)."""
+        if message_id is None:
+            with self._lock:
+                self._message_id += 1
+                message_id = self._message_id
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": 1, "is_bot": True, "first_name": "bot"},
+            "text": text,
+        }
+
+    def respond(self, path: str, params: Dict[str, Any]) -> Tuple[str, Any]:
+        """Отвечает на запрос к Bot API и запоминает клавиатуру отправленного или измененного сообщения."""
+        method = path.rsplit("/", 1)[-1]
+        chat_id = int(params.get("chat_id", 0))
+        if method in ("sendMessage", "editMessageText", "sendPhoto"):
+            message_id = int(params["message_id"]) if "message_id" in params else None
+            result: Any = self._message(chat_id, message_id, params.get("text", params.get("caption", "")))
+            if "reply_markup" in params:
+                rows = json.loads(params["reply_markup"]).get("inline_keyboard", list())
+                data = [str(button.get("callback_data", "")) for row in rows for button in row]
+                with self._lock:
+                    self._markups[chat_id] = (result["message_id"], data)
+        elif method == "sendMediaGroup":
+            result = [self._message(chat_id, None, "") for _ in json.loads(params.get("media", "[]"))]
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "bot", "username": "fake_bot"}
+        else:
+            result = True
+        return method, {"ok": True, "result": result}
+
+
+class FakeHotels(FakeServer):
+    """Класс FakeHotels, описывающий имитацию API Hotels.com: каждый город содержит hotels отелей.
+
+    Attributes:
+        hotels: Количество отелей в каждом городе
+    """
+
+    def __init__(self, latency: float = 0.0, hotels: int = 50) -> None:
+        """Создает сервер."""
+        super().__init__(latency)
+        self.hotels = hotels
+
+    @staticmethod
+    def _hotel(region_id: str, index: int, nights: int) -> Dict[str, Any]:
+        """Формирует отель в формате properties/v2/list."""
+        price = 40 + index * 7 % 300
+        return {
+            "id": f"{region_id}{index:04d}",
+            "name": f"Hotel {index}",
+            "price": {
+                "lead": {"formatted": f"${price}", "amount": price},
+                "displayMessages": [{}, {"lineItems": [{"value": f"${price * nights} total"}]}],
+            },
+            "destinationInfo": {"distanceFromDestination": {"value": round(index % 20 * 0.5, 1)}},
+            "reviews": {"score": round(6 + index % 40 / 10, 1)},
+        }
+
+    def respond(self, path: str, params: Dict[str, Any]) -> Tuple[str, Any]:
+        """Отвечает на запрос поиска городов, списка отелей или информации об отеле."""
+        if path.endswith("locations/v3/search"):
+            region_id = str(10000 + sum(map(ord, params.get("q", ""))))
+            return path, {"sr": [{"type": "CITY", "gaiaId": region_id, "regionNames": {"displayName": params["q"]}}]}
+        if path.endswith("properties/v2/list"):
+            check_in, check_out = params["checkInDate"], params["checkOutDate"]
+            nights = max((check_out["day"] - check_in["day"]) % 28, 1)
+            size = min(int(params.get("resultsSize", 10)), self.hotels)
+            properties = [self._hotel(params["destination"]["regionId"], index, nights) for index in range(size)]
+            return path, {
+                "data": {
+                    "propertySearch": {
+                        "properties": properties,
+                        "filterMetadata": {"priceRange": {"max": 1000}},
+                    }
+                }
+            }
+        property_id = params.get("propertyId")
+        images = [{"image": {"url": f"https://example.com/{property_id}/{index}.jpg"}} for index in range(5)]
+        return path, {
+            "data": {
+                "propertyInfo": {
+                    "propertyGallery": {"images": images},
+                    "summary": {"location": {"address": {"addressLine": "1 Main Street"}}},
+                }
+            }
+        }
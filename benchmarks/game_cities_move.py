@@ -0,0 +1,87 @@
+"""Сравнивает скорость выбора города ботом в игре Города.
+
+Сравниваются:
+    query: Прежний запрос ORDER BY RANDOM() с LEFT OUTER JOIN таблиц cities и city2player
+    index: Индекс городов в памяти и загрузка id сыгранных городов игрока из БД
+    memory: Индекс городов в памяти и множество сыгранных городов, уже находящееся в памяти
+
+Измерения выполняются на копии game.db во временном каталоге.
+
+Usage:
+    python -m benchmarks.game_cities_move [--moves 300] [--played 50]
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import peewee
+
+from database.game_cities.city_index import CityIndex
+from database.game_cities.model import City, City2Player, Player, db_game
+
+LETTERS = "АБВГДКЛМНПРСТ"
+
+
+def query_move(player: Player, first_letter: str) -> None:
+    """Выбирает город прежним запросом к БД."""
+    current_city = City2Player.alias()
+    player_cities = current_city.select().where(current_city.player_id == player.id).alias("player_cities")
+    (
+        City.select()
+        .join(player_cities, peewee.JOIN.LEFT_OUTER, on=(City.id == player_cities.c.city_id))
+        .where(City.city.startswith(first_letter))
+        .where(player_cities.c.player_id.is_null(True))
+        .order_by(peewee.fn.Random())
+        .get_or_none()
+    )
+
+
+def measure(name: str, moves: int, move: Callable[[str], None]) -> float:
+    """Выполняет moves ходов и выводит количество ходов в секунду."""
+    started = time.perf_counter()
+    for _ in range(moves):
+        move(random.choice(LETTERS))
+    moves_per_second = moves / (time.perf_counter() - started)
+    print(f"{name:<8} {moves_per_second:>12.1f} moves/s")
+    return moves_per_second
+
+
+def main() -> None:
+    """Запускает сравнение на копии game.db."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=300, help="количество ходов для каждого способа")
+    parser.add_argument("--played", type=int, default=50, help="количество уже сыгранных городов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "game.db"
+        shutil.copy(db_game.database, db_path)
+        db_game.init(str(db_path))
+        db_game.create_tables([Player, City2Player], safe=True)
+        player = Player.create(player_id=-1, nickname="benchmark", max_scores=0)
+        random_cities = City.select(City.id).order_by(peewee.fn.Random()).limit(args.played).tuples()
+        played_ids = [city_id for city_id, in random_cities]
+        City2Player.insert_many([{"city_id": city_id, "player_id": player.id} for city_id in played_ids]).execute()
+
+        started = time.perf_counter()
+        city_index = CityIndex.load()
+        print(f"index loaded: {len(city_index)} names in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        def index_move(first_letter: str) -> None:
+            ids = City2Player.select(City2Player.city_id).where(City2Player.player_id == player.id).tuples()
+            city_index.random_unplayed(first_letter, city_index.new_played(city_id for city_id, in ids))
+
+        played = city_index.new_played(played_ids)
+        baseline = measure("query", args.moves, lambda letter: query_move(player, letter))
+        indexed = measure("index", args.moves, index_move)
+        in_memory = measure("memory", args.moves * 100, lambda letter: city_index.random_unplayed(letter, played))
+        print(f"speedup: index x{indexed / baseline:.1f}, memory x{in_memory / baseline:.1f}")
+        db_game.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""Нагрузочный тест: виртуальные пользователи проходят диалог /lowprice через настоящие обработчики бота.
+
+Обновления Telegram создаются в тесте и передаются в bot.process_new_updates, как при опросе сервера.
+Бот отправляет запросы к локальной имитации Bot API (apihelper.API_URL) и API Hotels.com (HOTELS_API_URL),
+виртуальный пользователь нажимает кнопки, которые ему показал бот: город, дни в календаре, количество отелей.
+
+Шаг диалога - одно обновление; его длительность измеряется от передачи обновления боту до завершения
+обработчика в пуле потоков бота (включая ожидание в очереди пула). Выводятся:
+    - количество диалогов и обновлений в секунду;
+    - процентили длительности шагов;
+    - загрузка пула потоков бота: ожидание в очереди, максимальная длина очереди, доля занятого времени;
+    - количество записей в хранилище состояний и объектов Users;
+    - запросы к Bot API и API Hotels.com.
+
+БД истории запросов - копия во временном каталоге, лимиты запросов к API отключены, логи пишутся
+во временный каталог.
+
+Usage:
+    python -m benchmarks.load_test [--users 1000] [--concurrency 50] [--workers 2]
+        [--bot-latency 0.01] [--api-latency 0.1] [--think 0] [--cities 20]
+"""
+import argparse
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fake_servers import FakeHotels, FakeTelegram
+
+STEPS = (
+    "command",
+    "city",
+    "select_city",
+    "check_in",
+    "confirm_check_in",
+    "check_out",
+    "confirm_check_out",
+    "hotels",
+    "photos_and_search",
+)
+FIRST_USER_ID = 10_000_000
+SAMPLE_PERIOD = 0.01
+
+
+class LoadHarness:
+    """Класс LoadHarness, описывающий передачу обновлений боту и сбор статистики.
+
+    Пул потоков бота оборачивается так, что завершение обработчика обновления пользователя
+    освобождает этого пользователя для следующего шага.
+
+    Attributes:
+        steps: Длительность шагов по названиям, с
+        queue_wait: Ожидание обработчиков в очереди пула, с
+        busy_time: Суммарное время работы обработчиков, с
+        max_queue: Максимальная длина очереди пула
+        queue_samples: Сумма и количество измерений длины очереди
+        errors: Количество ошибок по причинам (исключения обработчиков, необработанные обновления, нет кнопки)
+    """
+
+    def __init__(self, bot: Any, telegram: FakeTelegram, step_timeout: float) -> None:
+        """Оборачивает пул потоков бота."""
+        from utils.histogram import LogHistogram
+
+        self.bot = bot
+        self.telegram = telegram
+        self.step_timeout = step_timeout
+        self.steps = {step: LogHistogram() for step in STEPS}
+        self.queue_wait = LogHistogram()
+        self.busy_time = 0.0
+        self.max_queue = 0
+        self.queue_samples = [0, 0]
+        self.errors: Dict[str, int] = dict()
+        self._pending: Dict[int, threading.Event] = dict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._put = bot.worker_pool.put
+        bot.worker_pool.put = self._wrapped_put
+
+    def _error(self, reason: str) -> None:
+        """Учитывает ошибку."""
+        with self._lock:
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def _wrapped_put(self, func: Callable, *args: Any, **kwargs: Any) -> None:
+        """Ставит обработчик в очередь пула, измеряя ожидание и время работы."""
+        enqueued = time.perf_counter()
+        user_id = args[0].from_user.id
+
+        def task(*task_args: Any, **task_kwargs: Any) -> None:
+            started = time.perf_counter()
+            try:
+                func(*task_args, **task_kwargs)
+            except Exception as exc:
+                self._error(type(exc).__name__)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.queue_wait.add(started - enqueued)
+                    self.busy_time += finished - started
+                    event = self._pending.pop(user_id, None)
+                if event is not None:
+                    event.set()
+
+        self._put(task, *args, **kwargs)
+
+    def _sample_queue(self) -> None:
+        """Измеряет длину очереди пула каждые SAMPLE_PERIOD секунд."""
+        while not self._stop.wait(SAMPLE_PERIOD):
+            size = self.bot.worker_pool.tasks.qsize()
+            self.max_queue = max(self.max_queue, size)
+            self.queue_samples[0] += size
+            self.queue_samples[1] += 1
+
+    def start_sampling(self) -> None:
+        """Запускает измерение длины очереди пула."""
+        threading.Thread(target=self._sample_queue, name="queue_sampler", daemon=True).start()
+
+    def stop_sampling(self) -> None:
+        """Останавливает измерение длины очереди пула."""
+        self._stop.set()
+
+    def send(self, step: str, user_id: int, update: Dict[str, Any]) -> bool:
+        """Передает обновление боту и ждет завершения обработчика.
+
+        :param step: Название шага
+        :param user_id: Telegram id виртуального пользователя
+        :param update: Обновление в формате Bot API без update_id
+        :return: True, если обработчик завершился за step_timeout секунд
+        """
+        from telebot.types import Update
+
+        event = threading.Event()
+        with self._lock:
+            self._pending[user_id] = event
+        update["update_id"] = next(self._ids)
+        started = time.perf_counter()
+        self.bot.process_new_updates([Update.de_json(update)])
+        if not event.wait(self.step_timeout):
+            with self._lock:
+                self._pending.pop(user_id, None)
+            self._error(f"{step}: no handler finished")
+            return False
+        with self._lock:
+            self.steps[step].add(time.perf_counter() - started)
+        return True
+
+    def message(self, step: str, user_id: int, text: str) -> bool:
+        """Отправляет боту текстовое сообщение пользователя."""
+        user = {"id": user_id, "is_bot": False, "first_name": f"vu{user_id}"}
+        message = {
+            "message_id": next(self._ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": user,
+            "text": text,
+        }
+        return self.send(step, user_id, {"message": message})
+
+    def tap(self, step: str, user_id: int, choose: Callable[[List[str]], Optional[str]]) -> bool:
+        """Нажимает кнопку последней клавиатуры бота в чате пользователя.
+
+        :param step: Название шага
+        :param user_id: Telegram id виртуального пользователя
+        :param choose: Выбирает callback data кнопки из списка (None - подходящей кнопки нет)
+        :return: True, если кнопка нашлась и обработчик завершился
+        """
+        message_id, buttons = self.telegram.buttons(user_id)
+        data = choose(buttons)
+        if data is None:
+            self._error(f"{step}: no button")
+            return False
+        user = {"id": user_id, "is_bot": False, "first_name": f"vu{user_id}"}
+        call = {
+            "id": str(next(self._ids)),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "",
+            },
+        }
+        return self.send(step, user_id, {"callback_query": call})
+
+
+def choose_day(rng: random.Random) -> Callable[[List[str]], Optional[str]]:
+    """Выбирает случайный доступный день календаря, а если их нет - кнопку следующего месяца."""
+
+    def choose(buttons: List[str]) -> Optional[str]:
+        days = [data for data in buttons if data.startswith("cbcal_0_s_d_")]
+        if days:
+            return rng.choice(days[:7])
+        pages = [data for data in buttons if data.startswith("cbcal_0_g_d_")]
+        return pages[-1] if pages else None
+
+    return choose
+
+
+def run_conversation(harness: LoadHarness, user_id: int, city: str, hotels: int, think: float) -> bool:
+    """Проходит диалог /lowprice: команда, город, даты заезда и выезда, количество отелей, без фотографий.
+
+    :return: True, если все шаги диалога выполнены
+    """
+    rng = random.Random(user_id)
+
+    def pause() -> bool:
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+        return True
+
+    def select_day(step: str) -> bool:
+        for _ in range(3):
+            _, buttons = harness.telegram.buttons(user_id)
+            if any(data.startswith("cbcal_0_s_d_") for data in buttons):
+                break
+            if not harness.tap(step, user_id, choose_day(rng)):
+                return False
+        return harness.tap(step, user_id, choose_day(rng))
+
+    def button(value: str) -> Callable[[List[str]], Optional[str]]:
+        return lambda buttons: next((data for data in buttons if data == value), None)
+
+    return (
+        harness.message("command", user_id, "/lowprice")
+        and pause()
+        and harness.message("city", user_id, city)
+        and pause()
+        and harness.tap("select_city", user_id, lambda buttons: next((d for d in buttons if "#" in d), None))
+        and pause()
+        and select_day("check_in")
+        and harness.tap("confirm_check_in", user_id, button("checkin_date"))
+        and pause()
+        and select_day("check_out")
+        and harness.tap("confirm_check_out", user_id, button("checkout_date"))
+        and pause()
+        and harness.tap("hotels", user_id, button(str(hotels)))
+        and pause()
+        and harness.tap("photos_and_search", user_id, button("0"))
+    )
+
+
+def print_report(
+    harness: LoadHarness, completed: int, users: int, wall: float, pool_wall: float, workers: int, **servers: Any
+) -> None:
+    """Выводит пропускную способность, процентили шагов, загрузку пула и запросы к имитациям API.
+
+    :param wall: Длительность теста до завершения диалогов, с
+    :param pool_wall: Длительность теста до завершения всех обработчиков (в том числе не дождавшихся), с
+    """
+    from database.api_requests.cache import api_cache
+    from loader import storage
+    from states.users import Users
+
+    updates = sum(histogram.count for histogram in harness.steps.values())
+    print(f"conversations: {completed} of {users} completed in {wall:.1f} s, {completed / wall:.1f} conversations/s")
+    print(f"updates: {updates}, {updates / wall:.1f} updates/s")
+    print(f"\n{'step':<20} {'count':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for step, histogram in harness.steps.items():
+        print(
+            f"{step:<20} {histogram.count:>7} {histogram.percentile(50) * 1000:>8.1f} "
+            f"{histogram.percentile(90) * 1000:>8.1f} {histogram.percentile(99) * 1000:>8.1f} "
+            f"{histogram.max * 1000 if histogram.count else 0:>8.1f}"
+        )
+    wait = harness.queue_wait
+    total, samples = harness.queue_samples
+    print(
+        f"\nbot worker pool: {workers} threads, busy {harness.busy_time / (workers * pool_wall):.0%}, "
+        f"queue wait p50 {wait.percentile(50) * 1000:.1f} ms, p99 {wait.percentile(99) * 1000:.1f} ms, "
+        f"queue length mean {total / samples if samples else 0:.1f}, max {harness.max_queue}"
+    )
+    print(f"state storage: {len(storage.data)} chats with state, {len(Users.all_users)} Users objects in memory")
+    print(f"API cache: {len(api_cache)} entries, hit rate {api_cache.hit_rate:.0%}")
+    for name, server in servers.items():
+        calls = ", ".join(f"{method} {count}" for method, count in sorted(server.calls.items()))
+        print(f"{name}: {calls}")
+    if harness.errors:
+        print("errors: " + ", ".join(f"{reason} x{count}" for reason, count in sorted(harness.errors.items())))
+
+
+def main() -> None:
+    """Запускает нагрузочный тест."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="количество виртуальных пользователей (диалогов)")
+    parser.add_argument("--concurrency", type=int, default=50, help="количество одновременных диалогов")
+    parser.add_argument("--workers", type=int, default=0, help="потоков в пуле бота (0 - как в боте)")
+    parser.add_argument("--bot-latency", type=float, default=0.01, help="задержка ответа Bot API, с")
+    parser.add_argument("--api-latency", type=float, default=0.1, help="задержка ответа API Hotels.com, с")
+    parser.add_argument("--think", type=float, default=0.0, help="средняя пауза пользователя между шагами, с")
+    parser.add_argument("--cities", type=int, default=20, help="количество разных городов поиска")
+    parser.add_argument("--hotels", type=int, default=3, choices=(1, 3, 5, 10), help="количество отелей в поиске")
+    parser.add_argument("--step-timeout", type=float, default=60.0, help="максимальная длительность шага, с")
+    args = parser.parse_args()
+
+    telegram = FakeTelegram(args.bot_latency).start()
+    hotels = FakeHotels(args.api_latency).start()
+    os.environ.setdefault("BOT_TOKEN", "0:loadtest")
+    os.environ["HOTELS_API_URL"] = hotels.url
+
+    from telebot import apihelper, custom_filters, util
+
+    import handlers  # noqa: F401
+    from database.api_requests.quota import quota
+    from database.history import migrations
+    from database.history.model import db
+    from loader import bot, databases_ready, session
+    from utils.logging import complete, logger, setup_logging
+
+    apihelper.API_URL = telegram.api_url
+    bot.add_custom_filter(custom_filters.StateFilter(bot))
+    session.mount("http://", session.get_adapter("https://"))
+    quota.daily_limit = quota.user_limit = 10 ** 9
+    if args.workers:
+        bot.worker_pool.close()
+        bot.worker_pool = util.ThreadPool(bot, num_threads=args.workers)
+    workers = bot.worker_pool.num_threads
+    cities = [f"City{index}" for index in range(args.cities)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, "w") as devnull:
+        setup_logging(tmp_dir, stderr=devnull)
+        db_path = Path(tmp_dir) / "history.db"
+        if Path(db.database).exists():
+            shutil.copy(db.database, db_path)
+        db.init(str(db_path))
+        migrations.migrate()
+        databases_ready.set()
+
+        harness = LoadHarness(bot, telegram, args.step_timeout)
+        harness.start_sampling()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="vu") as executor:
+            results = executor.map(
+                lambda index: run_conversation(
+                    harness, FIRST_USER_ID + index, cities[index % len(cities)], args.hotels, args.think
+                ),
+                range(args.users),
+            )
+            completed = sum(results)
+        wall = time.perf_counter() - started
+        harness.stop_sampling()
+        bot.worker_pool.close()
+        pool_wall = time.perf_counter() - started
+        quota.flush()
+        complete()
+        logger.remove()
+        db.close()
+
+    print_report(harness, completed, args.users, wall, pool_wall, workers, bot_api=telegram, hotels_api=hotels)
+    telegram.stop()
+    hotels.stop()
+
+
+if __name__ == "__main__":
+    main()
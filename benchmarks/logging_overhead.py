@@ -0,0 +1,67 @@
+"""Измеряет накладные расходы логирования на вызов обработчика.
+
+Обработчик - функция, обернутая декоратором try_open_db, который пишет в лог сообщение уровня SUCCESS,
+как после каждого обращения к БД истории. Сравниваются:
+    off: Обработчики логера отключены
+    sync: Сериализация и запись в файл и stderr в вызывающем потоке
+    async: Запись в фоновом потоке, как в боте
+    sampled: Запись в фоновом потоке и сохранение 10% сообщений уровня SUCCESS
+
+Время указано для вызывающего потока; время записи оставшихся в очереди сообщений выводится отдельно.
+Логи пишутся во временный каталог, stderr - в os.devnull.
+
+Usage:
+    python -m benchmarks.logging_overhead [--calls 20000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+
+from database.history.crud import try_open_db
+from utils.logging import complete, logger, setup_logging
+
+
+@try_open_db
+def handler(user_id: int) -> int:
+    """Имитирует обработчик с небольшой работой и сообщением SUCCESS в лог."""
+    return sum(range(50)) + user_id
+
+
+def measure(name: str, calls: int, setup: Callable[[], None]) -> float:
+    """Выполняет calls вызовов обработчика и выводит время вызова в микросекундах."""
+    setup()
+    started = time.perf_counter()
+    for user_id in range(calls):
+        handler(user_id)
+    caller_time = time.perf_counter() - started
+    complete()
+    drain_time = time.perf_counter() - started - caller_time
+    per_call = caller_time / calls * 1e6
+    print(f"{name:<8} {per_call:>8.1f} us/call, queue drained in {drain_time * 1000:.0f} ms")
+    return per_call
+
+
+def main() -> None:
+    """Запускает сравнение режимов логирования."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="количество вызовов обработчика")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as devnull:
+        off = measure("off", args.calls, logger.remove)
+        sync = measure("sync", args.calls, lambda: setup_logging(log_dir, enqueue=False, stderr=devnull))
+        enqueued = measure("async", args.calls, lambda: setup_logging(log_dir, stderr=devnull))
+        sampled = measure(
+            "sampled", args.calls, lambda: setup_logging(log_dir, success_sample_rate=0.1, stderr=devnull)
+        )
+        print(
+            f"logging overhead per call: sync {sync - off:.1f} us, async {enqueued - off:.1f} us, "
+            f"sampled {sampled - off:.1f} us"
+        )
+        logger.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Сравнивает время создания клавиатур с кэшем и без него.
+
+Сравниваются:
+    static: Создание статических клавиатур (количество отелей и фотографий, игровое меню) и их сериализация
+    calendar: Листание календаря - случайные нажатия кнопок, начиная с начальной клавиатуры
+
+Usage:
+    python -m benchmarks.markup_cache [--taps 2000]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Callable, List
+
+from keyboards.inline.game_menu import game_menu
+from keyboards.inline.number_of_hotels import number_of_hotels
+from keyboards.inline.number_of_photos import number_of_photos
+from utils.calendar_style import build_calendar, get_calendar, process_calendar
+
+
+def measure(name: str, calls: int, call: Callable[[], object]) -> float:
+    """Выполняет calls вызовов и выводит время одного вызова в микросекундах."""
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    per_call = (time.perf_counter() - started) / calls * 1e6
+    print(f"{name:<18} {per_call:>9.1f} us/call")
+    return per_call
+
+
+def calendar_taps(taps: int, min_date: date, max_date: date) -> List[str]:
+    """Получает callback data случайных нажатий кнопок календаря, переходя по построенным клавиатурам."""
+    keyboard, _ = build_calendar(min_date, min_date, max_date)
+    taps_data = list()
+    while len(taps_data) < taps:
+        buttons = [button["callback_data"] for row in json.loads(keyboard)["inline_keyboard"] for button in row]
+        call_data = random.choice([data for data in buttons if data.split("_")[2] != "n"] or buttons)
+        taps_data.append(call_data)
+        _, next_keyboard, _ = process_calendar(call_data, min_date, max_date)
+        keyboard = next_keyboard or build_calendar(min_date, min_date, max_date)[0]
+    return taps_data
+
+
+def main() -> None:
+    """Запускает сравнение."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taps", type=int, default=2000, help="количество нажатий кнопок календаря")
+    args = parser.parse_args()
+
+    builders = (number_of_hotels, number_of_photos, game_menu)
+    uncached = measure("static uncached", 1000, lambda: [build.__wrapped__().to_json() for build in builders])
+    cached = measure("static cached", 1000, lambda: [build() for build in builders])
+    print(f"speedup: x{uncached / cached:.0f}\n")
+
+    min_date = date.today() + timedelta(days=1)
+    max_date = min_date + timedelta(days=365)
+    taps = iter(calendar_taps(args.taps, min_date, max_date) * 2)
+    process_calendar.cache_clear()
+    uncached = measure(
+        "calendar uncached", args.taps,
+        lambda: get_calendar(locale="ru", min_date=min_date, max_date=max_date).process(next(taps)),
+    )
+    cached = measure("calendar cached", args.taps, lambda: process_calendar(next(taps), min_date, max_date))
+    info = process_calendar.cache_info()
+    print(f"speedup: x{uncached / cached:.0f}, cache hits {info.hits}, misses {info.misses}, size {info.currsize}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Профиль холодного старта бота: время импорта модулей и подготовки баз данных.
+
+Импорт main.py выполняется в отдельном процессе с python -X importtime, время импорта суммируется
+по пакетам верхнего уровня. Подготовка баз данных (init_databases) измеряется на копиях БД во временном каталоге.
+Меню команд и опрос сервера Telegram не запускаются, поэтому сеть не требуется.
+
+Usage:
+    python -m benchmarks.startup_profile [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ImportRecord = Tuple[str, int, int, int]
+
+
+def run_importtime(module: str) -> List[ImportRecord]:
+    """Импортирует модуль в отдельном процессе с python -X importtime.
+
+    :param module: Имя импортируемого модуля
+    :return: Записи (модуль, уровень вложенности, собственное время мкс, общее время мкс) в порядке вывода
+    """
+    env = dict(os.environ, BOT_TOKEN=os.getenv("BOT_TOKEN") or "0:profile")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    records = list()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), level, int(self_time), int(cumulative)))
+    return records
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    """Суммирует собственное время импорта модулей по пакетам верхнего уровня (telebot, peewee, handlers и т.д.)."""
+    packages: Dict[str, int] = defaultdict(int)
+    for name, _, self_time, _ in records:
+        packages[name.split(".")[0]] += self_time
+    return packages
+
+
+def measure_databases() -> float:
+    """Измеряет время подготовки баз данных на их копиях во временном каталоге."""
+    from database.game_cities.model import db_game
+    from database.history.model import db
+    from loader import init_databases
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for database in (db, db_game):
+            db_path = Path(tmp_dir) / Path(database.database).name
+            if Path(database.database).exists():
+                shutil.copy(database.database, db_path)
+            database.init(str(db_path))
+        databases_time = init_databases()
+        db.close()
+        db_game.close()
+    return databases_time
+
+
+def main() -> None:
+    """Выводит профиль холодного старта."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="количество запусков (выводится самый быстрый)")
+    parser.add_argument("--top", type=int, default=15, help="количество выводимых пакетов и модулей")
+    args = parser.parse_args()
+
+    runs = list()
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        records = run_importtime("main")
+        runs.append((time.perf_counter() - started, records))
+    process_time, records = min(runs, key=lambda run: run[0])
+    packages = by_package(records)
+
+    print(f"process with imports: {process_time * 1000:.1f} ms, imports: {sum(packages.values()) / 1000:.1f} ms")
+    print("\nimport time by top-level package:")
+    for package, package_time in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {package:<30} {package_time / 1000:>8.1f} ms")
+    print("\nslowest modules by self time:")
+    for name, _, self_time, _ in sorted(records, key=lambda record: -record[2])[: args.top]:
+        print(f"  {name:<50} {self_time / 1000:>8.1f} ms")
+    print(f"\ndatabases (migrations and city index): {measure_databases() * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-"""Модуль загружает токен телеграм бота, ключ Rapid_API, ID и пароль админа телеграм бота, список команд бота."""
+"""Модуль загружает токен бота, ключ Rapid_API, ID и пароль админа, список команд бота.
+
+Также загружает необязательные настройки логирования, запросов к Bot API, кэша ответов API Hotels.com
+(в том числе его заполнения в часы низкой нагрузки), лимитов запросов к API и проверки цен по подпискам.
+"""
 
 import os
 from typing import Any
@@ -7,21 +11,65 @@ from dotenv import find_dotenv, load_dotenv
 
 if find_dotenv():
     load_dotenv()
-else:
-    exit("Переменные окружения не загружены т.к отсутствует файл .env")
+elif not os.getenv("BOT_TOKEN"):
+    exit("Переменные окружения не загружены т.к отсутствует файл .env и не задана переменная BOT_TOKEN")
 
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 RAPID_API_KEY: Any = os.getenv("RAPID_API_KEY")
 ADMIN_ID = os.getenv("ADMIN_ID")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
+LOG_SUCCESS_SAMPLE_RATE = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", "1"))
+LOG_ROTATION = os.getenv("LOG_ROTATION", "1 hour")
+LOG_RETENTION = os.getenv("LOG_RETENTION", "30 days")
+LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "gz")
+BOT_API_POOL_SIZE = int(os.getenv("BOT_API_POOL_SIZE", "8"))
+BOT_API_CONNECT_TIMEOUT = float(os.getenv("BOT_API_CONNECT_TIMEOUT", "5"))
+BOT_API_READ_TIMEOUT = float(os.getenv("BOT_API_READ_TIMEOUT", "30"))
+HOTELS_API_URL = os.getenv("HOTELS_API_URL", "https://hotels4.p.rapidapi.com/")
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "900"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "1024"))
+API_DAILY_LIMIT = int(os.getenv("API_DAILY_LIMIT", "500"))
+API_USER_DAILY_LIMIT = int(os.getenv("API_USER_DAILY_LIMIT", "100"))
+API_SHED_RATIO = float(os.getenv("API_SHED_RATIO", "0.8"))
+API_EXPENSIVE_COST = int(os.getenv("API_EXPENSIVE_COST", "15"))
+COMPARE_MAX_WORKERS = int(os.getenv("COMPARE_MAX_WORKERS", "4"))
+BESTDEAL_PRICE_WEIGHT = float(os.getenv("BESTDEAL_PRICE_WEIGHT", "0.5"))
+BESTDEAL_DISTANCE_WEIGHT = float(os.getenv("BESTDEAL_DISTANCE_WEIGHT", "0.3"))
+BESTDEAL_SCORE_WEIGHT = float(os.getenv("BESTDEAL_SCORE_WEIGHT", "0.2"))
+PRICE_WATCH_INTERVAL = float(os.getenv("PRICE_WATCH_INTERVAL", "6"))
+PRICE_WATCH_DAILY_BUDGET = float(os.getenv("PRICE_WATCH_DAILY_BUDGET", "48"))
+PRICE_WATCH_BURST = float(os.getenv("PRICE_WATCH_BURST", "4"))
+PRICE_WATCH_MIN_DROP = float(os.getenv("PRICE_WATCH_MIN_DROP", "0.05"))
+PRICE_WATCH_TICK = float(os.getenv("PRICE_WATCH_TICK", "60"))
+PREWARM_HOURS = tuple(int(hour) for hour in os.getenv("PREWARM_HOURS", "4-7").split("-"))
+PREWARM_LIMIT = int(os.getenv("PREWARM_LIMIT", "20"))
+PREWARM_DETAILS = int(os.getenv("PREWARM_DETAILS", "5"))
+PREWARM_RATE = float(os.getenv("PREWARM_RATE", "10"))
+PREWARM_TTL = float(os.getenv("PREWARM_TTL", "6"))
+PREWARM_LOOKBACK = int(os.getenv("PREWARM_LOOKBACK", "30"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+MEMORY_LOG_INTERVAL = float(os.getenv("MEMORY_LOG_INTERVAL", "60"))
+MEMORY_WARN_GROWTH = float(os.getenv("MEMORY_WARN_GROWTH", "256"))
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "0"))
+HISTORY_ARCHIVE_DAYS = int(os.getenv("HISTORY_ARCHIVE_DAYS", "180"))
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", "database/history/archive")
+HISTORY_MAINTENANCE_HOUR = int(os.getenv("HISTORY_MAINTENANCE_HOUR", "3"))
+HISTORY_MAINTENANCE_BATCH = int(os.getenv("HISTORY_MAINTENANCE_BATCH", "500"))
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "500"))
+EXPORT_SPOOL_SIZE = int(os.getenv("EXPORT_SPOOL_SIZE", "1048576"))
 DEFAULT_COMMANDS = (
     ("help", "🛎помощь по командам бота"),
     ("lowprice", "📉вывод самых дешёвых отелей в городе"),
     ("highprice", "📈вывод самых дорогих отелей в городе"),
     ("bestdeal", "📊вывод отелей, наиболее подходящих по цене и расположению от центра"),
+    ("compare", "🆚сравнение цен в нескольких городах и на разные даты"),
+    ("flexdates", "📆самые дешевые даты заезда в течение месяца"),
     ("history", "🗄вывод истории поиска отелей"),
+    ("export", "📤выгрузка всей истории поиска в файл CSV или JSONL"),
     ("game", "🗺играть в города"),
 )
 COMMAND_MESSAGES = ["/" + DEFAULT_COMMANDS[command][0] for command in range(0, len(DEFAULT_COMMANDS))]
-COMMAND_MESSAGES.extend(["/start", "/clear"])
+COMMAND_MESSAGES.extend(["/start", "/clear", "/stats", "/quota", "/profile", "/memory", "/maintenance"])
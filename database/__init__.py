@@ -4,6 +4,10 @@ Modules:
     api_requests: Модуль взаимодействия с API сайта Hotels.com
     history: Модуль взаимодействия с БД истории запросов
     game_cities: Модуль взаимодействия с БД игровой статистики игры Города
+    migrations: Модуль версионных миграций БД
+    prewarm: Модуль заполнения кэша ответов API в часы низкой нагрузки
+    price_watch: Модуль фоновой проверки цен по подпискам на снижение цены
 """
 
-from database import api_requests, game_cities, history
+from database import (api_requests, game_cities, history, migrations, prewarm,
+                      price_watch)
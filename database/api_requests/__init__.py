@@ -2,8 +2,14 @@
 
 Modules:
     bestdeal: Запрос лучших предложений отелей
+    cache: Кэш ответов API
     cities: Запрос списка городов
+    compare: Сравнение цен в нескольких городах и на разные даты
+    flexible_dates: Поиск самых дешевых дат заезда в течение месяца
     highprice: Запрос самых дорогих отелей
     lowprice: Запрос самых дешевых отелей
+    quota: Учет и ограничение запросов к API
+    ranking: Ранжирование отелей по цене, расстоянию до центра и оценке
 """
-from . import bestdeal, cities, highprice, lowprice
+from . import (bestdeal, cache, cities, compare, flexible_dates, highprice,
+               lowprice, quota, ranking)
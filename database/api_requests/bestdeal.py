@@ -10,11 +10,19 @@ from states.users import Users
 
 from .common import api_request
 from .formatted_hotels_info import get_formatted_hotels_info
+from .ranking import rank_hotels
+
+
+def _in_distance_range(hotel: Dict[str, Any], user: Users) -> bool:
+    """Проверяет, что расстояние от отеля до центра входит в заданный пользователем диапазон."""
+    return user.min_distance <= hotel["destinationInfo"]["distanceFromDestination"]["value"] <= user.max_distance
 
 
 def get_bestdeal_results(user: Users) -> Tuple[List, bool]:
     """Получает результаты поиска лучшего отеля по цене и расстоянию.
 
+    Отели в заданном диапазоне расстояний ранжируются по цене, расстоянию до центра и оценке гостей (rank_hotels).
+
     :param user:
         Объект класса User (содержит все аттрибуты для выполнения запроса)
     :return:
@@ -48,24 +56,14 @@ def get_bestdeal_results(user: Users) -> Tuple[List, bool]:
     results = api_request(method_endswith="properties/v2/list", params=request_data, method_type="POST")
 
     found_hotels = results["data"]["propertySearch"]["properties"]
-    filtered_hotels = [
-        hotel
-        for hotel in found_hotels
-        if user.min_distance <= hotel["destinationInfo"]["distanceFromDestination"]["value"] <= user.max_distance
-    ]
+    filtered_hotels = [hotel for hotel in found_hotels if _in_distance_range(hotel, user)]
     if len(filtered_hotels) < user.results_size and len(found_hotels) == 200:
         request_data["filters"]["price"]["min"] = results["data"]["propertySearch"]["filterMetadata"]["priceRange"][
             "max"
         ]
         results = api_request(method_endswith="properties/v2/list", params=request_data, method_type="POST")
         found_hotels = results["data"]["propertySearch"]["properties"]
-        add_hotels = [
-            hotel
-            for hotel in found_hotels
-            if hotel["destinationInfo"]["distanceFromDestination"]["value"]
-            in range(user.min_distance, user.max_distance)
-        ]
-        filtered_hotels.append(add_hotels)
+        filtered_hotels.extend(hotel for hotel in found_hotels if _in_distance_range(hotel, user))
     if len(filtered_hotels) > 0:
-        return get_formatted_hotels_info(user=user, all_hotels=filtered_hotels), True
-    return get_formatted_hotels_info(user=user, all_hotels=found_hotels), False
+        return get_formatted_hotels_info(user=user, all_hotels=rank_hotels(filtered_hotels, user.results_size)), True
+    return get_formatted_hotels_info(user=user, all_hotels=rank_hotels(found_hotels, user.results_size)), False
@@ -0,0 +1,116 @@
+"""Кэш ответов API сайта Hotels.com.
+
+Ответы на запросы списка отелей (properties/v2/list) и информации об отеле (properties/v2/detail)
+хранятся в памяти заданное время (API_CACHE_TTL). Ключ кэша - endpoint и параметры запроса без user_id,
+поэтому одинаковые запросы разных пользователей, а также параллельные поиски команды compare
+используют один ответ. Записи, добавленные заранее (database.prewarm), хранятся дольше и учитываются
+в отдельном счетчике попаданий. Количество и объем записей учитываются в отчете о расходе памяти.
+
+Classes:
+    TTLCache: Кэш с ограничением размера и времени хранения
+
+Functions:
+    cache_key: Формирует ключ кэша по endpoint и параметрам запроса
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config_data.config import API_CACHE_SIZE, API_CACHE_TTL
+from utils.memory import deep_size, register_gauge
+
+
+class TTLCache:
+    """Класс TTLCache, описывающий потокобезопасный кэш с вытеснением давно использованных записей.
+
+    Attributes:
+        maxsize: Максимальное количество записей
+        ttl: Время хранения записи, с
+        hits: Количество найденных в кэше значений
+        misses: Количество отсутствующих (или устаревших) значений
+        hits_by_source: Количество найденных значений по источнику записи (например, "request", "prewarm")
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Создает пустой кэш."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.hits_by_source: Dict[str, int] = dict()
+        self._items: "OrderedDict[str, Tuple[float, Any, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Возвращает значение по ключу или None, если значения нет или срок его хранения истек."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            self.hits_by_source[item[2]] = self.hits_by_source.get(item[2], 0) + 1
+            return item[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, source: str = "request") -> None:
+        """Сохраняет значение, вытесняя самую давно использованную запись при превышении размера.
+
+        :param key: Ключ
+        :param value: Значение
+        :param ttl: Время хранения записи, с (по умолчанию - ttl кэша)
+        :param source: Источник записи для счетчика попаданий hits_by_source
+        """
+        with self._lock:
+            self._items[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, source)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.hits_by_source.clear()
+
+    def __contains__(self, key: str) -> bool:
+        """Проверяет наличие действующей записи, не изменяя счетчики и порядок вытеснения."""
+        item = self._items.get(key)
+        return item is not None and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        """Количество записей в кэше (включая устаревшие)."""
+        return len(self._items)
+
+    def memory_usage(self) -> Tuple[int, int]:
+        """Возвращает количество записей и объем памяти записей (с ключами и ответами API), байт."""
+        with self._lock:
+            items = list(self._items.items())
+        return len(items), deep_size(items)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля найденных в кэше значений (0, если обращений не было)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def cache_key(method_endswith: str, params: Dict) -> str:
+    """Формирует ключ кэша по endpoint и параметрам запроса без user_id.
+
+    :param method_endswith: окончание ссылки на endpoint
+    :param params: параметры запроса
+    :return: Ключ кэша
+    """
+    request = {key: value for key, value in params.items() if key != "user_id"}
+    return f"{method_endswith} {json.dumps(request, sort_keys=True, default=str)}"
+
+
+api_cache = TTLCache(maxsize=API_CACHE_SIZE, ttl=API_CACHE_TTL)
+register_gauge("API cache", api_cache.memory_usage)
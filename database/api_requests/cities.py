@@ -1,6 +1,7 @@
 """Получение от API списка городов схожих с запросом пользователя.
 
 Functions:
+    search_cities: Поиск городов по названию
     find_city: Поиск городов по запросу пользователя
 """
 
@@ -12,17 +13,16 @@ from utils.logging import logger
 from .common import api_request
 
 
-def find_city(user: Users) -> List[Dict]:
-    """Получает результаты поиска города по запросу пользователя.
+def search_cities(user_id: int, query: str) -> List[Dict]:
+    """Получает результаты поиска города по названию.
 
-    :param user:
-        Объект класса User (содержит все аттрибуты для выполнения запроса).
-    :return:
-        Список городов. Каждый город представлен словарем с ключами "name" - название и "id".
+    :param user_id: Telegram id пользователя
+    :param query: Название города на английском языке
+    :return: Список городов. Каждый город представлен словарем с ключами "name" - название и "id".
     """
     request_data = {
-        "user_id": user.user_id,
-        "q": user.city,
+        "user_id": user_id,
+        "q": query,
         "locale": "en_US",
         "langid": "1033",
         "siteid": "300000001",
@@ -34,5 +34,16 @@ def find_city(user: Users) -> List[Dict]:
             if result["type"] == "CITY":
                 cities.append({"name": result["regionNames"]["displayName"], "id": result["gaiaId"]})
     except Exception as exc:
-        logger.error(f"find_city {exc}", user_id=user.user_id)
+        logger.error(f"find_city {exc}", user_id=user_id)
     return cities
+
+
+def find_city(user: Users) -> List[Dict]:
+    """Получает результаты поиска города по запросу пользователя.
+
+    :param user:
+        Объект класса User (содержит все аттрибуты для выполнения запроса).
+    :return:
+        Список городов. Каждый город представлен словарем с ключами "name" - название и "id".
+    """
+    return search_cities(user.user_id, user.city)
@@ -1,8 +1,10 @@
 """Запросы к API сайта с отелями Hotels.com.
 
+Каждая попытка запроса к API, включая повторные, учитывается в лимитах запросов (quota.charge).
+
 Functions:
     try_request: декоратор для повторных попыток подключения
-    api_request: функция для запросов к API с методами POST и GET
+    api_request: функция для запросов к API с методами POST и GET (с кэшированием ответов и учетом лимитов)
     get_request: GET запросы
     post_request: POST запросы
 """
@@ -14,8 +16,12 @@ from typing import Any, Callable, Dict, Optional
 
 from requests import exceptions, get, post
 
-from config_data.config import RAPID_API_KEY
+from config_data.config import HOTELS_API_URL, RAPID_API_KEY
 from utils.logging import logger
+from utils.profiling import profiled
+
+from .cache import api_cache, cache_key
+from .quota import QuotaExceededError, quota
 
 
 def try_request(func: Callable) -> Callable:
@@ -30,10 +36,12 @@ def try_request(func: Callable) -> Callable:
         for attempt in range(1, 4):
             try:
                 return func(*args, **kwargs)
+            except QuotaExceededError:
+                raise
             except ConnectionError as exc:
                 last_exc = exc
                 logger.error(
-                    f'Try {attempt}, delay {delay} sec, {func.__name__}, {kwargs["url"]}',
+                    f'Try {attempt}, delay {delay} sec, {func.__name__}, {HOTELS_API_URL}{kwargs["endpoint"]}',
                     user_id=kwargs["params"]["user_id"],
                 )
                 sleep(delay)
@@ -43,8 +51,14 @@ def try_request(func: Callable) -> Callable:
     return wrapped_func
 
 
+@profiled
 def api_request(
-    method_endswith: str, params: Dict, method_type: str, good_status: int = 200, timeout: int = 15
+    method_endswith: str,
+    params: Dict,
+    method_type: str,
+    good_status: int = 200,
+    timeout: int = 15,
+    cache: bool = False,
 ) -> Dict:
     """Универсальная функция для запросов к API с методами POST и GET.
 
@@ -53,26 +67,39 @@ def api_request(
     :param method_endswith: окончание ссылки на endpoint
     :param params: параметры запроса
     :param method_type: Метод запроса - POST или GET
+    :param cache: Использовать кэш ответов (ответ не должен изменяться вызывающим кодом)
     :return: Ответ на POST или GET запрос
+    :except QuotaExceededError: Исчерпан суточный лимит запросов (ответы из кэша выдаются без учета лимитов)
     """
-    url = f"https://hotels4.p.rapidapi.com/{method_endswith}"
+    if cache:
+        key = cache_key(method_endswith, params)
+        response = api_cache.get(key)
+        if response is not None:
+            return response
     if method_type == "GET":
-        return get_request(url=url, params=params, status=good_status, timeout=timeout)
-    return post_request(url=url, params=params, status=good_status, timeout=timeout)
+        response = get_request(endpoint=method_endswith, params=params, status=good_status, timeout=timeout)
+    else:
+        response = post_request(endpoint=method_endswith, params=params, status=good_status, timeout=timeout)
+    if cache:
+        api_cache.set(key, response)
+    return response
 
 
 @try_request
-def get_request(url: str, params: Dict, status: int, timeout: int) -> Optional[Dict]:
+def get_request(endpoint: str, params: Dict, status: int, timeout: int) -> Optional[Dict]:
     """Получает ответ на GET запрос.
 
     :param timeout:
     :param status:
-    :param url: ссылка на endpoint
+    :param endpoint: окончание ссылки на endpoint
     :param params: параметры запроса
     :return: Ответ на GET запрос
     :except ConnectionError: Возвращает исключение, если статус ответа сервера не равен 200
     или превышено время ожидания ответа от сервера
+    :except QuotaExceededError: Исчерпан суточный лимит запросов
     """
+    quota.charge(params["user_id"], endpoint)
+    url = f"{HOTELS_API_URL}{endpoint}"
     try:
         response = get(
             url,
@@ -81,7 +108,11 @@ def get_request(url: str, params: Dict, status: int, timeout: int) -> Optional[D
             timeout=timeout,
         )
         if response.status_code == status:
-            logger.success(f"GET Request {url} OK", user_id=params["user_id"])
+            logger.success(
+                f"GET Request {url} OK in {response.elapsed.total_seconds():.3f} s",
+                user_id=params["user_id"],
+                keep=True,
+            )
             return json.loads(response.text)
         raise ConnectionError(f"GET Request url {url} response code {response.status_code}")
     except exceptions.ReadTimeout as exc:
@@ -89,17 +120,20 @@ def get_request(url: str, params: Dict, status: int, timeout: int) -> Optional[D
 
 
 @try_request
-def post_request(url: str, params: Dict, status: int, timeout: int) -> Optional[Dict]:
+def post_request(endpoint: str, params: Dict, status: int, timeout: int) -> Optional[Dict]:
     """Получает ответ на POST запрос.
 
     :param timeout:
     :param status:
-    :param url: ссылка на endpoint
+    :param endpoint: окончание ссылки на endpoint
     :param params: параметры запроса
     :return: Ответ на GET запрос
     :except ConnectionError: Возвращает исключение, если статус ответа сервера не равен 200
     или превышено время ожидания ответа от сервера
+    :except QuotaExceededError: Исчерпан суточный лимит запросов
     """
+    quota.charge(params["user_id"], endpoint)
+    url = f"{HOTELS_API_URL}{endpoint}"
     try:
         response = post(
             url,
@@ -112,7 +146,11 @@ def post_request(url: str, params: Dict, status: int, timeout: int) -> Optional[
             timeout=timeout,
         )
         if response.status_code == status:
-            logger.success(f"POST Request {url} OK", user_id=params["user_id"])
+            logger.success(
+                f"POST Request {url} OK in {response.elapsed.total_seconds():.3f} s",
+                user_id=params["user_id"],
+                keep=True,
+            )
             return json.loads(response.text)
         raise ConnectionError(f"POST Request url {url} response code {response.status_code}")
     except exceptions.ReadTimeout as exc:
@@ -0,0 +1,141 @@
+"""Сравнение цен на отели в нескольких городах и на разные даты заезда (команда compare).
+
+Поиски самых дешевых отелей для каждой пары (город, дата заезда) выполняются параллельно
+(COMPARE_MAX_WORKERS потоков) и используют общий кэш ответов API, поэтому повторное сравнение
+или поиск /lowprice по тем же городам и датам не обращается к API.
+
+Classes:
+    ComparisonRow: Результат поиска для одной пары город - дата заезда
+
+Functions:
+    resolve_cities: Находит id городов по названиям
+    search_cheapest: Выполняет поиск самых дешевых отелей для одной пары город - дата заезда
+    compare_lowprice: Выполняет поиски самых дешевых отелей для всех пар город - дата заезда
+    format_comparison: Форматирует результаты сравнения в таблицу
+"""
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import product
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config_data.config import COMPARE_MAX_WORKERS
+from utils.city_translator import translate
+from utils.hotel_info import format_price, parse_price
+from utils.logging import logger
+
+from .cities import search_cities
+from .lowprice import search_lowprice
+from .quota import QuotaExceededError
+
+
+class ComparisonRow(NamedTuple):
+    """Результат поиска самых дешевых отелей для одной пары город - дата заезда.
+
+    Attributes:
+        city: Название города
+        check_in_date: Дата заезда
+        hotels: Количество найденных отелей (не более lowprice.LIST_PAGE_SIZE)
+        min_price: Минимальная цена за ночь
+        median_price: Медиана цены за ночь среди найденных отелей
+        hotel: Название самого дешевого отеля
+        error: Описание ошибки, если поиск не выполнен
+    """
+
+    city: str
+    check_in_date: date
+    hotels: int = 0
+    min_price: Optional[float] = None
+    median_price: Optional[float] = None
+    hotel: Optional[str] = None
+    error: Optional[str] = None
+
+
+def resolve_cities(user_id: int, names: List[str]) -> List[Tuple[str, Optional[Dict]]]:
+    """Параллельно переводит названия городов и находит их id (первый найденный город).
+
+    :param user_id: Telegram id пользователя
+    :param names: Названия городов
+    :return: Список пар (название, город в формате cities.search_cities или None, если город не найден)
+    """
+
+    def resolve(name: str) -> Tuple[str, Optional[Dict]]:
+        cities = search_cities(user_id, translate(name))
+        return name, cities[0] if cities else None
+
+    with ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS, thread_name_prefix="compare") as executor:
+        return list(executor.map(resolve, names))
+
+
+def search_cheapest(user_id: int, city: Dict, check_in_date: date, nights: int) -> ComparisonRow:
+    """Выполняет поиск самых дешевых отелей для одной пары город - дата заезда.
+
+    :param user_id: Telegram id пользователя
+    :param city: Город в формате cities.search_cities
+    :param check_in_date: Дата заезда
+    :param nights: Количество ночей
+    :return: Результат поиска (при отсутствии ответа сервера - с описанием ошибки)
+    """
+    try:
+        hotels = search_lowprice(user_id, city["id"], check_in_date, check_in_date + timedelta(days=nights))
+    except TypeError:
+        return ComparisonRow(city["name"], check_in_date)
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user_id)
+        return ComparisonRow(city["name"], check_in_date, error="лимит запросов")
+    except ConnectionError as exc:
+        logger.error(f"{exc}", user_id=user_id)
+        return ComparisonRow(city["name"], check_in_date, error="нет ответа")
+    prices = list()
+    for hotel in hotels:
+        price = parse_price(hotel["price"]["lead"]["formatted"])
+        if price is not None:
+            prices.append((price, hotel["name"]))
+    if not prices:
+        return ComparisonRow(city["name"], check_in_date, hotels=len(hotels))
+    min_price, name = min(prices)
+    median = statistics.median(price for price, _ in prices)
+    return ComparisonRow(city["name"], check_in_date, len(hotels), min_price, median, name)
+
+
+def compare_lowprice(user_id: int, cities: List[Dict], check_in_dates: List[date], nights: int) -> List[ComparisonRow]:
+    """Параллельно выполняет поиски самых дешевых отелей для всех пар город - дата заезда.
+
+    :param user_id: Telegram id пользователя
+    :param cities: Города в формате cities.search_cities
+    :param check_in_dates: Даты заезда
+    :param nights: Количество ночей
+    :return: Результаты в порядке городов, а для каждого города - в порядке дат
+    """
+    pairs = list(product(cities, check_in_dates))
+    with ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS, thread_name_prefix="compare") as executor:
+        return list(executor.map(lambda pair: search_cheapest(user_id, pair[0], pair[1], nights), pairs))
+
+
+def format_comparison(rows: List[ComparisonRow], nights: int) -> str:
+    """Форматирует результаты сравнения в моноширинную таблицу Markdown и выделяет лучшее предложение.
+
+    :param rows: Результаты сравнения
+    :param nights: Количество ночей
+    :return: Текст сообщения
+    """
+    width = max([len("Город")] + [len(row.city[:16]) for row in rows])
+    lines = [f"{'Город':<{width}} Заезд  Мин.    Медиана"]
+    for row in rows:
+        if row.error:
+            prices = row.error
+        elif row.min_price is None:
+            prices = "нет отелей"
+        else:
+            prices = f"{format_price(row.min_price):<7} {format_price(row.median_price)}"
+        lines.append(f"{row.city[:16]:<{width}} {row.check_in_date:%d.%m}  {prices}")
+    table = "\n".join(lines).replace("`", "'")
+    text = f"🆚Цена за ночь, {nights} ноч.:\n```\n{table}\n```"
+    found = [row for row in rows if row.min_price is not None]
+    if found:
+        best = min(found, key=lambda row: row.min_price)
+        text += (
+            f"\n⭐Дешевле всего: {best.city}, заезд {best.check_in_date:%d.%m.%Y} - "
+            f"{best.hotel}, {format_price(best.min_price)} за ночь"
+        )
+    return text
@@ -1,32 +1,45 @@
-"""Получение от API детальной информации об отеле.
+"""Получение от API детальной информации об отеле (ответ кэшируется).
 
 Functions:
+    details_request_data: Формирует параметры запроса информации об отеле
     get_details: Получает ссылки на фотографии и адрес
 """
 
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 from states.users import Users
 
 from .common import api_request
 
 
-def get_details(property_id: str, user: Users) -> Tuple[List, str]:
-    """Получает ссылки на фотографии и адрес.
+def details_request_data(user_id: int, property_id: str) -> Dict[str, Any]:
+    """Формирует параметры запроса информации об отеле.
 
+    :param user_id: Telegram id пользователя
     :param property_id: id отеля
-    :param user: объект класса User, содержащий необходимые для запроса аттрибуты
-    :return: Кортеж из списка ссылок на фотографии отеля и адреса
+    :return: Параметры запроса properties/v2/detail
     """
-    request_data = {
-        "user_id": user.user_id,
+    return {
+        "user_id": user_id,
         "currency": "USD",
         "eapid": 1,
         "locale": "en_US",
         "siteId": 300000001,
         "propertyId": property_id,
     }
-    results = api_request(method_endswith="properties/v2/detail", params=request_data, method_type="POST")
+
+
+def get_details(property_id: str, user: Users) -> Tuple[List, str]:
+    """Получает ссылки на фотографии и адрес.
+
+    :param property_id: id отеля
+    :param user: объект класса User, содержащий необходимые для запроса аттрибуты
+    :return: Кортеж из списка ссылок на фотографии отеля и адреса
+    """
+    request_data = details_request_data(user.user_id, property_id)
+    results = api_request(
+        method_endswith="properties/v2/detail", params=request_data, method_type="POST", cache=True
+    )
     photos = list()
     for i_photo in range(user.number_of_photos):
         photos.append(results["data"]["propertyInfo"]["propertyGallery"]["images"][i_photo]["image"]["url"])
@@ -0,0 +1,78 @@
+"""Поиск самых дешевых дат заезда в течение месяца (команда flexdates).
+
+Для каждой даты заезда месяца (начиная с сегодняшней) выполняется поиск самых дешевых отелей
+на заданное количество ночей. Поиски выполняются пакетами по COMPARE_MAX_WORKERS параллельных запросов
+и используют общий кэш ответов API, поэтому даты, уже найденные командами lowprice, compare или
+предыдущим поиском по тем же датам, не запрашиваются повторно.
+
+Functions:
+    month_dates: Возвращает даты заезда месяца, начиная с сегодняшней
+    scan_dates: Выполняет поиски самых дешевых отелей для каждой даты заезда
+    format_price_calendar: Форматирует цены по датам и лучшие даты заезда
+"""
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List
+
+from config_data.config import COMPARE_MAX_WORKERS
+from utils.hotel_info import format_price
+
+from .compare import ComparisonRow, search_cheapest
+
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+BAR_WIDTH = 10
+BEST_DATES = 3
+
+
+def month_dates(year: int, month: int) -> List[date]:
+    """Возвращает даты заезда месяца, начиная с сегодняшней (пустой список для прошедшего месяца)."""
+    days = calendar.monthrange(year, month)[1]
+    return [day for day in (date(year, month, number) for number in range(1, days + 1)) if day >= date.today()]
+
+
+def scan_dates(user_id: int, city: Dict, check_in_dates: List[date], nights: int) -> List[ComparisonRow]:
+    """Выполняет поиски самых дешевых отелей для каждой даты заезда (не более COMPARE_MAX_WORKERS одновременно).
+
+    :param user_id: Telegram id пользователя
+    :param city: Город в формате cities.search_cities
+    :param check_in_dates: Даты заезда
+    :param nights: Количество ночей
+    :return: Результаты в порядке дат
+    """
+    with ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS, thread_name_prefix="flexdates") as executor:
+        return list(executor.map(lambda day: search_cheapest(user_id, city, day, nights), check_in_dates))
+
+
+def format_price_calendar(rows: List[ComparisonRow], nights: int) -> str:
+    """Форматирует минимальную цену за ночь по датам заезда в моноширинную таблицу Markdown с гистограммой.
+
+    Длина полосы гистограммы пропорциональна разнице цены с минимальной ценой месяца.
+
+    :param rows: Результаты поиска по датам
+    :param nights: Количество ночей
+    :return: Текст сообщения с таблицей и лучшими датами заезда
+    """
+    found = [row for row in rows if row.min_price is not None]
+    low = min((row.min_price for row in found), default=0)
+    spread = max((row.min_price for row in found), default=0) - low or 1
+    lines = list()
+    for row in rows:
+        day = f"{row.check_in_date:%d.%m} {WEEKDAYS[row.check_in_date.weekday()]}"
+        if row.error:
+            lines.append(f"{day} {row.error}")
+        elif row.min_price is None:
+            lines.append(f"{day} -")
+        else:
+            bar = "█" * (1 + round((row.min_price - low) / spread * (BAR_WIDTH - 1)))
+            lines.append(f"{day} {format_price(row.min_price):>7} {bar}")
+    table = "\n".join(lines)
+    text = f"📆{rows[0].city}: минимальная цена за ночь по дате заезда, {nights} ноч.:\n```\n{table}\n```"
+    if found:
+        best = sorted(found, key=lambda row: (row.min_price, row.check_in_date))[:BEST_DATES]
+        text += "\n⭐Лучшие даты заезда:\n" + "\n".join(
+            f"{row.check_in_date:%d.%m.%Y} - {row.hotel}, {format_price(row.min_price)} за ночь, "
+            f"{format_price(row.min_price * nights)} за {nights} ноч."
+            for row in best
+        )
+    return text
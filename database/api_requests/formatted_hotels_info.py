@@ -7,6 +7,7 @@ from typing import List, Tuple
 
 from database.history.crud import add_result_to_db
 from states.users import Users
+from utils.hotel_info import hotel_link, parse_price
 from utils.logging import logger
 
 from .details import get_details
@@ -28,25 +29,37 @@ def get_formatted_hotels_info(user: Users, all_hotels: List) -> List[Tuple[str,
             else:
                 hotel = all_hotels[i_hotel]
             photos, address = get_details(hotel["id"], user)
+            price = hotel["price"]["lead"]["formatted"]
+            total = hotel["price"]["displayMessages"][1]["lineItems"][0]["value"].replace(" total", "")
 
             hotel_info = {
                 "db": {
                     "request_id": user.request,
-                    "name": f'[{hotel["name"]}](https://www.hotels.com/h{hotel["id"]}.Hotel-Information)',
+                    "property_id": hotel["id"],
+                    "name": hotel["name"],
+                    "city": user.city,
                     "distance": hotel["destinationInfo"]["distanceFromDestination"]["value"],
-                    "price": hotel["price"]["lead"]["formatted"],
-                    "total": hotel["price"]["displayMessages"][1]["lineItems"][0]["value"].replace(" total", ""),
+                    "price": parse_price(price),
+                    "total": parse_price(total),
+                    "currency": "USD",
+                },
+                "text": {
+                    "link": hotel_link(hotel["name"], hotel["id"]),
+                    "address": address,
+                    "price": price,
+                    "days": user.total_days,
+                    "total": total,
+                    "score": hotel["reviews"]["score"],
                 },
-                "text": {"address": address, "days": user.total_days, "score": hotel["reviews"]["score"]},
             }
 
             text = (
-                f"{hotel_info['db']['name']}\n"
+                f"{hotel_info['text']['link']}\n"
                 f"{hotel_info['text']['address']}\n"
                 f"До центра {hotel_info['db']['distance']} миль\n"
-                f"Стоимость за одну ночь: {hotel_info['db']['price']}\n"
+                f"Стоимость за одну ночь: {hotel_info['text']['price']}\n"
                 f"Ночей: {hotel_info['text']['days']}\n"
-                f"Общая стоимость: {hotel_info['db']['total']}\n"
+                f"Общая стоимость: {hotel_info['text']['total']}\n"
                 f"Оценка отеля: {hotel_info['text']['score']}"
             )
 
@@ -10,11 +10,15 @@ from states.users import Users
 
 from .common import api_request
 from .formatted_hotels_info import get_formatted_hotels_info
+from .quota import HIGHPRICE_PAGES
 
 
 def get_highprice_results(user: Users) -> List[Tuple[str, List]]:
     """Получает результаты поиска отеля с самой высокой ценой по запросу пользователя.
 
+    Следующие страницы (по 200 отелей дороже последнего найденного) запрашиваются не больше HIGHPRICE_PAGES раз,
+    чтобы поиск не превышал оценку его стоимости в лимитах запросов к API.
+
     :param user: Объект класса User (содержит все аттрибуты для выполнения запроса)
     :return: Список отелей. Каждый отель представлен кортежем из адреса и списка ссылок на фото отеля
     """
@@ -49,7 +53,9 @@ def get_highprice_results(user: Users) -> List[Tuple[str, List]]:
         request_data["filters"]["price"]["min"] = 1
         results = api_request(method_endswith="properties/v2/list", params=request_data, method_type="POST")
         found_hotels = results["data"]["propertySearch"]["properties"]
-    while len(found_hotels) == 200:
+    pages = 0
+    while len(found_hotels) == 200 and pages < HIGHPRICE_PAGES:
+        pages += 1
         last_ten_hotels = found_hotels[189:]
         request_data["filters"]["price"]["min"] = results["data"]["propertySearch"]["filterMetadata"]["priceRange"][
             "max"
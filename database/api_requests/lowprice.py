@@ -1,46 +1,78 @@
 """Запрашивает через API самые дешевые отели по запросу пользователя.
 
+Список отелей запрашивается страницей постоянного размера (LIST_PAGE_SIZE) независимо от количества
+выводимых результатов, поэтому ответ кэшируется и используется повторно командами lowprice и compare.
+
 Functions:
+    lowprice_request_data: Формирует параметры запроса самых дешевых отелей
+    search_lowprice: Получает список самых дешевых отелей в городе на указанные даты
     get_lowprice_results: Получает самые дешевые предложения по отелям
 """
-
-from typing import List, Tuple
+from datetime import date
+from typing import Any, Dict, List, Tuple
 
 from states.users import Users
 
 from .common import api_request
 from .formatted_hotels_info import get_formatted_hotels_info
 
+LIST_PAGE_SIZE = 10
 
-def get_lowprice_results(user: Users) -> List[Tuple[str, List]]:
-    """Получает результаты поиска отелей с самой низкой ценой по запросу пользователя.
 
-    :param user: Объект класса User (содержит все аттрибуты для выполнения запроса)
-    :return: Список отелей. Каждый отель представлен кортежем из адреса и списка ссылок на фото отеля
+def lowprice_request_data(user_id: int, region_id: str, check_in_date: date, check_out_date: date) -> Dict[str, Any]:
+    """Формирует параметры запроса самых дешевых отелей.
+
+    :param user_id: Telegram id пользователя
+    :param region_id: id города
+    :param check_in_date: Дата заезда
+    :param check_out_date: Дата выезда
+    :return: Параметры запроса properties/v2/list
     """
-    request_data = {
-        "user_id": user.user_id,
+    return {
+        "user_id": user_id,
         "currency": "USD",
         "eapid": 1,
         "locale": "en_US",
         "siteId": 300000001,
-        "destination": {"regionId": user.region_id},
+        "destination": {"regionId": region_id},
         "checkInDate": {
-            "day": user.check_in_date.day,
-            "month": user.check_in_date.month,
-            "year": user.check_in_date.year,
+            "day": check_in_date.day,
+            "month": check_in_date.month,
+            "year": check_in_date.year,
         },
         "checkOutDate": {
-            "day": user.check_out_date.day,
-            "month": user.check_out_date.month,
-            "year": user.check_out_date.year,
+            "day": check_out_date.day,
+            "month": check_out_date.month,
+            "year": check_out_date.year,
         },
         "rooms": [{"adults": 2}],
         "resultsStartingIndex": 0,
-        "resultsSize": user.results_size,
+        "resultsSize": LIST_PAGE_SIZE,
         "sort": "PRICE_LOW_TO_HIGH",
         "filters": {"price": {"max": 100000, "min": 1}},
     }
-    results = api_request(method_endswith="properties/v2/list", params=request_data, method_type="POST")
-    found_hotels = results["data"]["propertySearch"]["properties"]
+
+
+def search_lowprice(user_id: int, region_id: str, check_in_date: date, check_out_date: date) -> List[Dict]:
+    """Получает список самых дешевых отелей в городе на указанные даты (не более LIST_PAGE_SIZE).
+
+    :param user_id: Telegram id пользователя
+    :param region_id: id города
+    :param check_in_date: Дата заезда
+    :param check_out_date: Дата выезда
+    :return: Список отелей в формате API
+    :except TypeError: Вызывает исключение, если по запросу ничего не найдено
+    """
+    request_data = lowprice_request_data(user_id, region_id, check_in_date, check_out_date)
+    results = api_request(method_endswith="properties/v2/list", params=request_data, method_type="POST", cache=True)
+    return results["data"]["propertySearch"]["properties"]
+
+
+def get_lowprice_results(user: Users) -> List[Tuple[str, List]]:
+    """Получает результаты поиска отелей с самой низкой ценой по запросу пользователя.
+
+    :param user: Объект класса User (содержит все аттрибуты для выполнения запроса)
+    :return: Список отелей. Каждый отель представлен кортежем из адреса и списка ссылок на фото отеля
+    """
+    found_hotels = search_lowprice(user.user_id, user.region_id, user.check_in_date, user.check_out_date)
     return get_formatted_hotels_info(user=user, all_hotels=found_hotels)
@@ -0,0 +1,191 @@
+"""Учет и ограничение запросов к API сайта Hotels.com.
+
+Каждый запрос к API (кроме ответов из кэша) учитывается по дням, пользователям и endpoint.
+Счетчики сохраняются в БД истории (таблица api_usage) одним запросом не чаще раза в FLUSH_PERIOD секунд
+и при остановке бота, чтобы учет не добавлял запись в БД к каждому запросу к API.
+Суточные лимиты: API_DAILY_LIMIT запросов всего и API_USER_DAILY_LIMIT запросов одного пользователя.
+Перед поиском оценивается его стоимость (количество запросов): если она не укладывается в остаток лимитов,
+поиск отклоняется до обращения к API. Когда за день израсходована доля API_SHED_RATIO общего лимита,
+отклоняются дорогие поиски (от API_EXPENSIVE_COST запросов) и запросы фоновых задач,
+чтобы остаток лимита достался обычным поискам.
+
+Classes:
+    QuotaExceededError: Исключение при исчерпании лимита запросов
+    QuotaManager: Учет и ограничение запросов к API
+
+Functions:
+    estimate_search_cost: Оценивает количество запросов к API для поиска отелей
+"""
+import atexit
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from config_data.config import (API_DAILY_LIMIT, API_EXPENSIVE_COST,
+                                API_SHED_RATIO, API_USER_DAILY_LIMIT)
+from database.history.crud import add_api_usage, get_api_usage
+
+HIGHPRICE_PAGES = 3
+FLUSH_PERIOD = 10
+
+
+class QuotaExceededError(ConnectionError):
+    """Исключение при исчерпании лимита запросов к API.
+
+    Наследуется от ConnectionError, поэтому обработчики, не различающие причины отказа,
+    сообщают пользователю об отсутствии ответа сервера.
+
+    Attributes:
+        hint: Сообщение для пользователя
+    """
+
+    def __init__(self, message: str, hint: str) -> None:
+        """Создает исключение с сообщением для лога и сообщением для пользователя."""
+        super().__init__(message)
+        self.hint = hint
+
+
+def estimate_search_cost(command: str, results_size: int) -> int:
+    """Оценивает количество запросов к API для поиска отелей (без учета кэша).
+
+    :param command: Команда поиска (/lowprice, /highprice или /bestdeal)
+    :param results_size: Количество выводимых отелей (для каждого запрашивается информация об отеле)
+    :return: Оценка количества запросов
+    """
+    if command == "/highprice":
+        return 2 + HIGHPRICE_PAGES + results_size
+    if command == "/bestdeal":
+        return 2 + results_size
+    return 1 + results_size
+
+
+class QuotaManager:
+    """Класс QuotaManager, описывающий учет и ограничение запросов к API.
+
+    Счетчики текущего дня хранятся в памяти и загружаются из БД при первом обращении за день,
+    поэтому перезапуск бота не обнуляет израсходованный лимит (при аварийном завершении теряются
+    только запросы, не сохраненные за последние FLUSH_PERIOD секунд).
+
+    Attributes:
+        daily_limit: Лимит запросов в сутки всего
+        user_limit: Лимит запросов в сутки одного пользователя
+        shed_ratio: Доля общего лимита, после которой отклоняются дорогие поиски и фоновые задачи
+        expensive_cost: Стоимость поиска (в запросах), начиная с которой поиск считается дорогим
+        rejected: Количество отклоненных за день поисков и запросов
+    """
+
+    def __init__(self, daily_limit: int, user_limit: int, shed_ratio: float, expensive_cost: int) -> None:
+        """Создает учет запросов."""
+        self.daily_limit = daily_limit
+        self.user_limit = user_limit
+        self.shed_ratio = shed_ratio
+        self.expensive_cost = expensive_cost
+        self.rejected = 0
+        self._day: Optional[date] = None
+        self._users: Dict[int, int] = dict()
+        self._endpoints: Dict[str, int] = dict()
+        self._unsaved: Dict[Tuple[date, int, str], int] = dict()
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        """Количество запросов за текущий день."""
+        return sum(self._users.values())
+
+    def _roll(self) -> date:
+        """Переходит на новый день: загружает счетчики из БД. Вызывается под блокировкой."""
+        today = date.today()
+        if self._day != today:
+            self._users.clear()
+            self._endpoints.clear()
+            self.rejected = 0
+            for user_id, endpoint, calls in get_api_usage(0, today):
+                self._users[user_id] = self._users.get(user_id, 0) + calls
+                self._endpoints[endpoint] = self._endpoints.get(endpoint, 0) + calls
+            self._day = today
+        return today
+
+    def _check(self, user_id: int, cost: int) -> None:
+        """Проверяет, что cost запросов укладываются в лимиты. Вызывается под блокировкой.
+
+        :except QuotaExceededError: Лимит исчерпан (счетчик отказов увеличивается)
+        """
+        total = self.total
+        if total + cost > self.daily_limit:
+            message, hint = "daily API limit", "Лимит запросов к сайту отелей на сегодня исчерпан⛔️. Повторите завтра"
+        elif user_id != 0 and self._users.get(user_id, 0) + cost > self.user_limit:
+            message, hint = "user daily API limit", "Ваш лимит поисков на сегодня исчерпан⛔️. Повторите завтра"
+        elif (user_id == 0 or cost >= self.expensive_cost) and total + cost > self.daily_limit * self.shed_ratio:
+            message, hint = (
+                "API limit reserved for cheap searches",
+                "Сейчас много запросов⏳. Уменьшите количество отелей или повторите позже",
+            )
+        else:
+            return
+        self.rejected += 1
+        raise QuotaExceededError(f"Rejected {cost} API calls: {message}", hint)
+
+    def admit(self, user_id: int, cost: int) -> None:
+        """Проверяет, что поиск стоимостью cost запросов укладывается в лимиты (запросы не учитываются).
+
+        :param user_id: Telegram id пользователя
+        :param cost: Оценка количества запросов к API
+        :except QuotaExceededError: Поиск отклонен
+        """
+        with self._lock:
+            self._roll()
+            self._check(user_id, cost)
+
+    def charge(self, user_id: int, endpoint: str) -> None:
+        """Учитывает запрос к API, если он укладывается в лимиты.
+
+        :param user_id: Telegram id пользователя (0 - фоновые задачи бота)
+        :param endpoint: Окончание ссылки на endpoint
+        :except QuotaExceededError: Запрос отклонен
+        """
+        with self._lock:
+            today = self._roll()
+            self._check(user_id, 1)
+            self._users[user_id] = self._users.get(user_id, 0) + 1
+            self._endpoints[endpoint] = self._endpoints.get(endpoint, 0) + 1
+            key = (today, user_id, endpoint)
+            self._unsaved[key] = self._unsaved.get(key, 0) + 1
+            due = time.monotonic() - self._flushed >= FLUSH_PERIOD
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Сохраняет в БД запросы, учтенные после предыдущего сохранения."""
+        with self._lock:
+            usage, self._unsaved = self._unsaved, dict()
+            self._flushed = time.monotonic()
+        if usage:
+            add_api_usage(0, usage)
+
+    def remaining(self, user_id: int) -> Tuple[int, int]:
+        """Возвращает остаток лимитов на текущий день.
+
+        :param user_id: Telegram id пользователя
+        :return: Кортеж из остатка лимита пользователя и остатка общего лимита
+        """
+        with self._lock:
+            self._roll()
+            total = self.total
+            return max(self.user_limit - self._users.get(user_id, 0), 0), max(self.daily_limit - total, 0)
+
+    def usage(self, top: int = 5) -> Tuple[Dict[str, int], List[Tuple[int, int]]]:
+        """Возвращает количество запросов за текущий день по endpoint и пользователям, сделавшим больше всего запросов.
+
+        :param top: Количество пользователей
+        :return: Кортеж из словаря {endpoint: запросов} и списка кортежей (Telegram id, запросов)
+        """
+        with self._lock:
+            self._roll()
+            users = sorted(self._users.items(), key=lambda item: item[1], reverse=True)[:top]
+            return dict(self._endpoints), users
+
+
+quota = QuotaManager(API_DAILY_LIMIT, API_USER_DAILY_LIMIT, API_SHED_RATIO, API_EXPENSIVE_COST)
+atexit.register(quota.flush)
@@ -0,0 +1,105 @@
+"""Ранжирует отели для команды bestdeal по цене, расстоянию до центра и оценке гостей.
+
+Показатели всех отелей-кандидатов загружаются в массивы NumPy:
+    1. Парето-фронт - отели, для которых нет другого отеля не дороже, не дальше от центра и с оценкой не ниже,
+       лучшего хотя бы по одному из показателей. Отели упорядочиваются по цене, расстоянию и оценке:
+       первый из оставшихся отелей не доминируется никаким другим и попадает во фронт, а все доминируемые им
+       отели исключаются одной векторной операцией. Число шагов равно размеру фронта (обычно десятки),
+       а не квадрату количества кандидатов.
+    2. Взвешенная оценка - показатели приводятся к [0, 1] (1 - лучшее значение среди кандидатов, 0 - худшее)
+       и складываются с весами BESTDEAL_PRICE_WEIGHT, BESTDEAL_DISTANCE_WEIGHT и BESTDEAL_SCORE_WEIGHT.
+Первыми выводятся отели Парето-фронта, затем остальные, в каждой группе - по убыванию взвешенной оценки
+(при равной оценке - по возрастанию цены).
+
+Functions:
+    hotel_features: Загружает цену, расстояние до центра и оценку отелей в массив
+    pareto_front: Находит отели Парето-фронта
+    weighted_score: Считает взвешенную оценку отелей
+    rank_hotels: Возвращает лучшие отели по Парето-фронту и взвешенной оценке
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+from config_data.config import (BESTDEAL_DISTANCE_WEIGHT,
+                                BESTDEAL_PRICE_WEIGHT, BESTDEAL_SCORE_WEIGHT)
+from utils.hotel_info import parse_price
+
+PRICE, DISTANCE, SCORE = range(3)
+
+
+def hotel_features(hotels: List[Dict[str, Any]]) -> np.ndarray:
+    """Загружает показатели отелей в массив n x 3: цена за ночь, расстояние до центра и оценка гостей.
+
+    Отсутствующая цена заменяется наибольшей ценой среди кандидатов, отсутствующая оценка - нулем.
+
+    :param hotels: Отели из ответа API (properties/v2/list)
+    :return: Массив показателей (float64)
+    """
+    features = np.array(
+        [
+            [
+                parse_price(hotel["price"]["lead"]["formatted"]),
+                hotel["destinationInfo"]["distanceFromDestination"]["value"],
+                (hotel.get("reviews") or dict()).get("score") or 0,
+            ]
+            for hotel in hotels
+        ],
+        dtype=float,
+    ).reshape(-1, 3)
+    prices = features[:, PRICE]
+    missing = np.isnan(prices)
+    if missing.any():
+        prices[missing] = 0 if missing.all() else prices[~missing].max()
+    return features
+
+
+def pareto_front(features: np.ndarray) -> np.ndarray:
+    """Находит отели, не доминируемые другими по цене, расстоянию до центра и оценке.
+
+    :param features: Массив показателей из hotel_features
+    :return: Булев массив: True - отель на Парето-фронте
+    """
+    costs = features * np.array([1.0, 1.0, -1.0])
+    order = np.lexsort(costs.T[::-1])
+    costs = costs[order]
+    front = np.zeros(len(costs), dtype=bool)
+    remaining = np.arange(len(costs))
+    while remaining.size:
+        head, rest = remaining[0], remaining[1:]
+        front[order[head]] = True
+        dominated = (costs[rest] >= costs[head]).all(axis=1) & (costs[rest] > costs[head]).any(axis=1)
+        remaining = rest[~dominated]
+    return front
+
+
+def weighted_score(features: np.ndarray) -> np.ndarray:
+    """Считает взвешенную оценку отелей: нормированные к [0, 1] показатели с весами BESTDEAL_*_WEIGHT.
+
+    :param features: Массив показателей из hotel_features
+    :return: Массив оценок
+    """
+    low = features.min(axis=0)
+    spread = features.max(axis=0) - low
+    spread[spread == 0] = 1
+    normalized = (features - low) / spread
+    return (
+        BESTDEAL_PRICE_WEIGHT * (1 - normalized[:, PRICE])
+        + BESTDEAL_DISTANCE_WEIGHT * (1 - normalized[:, DISTANCE])
+        + BESTDEAL_SCORE_WEIGHT * normalized[:, SCORE]
+    )
+
+
+def rank_hotels(hotels: List[Dict[str, Any]], results_size: int) -> List[Dict[str, Any]]:
+    """Возвращает лучшие отели: сначала Парето-фронт, затем остальные, по убыванию взвешенной оценки.
+
+    :param hotels: Отели-кандидаты из ответа API
+    :param results_size: Количество отелей
+    :return: Не более results_size отелей
+    """
+    if not hotels:
+        return list()
+    features = hotel_features(hotels)
+    front = pareto_front(features)
+    order = np.lexsort((features[:, PRICE], -weighted_score(features), ~front))
+    return [hotels[index] for index in order[:results_size]]
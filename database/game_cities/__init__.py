@@ -3,6 +3,13 @@
 Modules:
     model: Модель базы данных
     crud: Взаимодействие с базой данных
+    city_index: Индекс городов в памяти
+    geo_index: Пространственный индекс координат городов
+    session: Игровые сессии в памяти с отложенной записью в БД
+    leaderboard: Таблица рекордов в памяти
+    migrations: Миграции базы данных
+    importer: Массовая загрузка городов из файла CSV или JSONL
 """
 
-from database.game_cities import crud, model
+from database.game_cities import (city_index, crud, geo_index, importer,
+                                  leaderboard, migrations, model, session)
@@ -0,0 +1,270 @@
+"""Модуль индекса городов игры Города в памяти.
+
+Таблица cities загружается один раз при запуске бота, после чего выбор и проверка городов
+выполняются без запросов к БД. Для подсказок при опечатках строится триграммный индекс названий,
+для поиска ближайших городов - пространственный индекс координат (модуль geo_index).
+
+Classes:
+    PlayedCities: Компактное множество сыгранных городов (битовая маска)
+    CityIndex: Индекс городов по названию и первой букве
+
+Functions:
+    normalize_city_name: Приводит название города к виду для поиска без учета регистра, "ё" и дефисов
+    get_trigrams: Получает множество триграмм нормализованного названия
+    get_city_index: Возвращает индекс городов, загружая его при первом обращении
+"""
+import heapq
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from database.game_cities.geo_index import GeoIndex
+from database.game_cities.model import City, db_game
+
+_SEPARATORS = re.compile(r"[\s\-‐‑–—]+")
+
+
+def normalize_city_name(name: str) -> str:
+    """Приводит название города к виду для поиска: нижний регистр, "ё" как "е", пробелы и тире как дефис.
+
+    :param name: Название города
+    :return: Нормализованное название
+    """
+    return _SEPARATORS.sub("-", name.strip().lower().replace("ё", "е"))
+
+
+def get_trigrams(normalized_name: str) -> FrozenSet[str]:
+    """Получает множество триграмм нормализованного названия, дополненного пробелами по краям.
+
+    :param normalized_name: Нормализованное название города
+    :return: Множество триграмм
+    """
+    padded = f"  {normalized_name} "
+    return frozenset(padded[index: index + 3] for index in range(len(padded) - 2))
+
+
+class PlayedCities:
+    """Класс PlayedCities, описывающий множество сыгранных в одной игре городов.
+
+    Каждому названию города соответствует один бит, поэтому множество занимает около 1 Кб
+    при любом количестве сыгранных городов.
+
+    Attributes:
+        count: Количество сыгранных городов
+    """
+
+    def __init__(self, size: int) -> None:
+        """Создает пустое множество для size городов."""
+        self._bits = bytearray((size >> 3) + 1)
+        self.count: int = 0
+
+    def add(self, number: int) -> None:
+        """Добавляет город с номером number в множество."""
+        if number not in self:
+            self._bits[number >> 3] |= 1 << (number & 7)
+            self.count += 1
+
+    def __contains__(self, number: int) -> bool:
+        """Проверяет, сыгран ли город с номером number."""
+        return bool(self._bits[number >> 3] & (1 << (number & 7)))
+
+    def contains_many(self, numbers: np.ndarray) -> np.ndarray:
+        """Проверяет, сыграны ли города с номерами из массива numbers.
+
+        :return: Булев массив: True - город сыгран
+        """
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        return (bits[numbers >> 3] & (1 << (numbers & 7))) != 0
+
+    def __len__(self) -> int:
+        """Возвращает количество сыгранных городов."""
+        return self.count
+
+
+class CityIndex:
+    """Класс CityIndex, описывающий индекс городов игры в памяти.
+
+    Одноименные города (в разных странах) считаются одним названием: в игре они неразличимы.
+
+    Attributes:
+        names: Список уникальных названий городов. Номер названия в списке используется в PlayedCities
+        city_ids: Список id записей таблицы cities для каждого названия
+        coordinates: Координаты (широта, долгота) первого города с данным названием
+        numbers: Словарь {название города: номер названия}
+        normalized: Словарь {нормализованное название: номер названия}
+        by_letter: Словарь {первая буква: список номеров названий}
+        trigrams: Словарь {триграмма: список номеров названий, содержащих ее}
+        first_letters: Массив первых букв названий (для отбора ближайших городов на букву)
+        geo: Пространственный индекс координат названий
+    """
+
+    random_attempts = 8
+    suggestions_limit = 3
+    nearby_limit = 3
+    candidates_limit = 30
+    min_similarity = 0.4
+
+    def __init__(self, rows: Iterable[Tuple[int, str, float, float]]) -> None:
+        """Создает индекс из строк (id, название, широта, долгота) таблицы cities."""
+        self.names: List[str] = list()
+        self.city_ids: List[List[int]] = list()
+        self.coordinates: List[Tuple[float, float]] = list()
+        self.numbers: Dict[str, int] = dict()
+        self.normalized: Dict[str, int] = dict()
+        self.by_letter: Dict[str, List[int]] = dict()
+        self.trigrams: Dict[str, List[int]] = dict()
+        self._trigrams_count: List[int] = list()
+        for city_id, name, lat, lng in rows:
+            number = self.numbers.get(name)
+            if number is None:
+                number = len(self.names)
+                self.numbers[name] = number
+                self.names.append(name)
+                self.city_ids.append([])
+                self.coordinates.append((lat, lng))
+                self.by_letter.setdefault(name[0].upper(), []).append(number)
+                self._add_trigrams(number, name)
+            self.city_ids[number].append(city_id)
+        self._number_by_id: Dict[int, int] = {
+            city_id: number for number, ids in enumerate(self.city_ids) for city_id in ids
+        }
+        self.first_letters = np.array([name[0].upper() for name in self.names])
+        self.geo = GeoIndex(self.coordinates)
+
+    def _add_trigrams(self, number: int, name: str) -> None:
+        """Добавляет нормализованное название и его триграммы в индекс."""
+        normalized_name = normalize_city_name(name)
+        self.normalized.setdefault(normalized_name, number)
+        name_trigrams = get_trigrams(normalized_name)
+        self._trigrams_count.append(len(name_trigrams))
+        for trigram in name_trigrams:
+            self.trigrams.setdefault(trigram, []).append(number)
+
+    @classmethod
+    def load(cls) -> "CityIndex":
+        """Загружает индекс из таблицы cities одним запросом."""
+        with db_game.atomic():
+            rows = City.select(City.id, City.city, City.lat, City.lng).order_by(City.id).tuples()
+            return cls(rows)
+
+    def __len__(self) -> int:
+        """Возвращает количество уникальных названий городов."""
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        """Проверяет наличие города с названием name."""
+        return name in self.numbers
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Находит город по точному или нормализованному названию (без учета регистра, "ё" и дефисов).
+
+        :param name: Название города, введенное пользователем
+        :return: Номер названия города или None, если город не найден
+        """
+        number = self.numbers.get(name)
+        if number is None:
+            number = self.normalized.get(normalize_city_name(name))
+        return number
+
+    def suggest(self, name: str, first_letter: Optional[str] = None) -> List[int]:
+        """Подбирает города с названиями, похожими на name, по доле общих триграмм (коэффициент Дайса).
+
+        :param name: Название города, введенное пользователем
+        :param first_letter: Если задана, предлагаются только города на эту букву
+        :return: Номера названий городов, начиная с самого похожего
+        """
+        query_trigrams = get_trigrams(normalize_city_name(name))
+        shared: Counter = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigrams.get(trigram, ()))
+        if first_letter is not None:
+            allowed = set(self.by_letter.get(first_letter.upper(), ()))
+            shared = Counter({number: count for number, count in shared.items() if number in allowed})
+        similarities = (
+            (2 * count / (len(query_trigrams) + self._trigrams_count[number]), number)
+            for number, count in shared.most_common(self.candidates_limit)
+        )
+        best = heapq.nlargest(self.suggestions_limit, similarities)
+        return [number for similarity, number in best if similarity >= self.min_similarity]
+
+    def number_by_id(self, city_id: int) -> Optional[int]:
+        """Возвращает номер названия города по id записи таблицы cities."""
+        return self._number_by_id.get(city_id)
+
+    def new_played(self, city_ids: Iterable[int] = ()) -> PlayedCities:
+        """Создает множество сыгранных городов и заполняет его по id записей таблицы cities."""
+        played = PlayedCities(len(self.names))
+        for city_id in city_ids:
+            number = self.number_by_id(city_id)
+            if number is not None:
+                played.add(number)
+        return played
+
+    def random_unplayed(self, first_letter: str, played: PlayedCities) -> Optional[int]:
+        """Выбирает случайный несыгранный город на букву first_letter.
+
+        Пока на букву сыграна меньшая часть городов, выбор занимает O(1) попыток.
+        Если несколько попыток подряд попали в сыгранные города, выбор выполняется из списка несыгранных.
+
+        :param first_letter: Первая буква города
+        :param played: Множество сыгранных городов
+        :return: Номер названия города или None, если все города на эту букву сыграны
+        """
+        candidates = self.by_letter.get(first_letter.upper())
+        if not candidates:
+            return None
+        for _ in range(self.random_attempts):
+            number = random.choice(candidates)
+            if number not in played:
+                return number
+        unplayed = [number for number in candidates if number not in played]
+        return random.choice(unplayed) if unplayed else None
+
+    def nearest(
+        self,
+        number: int,
+        limit: Optional[int] = None,
+        first_letter: Optional[str] = None,
+        played: Optional[PlayedCities] = None,
+    ) -> List[Tuple[int, float]]:
+        """Находит ближайшие к городу number другие города.
+
+        :param number: Номер названия города
+        :param limit: Количество городов (по умолчанию nearby_limit)
+        :param first_letter: Если задана, ищутся только города на эту букву
+        :param played: Если задано, сыгранные города пропускаются
+        :return: Пары (номер названия города, расстояние в км), начиная с ближайшего
+        """
+        def accept(numbers: np.ndarray) -> np.ndarray:
+            mask = numbers != number
+            if first_letter is not None:
+                mask &= self.first_letters[numbers] == first_letter.upper()
+            if played is not None:
+                mask &= ~played.contains_many(numbers)
+            return mask
+
+        lat, lng = self.coordinates[number]
+        return self.geo.nearest(lat, lng, limit or self.nearby_limit, accept)
+
+    def map_link(self, number: int) -> str:
+        """Возвращает название города со ссылкой на google maps в стиле Markdown."""
+        lat, lng = self.coordinates[number]
+        return f"[{self.names[number]}](https://www.google.com/maps/@{lat},{lng},12z)\n"
+
+
+_city_index: Optional[CityIndex] = None
+_city_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    """Возвращает индекс городов, загружая его при первом обращении."""
+    global _city_index
+    if _city_index is None:
+        with _city_index_lock:
+            if _city_index is None:
+                _city_index = CityIndex.load()
+    return _city_index
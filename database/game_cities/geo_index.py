@@ -0,0 +1,150 @@
+"""Модуль пространственного индекса городов игры Города в памяти.
+
+Координаты городов один раз загружаются в массивы NumPy (в радианах), города раскладываются по ячейкам
+сетки широта/долгота размером cell градусов и упорядочиваются по номеру ячейки. Для запроса выбираются
+только ячейки, покрывающие окружность заданного радиуса (с учетом полюсов и линии перемены дат),
+расстояния до городов в них считаются по формуле гаверсинусов одной векторной операцией.
+Поиск ближайших городов расширяет радиус, пока внутри него не окажется нужное количество подходящих городов.
+
+Classes:
+    GeoIndex: Индекс координат городов по ячейкам сетки
+
+Functions:
+    haversine_km: Расстояние по поверхности Земли от точки до массива точек
+"""
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+Accept = Callable[[np.ndarray], np.ndarray]
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Считает расстояние по поверхности Земли от точки до массива точек.
+
+    :param lat: Широта точки, радианы
+    :param lng: Долгота точки, радианы
+    :param lats: Широты точек, радианы
+    :param lngs: Долготы точек, радианы
+    :return: Расстояния, км
+    """
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+    """Класс GeoIndex, описывающий индекс координат городов по ячейкам сетки широта/долгота.
+
+    Attributes:
+        cell: Размер ячейки сетки, градусы
+        start_radius: Начальный радиус поиска ближайших городов, км
+        lats: Широты городов, радианы
+        lngs: Долготы городов, радианы
+    """
+
+    cell = 1.0
+    start_radius = 50.0
+
+    def __init__(self, coordinates: Sequence[Tuple[float, float]]) -> None:
+        """Создает индекс по списку координат (широта, долгота) в градусах; номер города - позиция в списке."""
+        points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        self.lats = np.radians(points[:, 0])
+        self.lngs = np.radians(points[:, 1])
+        self._rows = int(180 / self.cell)
+        self._cols = int(360 / self.cell)
+        rows = np.clip(np.floor((points[:, 0] + 90) / self.cell), 0, self._rows - 1).astype(np.int64)
+        cols = np.floor((points[:, 1] + 180) / self.cell).astype(np.int64) % self._cols
+        keys = rows * self._cols + cols
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    def __len__(self) -> int:
+        """Возвращает количество городов в индексе."""
+        return len(self.lats)
+
+    def _candidates(self, lat: float, lng: float, radius: float) -> Tuple[np.ndarray, bool]:
+        """Выбирает города из ячеек, покрывающих окружность радиуса radius км с центром (lat, lng) в радианах.
+
+        :return: Номера городов и флаг, что выбраны все города индекса
+        """
+        angle = radius / EARTH_RADIUS_KM
+        if angle >= math.pi:
+            return self._order, True
+        lat_low, lat_high = lat - angle, lat + angle
+        row_low = max(int((math.degrees(lat_low) + 90) // self.cell), 0)
+        row_high = min(int((math.degrees(lat_high) + 90) // self.cell), self._rows - 1)
+        if lat_low <= -math.pi / 2 or lat_high >= math.pi / 2:
+            # окружность содержит полюс: подходят все долготы
+            col_runs = [(0, self._cols - 1)]
+        else:
+            half_width = math.degrees(math.asin(math.sin(angle) / math.cos(lat)))
+            col_low = int((math.degrees(lng) - half_width + 180) // self.cell)
+            col_high = int((math.degrees(lng) + half_width + 180) // self.cell)
+            if col_high - col_low + 1 >= self._cols:
+                col_runs = [(0, self._cols - 1)]
+            elif col_low < 0:
+                col_runs = [(0, col_high), (col_low % self._cols, self._cols - 1)]
+            elif col_high >= self._cols:
+                col_runs = [(col_low, self._cols - 1), (0, col_high % self._cols)]
+            else:
+                col_runs = [(col_low, col_high)]
+        if col_runs == [(0, self._cols - 1)]:
+            bounds = [(row_low * self._cols, row_high * self._cols + self._cols - 1)]
+        else:
+            bounds = [
+                (row * self._cols + low, row * self._cols + high)
+                for row in range(row_low, row_high + 1)
+                for low, high in col_runs
+            ]
+        starts = np.searchsorted(self._keys, [low for low, _ in bounds], side="left")
+        ends = np.searchsorted(self._keys, [high for _, high in bounds], side="right")
+        slices = [self._order[start:end] for start, end in zip(starts, ends) if end > start]
+        if not slices:
+            return np.empty(0, dtype=np.int64), False
+        return np.concatenate(slices), False
+
+    def within(self, lat: float, lng: float, radius: float, accept: Optional[Accept] = None) -> List[Tuple[int, float]]:
+        """Находит города на расстоянии не больше radius км от точки.
+
+        :param lat: Широта точки, градусы
+        :param lng: Долгота точки, градусы
+        :param radius: Радиус, км
+        :param accept: Функция, получающая массив номеров городов и возвращающая маску подходящих
+        :return: Пары (номер города, расстояние в км), начиная с ближайшего
+        """
+        lat, lng = math.radians(lat), math.radians(lng)
+        candidates, _ = self._candidates(lat, lng, radius)
+        if accept is not None:
+            candidates = candidates[accept(candidates)]
+        distances = haversine_km(lat, lng, self.lats[candidates], self.lngs[candidates])
+        inside = distances <= radius
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.lexsort((candidates, distances))
+        return [(int(candidates[index]), float(distances[index])) for index in order]
+
+    def nearest(self, lat: float, lng: float, limit: int, accept: Optional[Accept] = None) -> List[Tuple[int, float]]:
+        """Находит limit ближайших к точке городов, расширяя радиус поиска от start_radius.
+
+        :param lat: Широта точки, градусы
+        :param lng: Долгота точки, градусы
+        :param limit: Количество городов
+        :param accept: Функция, получающая массив номеров городов и возвращающая маску подходящих
+        :return: Пары (номер города, расстояние в км), начиная с ближайшего
+        """
+        lat, lng = math.radians(lat), math.radians(lng)
+        radius = self.start_radius
+        while True:
+            candidates, everything = self._candidates(lat, lng, radius)
+            if accept is not None:
+                candidates = candidates[accept(candidates)]
+            distances = haversine_km(lat, lng, self.lats[candidates], self.lngs[candidates])
+            if not everything:
+                inside = distances <= radius
+                if np.count_nonzero(inside) < limit:
+                    radius *= 4
+                    continue
+                candidates, distances = candidates[inside], distances[inside]
+            order = np.lexsort((candidates, distances))[:limit]
+            return [(int(candidates[index]), float(distances[index])) for index in order]
@@ -0,0 +1,172 @@
+"""Модуль массовой загрузки городов в таблицу cities БД игры Города.
+
+Файл CSV или JSONL (в том числе сжатый gzip) читается потоково и загружается пакетами executemany
+во вспомогательную таблицу без индексов. Затем дубликаты по (city, region, country) отбрасываются,
+и новая таблица одной транзакцией занимает место таблицы cities вместе с индексами.
+До этого момента бот продолжает работать со старой таблицей. Города, которые уже были в таблице,
+сохраняют свои id, поэтому сыгранные города в city2player остаются верными.
+Запущенный бот использует индекс городов в памяти, поэтому новые города будут доступны после его перезапуска.
+
+Usage:
+    python -m database.game_cities.importer cities.csv [--chunk-size 50000]
+
+Поля файла: country_en, region_en, city_en, country, region, city, lat, lng, population (необязательно)
+
+Functions:
+    read_records: Потоково читает записи из файла CSV или JSONL
+    import_cities: Загружает города из файла и заменяет ими таблицу cities
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database.game_cities.city_index import normalize_city_name
+from database.game_cities.model import City, db_game
+from utils.logging import logger
+
+TEXT_FIELDS = ("country_en", "region_en", "city_en", "country", "region", "city")
+STAGING_TABLE = "cities_import"
+NEW_TABLE = "cities_new"
+COLUMNS = (
+    '"country_en" VARCHAR(255) NOT NULL, "region_en" VARCHAR(255) NOT NULL, "city_en" VARCHAR(255) NOT NULL, '
+    '"country" VARCHAR(255) NOT NULL, "region" VARCHAR(255) NOT NULL, "city" VARCHAR(255) NOT NULL, '
+    '"city_norm" VARCHAR(255) NOT NULL, "lat" REAL NOT NULL, "lng" REAL NOT NULL, "population" INTEGER'
+)
+FIELDS = '"country_en", "region_en", "city_en", "country", "region", "city", "city_norm", "lat", "lng", "population"'
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    """Открывает текстовый файл, в том числе сжатый gzip."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Потоково читает записи из файла CSV (с заголовком) или JSONL.
+
+    :param path: Путь к файлу. Формат определяется по расширению (.jsonl, .json, .csv, в том числе с .gz)
+    :return: Итератор словарей с полями записи
+    """
+    with _open_text(path) as file:
+        if path.removesuffix(".gz").endswith((".jsonl", ".json")):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def _to_row(record: Dict) -> Optional[Tuple]:
+    """Преобразует запись в строку таблицы или возвращает None, если запись некорректна."""
+    try:
+        texts = tuple(str(record[field]).strip() for field in TEXT_FIELDS)
+        lat, lng = float(record["lat"]), float(record["lng"])
+        population = record.get("population")
+        population = int(float(population)) if population not in (None, "") else None
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not texts[-1]:
+        return None
+    return texts + (normalize_city_name(texts[-1]), lat, lng, population)
+
+
+def _chunks(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    """Делит поток строк на пакеты размером size."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_cities(path: str, chunk_size: int = 50000) -> Dict[str, int]:
+    """Загружает города из файла и заменяет ими таблицу cities.
+
+    При ошибке режим synchronous восстанавливается, а вспомогательные таблицы удаляются.
+
+    :param path: Путь к файлу CSV или JSONL
+    :param chunk_size: Количество строк в одной транзакции загрузки
+    :return: Статистика загрузки: прочитано, отклонено, уникальных, сохранивших id городов
+    """
+    started = time.perf_counter()
+    stats = {"read": 0, "rejected": 0}
+    synchronous = db_game.pragma("synchronous")
+    db_game.pragma("synchronous", "OFF")
+    try:
+        db_game.execute_sql(f'DROP TABLE IF EXISTS "{STAGING_TABLE}"')
+        db_game.execute_sql(f'DROP TABLE IF EXISTS "{NEW_TABLE}"')
+        db_game.execute_sql(f'CREATE TABLE "{STAGING_TABLE}" ({COLUMNS})')
+
+        def rows() -> Iterator[Tuple]:
+            for record in read_records(path):
+                stats["read"] += 1
+                row = _to_row(record)
+                if row is None:
+                    stats["rejected"] += 1
+                    continue
+                yield row
+
+        insert = f'INSERT INTO "{STAGING_TABLE}" ({FIELDS}) VALUES ({", ".join("?" * 10)})'
+        for chunk in _chunks(rows(), chunk_size):
+            with db_game.atomic():
+                db_game.cursor().executemany(insert, chunk)
+        logger.info(f"Cities import: loaded {stats['read']} rows into {STAGING_TABLE}", user_id=0)
+
+        with db_game.atomic():
+            db_game.execute_sql(
+                f'CREATE INDEX "{STAGING_TABLE}_key" ON "{STAGING_TABLE}" ("city", "region", "country")'
+            )
+            max_id = db_game.execute_sql('SELECT COALESCE(MAX("id"), 0) FROM "cities"').fetchone()[0]
+            db_game.execute_sql(f'CREATE TABLE "{NEW_TABLE}" ("id" INTEGER NOT NULL PRIMARY KEY, {COLUMNS})')
+            db_game.execute_sql(
+                f'INSERT INTO "{NEW_TABLE}" ("id", {FIELDS}) '
+                'SELECT COALESCE((SELECT MIN(old."id") FROM "cities" AS old '
+                'WHERE old."city" = s."city" AND old."region" = s."region" AND old."country" = s."country"), '
+                f'? + s.rowid), {", ".join(f"s.{field}" for field in FIELDS.split(", "))} '
+                f'FROM "{STAGING_TABLE}" AS s WHERE s.rowid IN '
+                f'(SELECT MIN(rowid) FROM "{STAGING_TABLE}" GROUP BY "city", "region", "country")',
+                (max_id,),
+            )
+            stats["unique"] = db_game.execute_sql(f'SELECT COUNT(*) FROM "{NEW_TABLE}"').fetchone()[0]
+            stats["kept_ids"] = db_game.execute_sql(
+                f'SELECT COUNT(*) FROM "{NEW_TABLE}" WHERE "id" <= ?', (max_id,)
+            ).fetchone()[0]
+            db_game.execute_sql(f'DROP TABLE "{STAGING_TABLE}"')
+
+        with db_game.atomic():
+            db_game.execute_sql('DROP TABLE "cities"')
+            db_game.execute_sql(f'ALTER TABLE "{NEW_TABLE}" RENAME TO "cities"')
+            City._schema.create_indexes(safe=True)
+        db_game.execute_sql('ANALYZE "cities"')
+    finally:
+        db_game.pragma("synchronous", synchronous)
+        db_game.execute_sql(f'DROP TABLE IF EXISTS "{STAGING_TABLE}"')
+        db_game.execute_sql(f'DROP TABLE IF EXISTS "{NEW_TABLE}"')
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Cities import: {stats['unique']} unique cities ({stats['kept_ids']} kept ids), "
+        f"{stats['rejected']} rejected, {elapsed:.1f} s, {stats['read'] / elapsed:.0f} rows/s",
+        user_id=0,
+    )
+    return stats
+
+
+def main() -> None:
+    """Разбирает аргументы командной строки и запускает загрузку."""
+    parser = argparse.ArgumentParser(description="Массовая загрузка городов в БД игры Города")
+    parser.add_argument("path", help="файл CSV или JSONL (можно сжатый .gz)")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="количество строк в одной транзакции")
+    args = parser.parse_args()
+    import_cities(args.path, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
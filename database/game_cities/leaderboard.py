@@ -0,0 +1,145 @@
+"""Модуль таблицы рекордов игры Города в памяти.
+
+Таблица рекордов загружается из БД одним запросом при первом обращении и далее обновляется
+вместе с изменением рекордов и имен игроков, поэтому ТОП10 и место игрока не требуют запросов к БД.
+
+Classes:
+    LeaderboardEntry: Запись таблицы рекордов
+    Leaderboard: Таблица рекордов
+
+Functions:
+    get_leaderboard: Возвращает таблицу рекордов, загружая ее при первом обращении
+    reset_leaderboard: Сбрасывает таблицу рекордов (например, после очистки БД)
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from database.game_cities.model import Player, db_game
+
+
+class LeaderboardEntry(NamedTuple):
+    """Запись таблицы рекордов.
+
+    Attributes:
+        id: id записи игрока в таблице players (при равенстве очков выше тот, кто зарегистрировался раньше)
+        player_id: Telegram id пользователя
+        nickname: Игровое имя пользователя
+        max_scores: Максимальное количество очков игрока
+    """
+
+    id: int
+    player_id: int
+    nickname: str
+    max_scores: int
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        """Ключ сортировки, совпадающий с индексом (max_scores DESC, id)."""
+        return -self.max_scores, self.id
+
+
+class Leaderboard:
+    """Класс Leaderboard, описывающий таблицу рекордов в памяти.
+
+    Ключи игроков хранятся в отсортированном списке: место игрока находится бинарным поиском за O(log n),
+    ТОП10 кэшируется и сбрасывается только при изменении первых мест. Новый игрок и новый рекорд сдвигают
+    элементы списка (удаление и вставка ключа за O(n), копирование памяти без сравнений), изменение имени
+    не меняет ключ и выполняется за O(1).
+
+    Attributes:
+        top_size: Размер кэшируемого ТОПа
+    """
+
+    top_size = 10
+
+    def __init__(self, entries: List[LeaderboardEntry]) -> None:
+        """Создает таблицу рекордов из записей игроков."""
+        self._entries: Dict[int, LeaderboardEntry] = {entry.player_id: entry for entry in entries}
+        self._keys: List[Tuple[int, int]] = sorted(entry.key for entry in entries)
+        self._by_key: Dict[Tuple[int, int], LeaderboardEntry] = {entry.key: entry for entry in entries}
+        self._top: Optional[List[LeaderboardEntry]] = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls) -> Leaderboard:
+        """Загружает таблицу рекордов из таблицы players."""
+        with db_game.atomic():
+            rows = Player.select(Player.id, Player.player_id, Player.nickname, Player.max_scores).tuples()
+            return cls([LeaderboardEntry(*row) for row in rows])
+
+    def __len__(self) -> int:
+        """Возвращает количество игроков."""
+        return len(self._keys)
+
+    def get(self, player_id: int) -> LeaderboardEntry:
+        """Возвращает запись игрока."""
+        return self._entries[player_id]
+
+    def top(self) -> List[LeaderboardEntry]:
+        """Возвращает ТОП игроков."""
+        with self._lock:
+            if self._top is None:
+                self._top = [self._by_key[key] for key in self._keys[: self.top_size]]
+            return self._top
+
+    def rank(self, player_id: int) -> int:
+        """Возвращает количество игроков, находящихся в таблице рекордов выше игрока."""
+        with self._lock:
+            return bisect_left(self._keys, self._entries[player_id].key)
+
+    def put(self, entry: LeaderboardEntry) -> None:
+        """Добавляет или заменяет запись игрока."""
+        with self._lock:
+            old_entry = self._entries.get(entry.player_id)
+            if old_entry is not None:
+                del self._keys[bisect_left(self._keys, old_entry.key)]
+                del self._by_key[old_entry.key]
+            self._entries[entry.player_id] = entry
+            self._by_key[entry.key] = entry
+            insort(self._keys, entry.key)
+            if self._top is not None and (
+                len(self._top) < self.top_size
+                or entry.key <= self._top[-1].key
+                or (old_entry is not None and old_entry.key <= self._top[-1].key)
+            ):
+                self._top = None
+
+    def record_scores(self, player_id: int, scores: int) -> None:
+        """Обновляет рекорд игрока, если очки текущей игры его превышают."""
+        with self._lock:
+            entry = self._entries[player_id]
+            if scores > entry.max_scores:
+                self.put(entry._replace(max_scores=scores))
+
+    def rename(self, player_id: int, nickname: str) -> None:
+        """Изменяет игровое имя игрока, не меняя его место."""
+        with self._lock:
+            entry = self._entries[player_id]._replace(nickname=nickname)
+            self._entries[player_id] = entry
+            self._by_key[entry.key] = entry
+            if self._top is not None and entry.key <= self._top[-1].key:
+                self._top = None
+
+
+_leaderboard: Optional[Leaderboard] = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard() -> Leaderboard:
+    """Возвращает таблицу рекордов, загружая ее при первом обращении."""
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = Leaderboard.load()
+    return _leaderboard
+
+
+def reset_leaderboard() -> None:
+    """Сбрасывает таблицу рекордов. Она будет загружена из БД при следующем обращении."""
+    global _leaderboard
+    with _leaderboard_lock:
+        _leaderboard = None
@@ -0,0 +1,95 @@
+"""Модуль миграций базы данных игры Города.
+
+Versions:
+    1: Счетчик очков текущей игры в таблице players
+    2: Числовые координаты, нормализованное название и население в таблице cities
+    3: Индексы для ходов игры и таблицы рекордов
+
+Functions:
+    migrate: Применяет недостающие миграции и создает таблицы
+"""
+
+from typing import List
+
+from peewee import SqliteDatabase
+
+from database.migrations import Migration, run_migrations
+
+from .city_index import normalize_city_name
+from .model import City, City2Player, Player, db_game
+
+TABLES = [Player, City, City2Player]
+REPORT_QUERIES = (
+    "SELECT id FROM cities WHERE city = 'Москва'",
+    "SELECT id FROM cities WHERE city_norm = 'москва'",
+    "SELECT id FROM city2player WHERE player_id = 1 AND city_id = 1",
+    "SELECT id FROM players ORDER BY max_scores DESC, id LIMIT 10",
+)
+
+
+def _has_column(database: SqliteDatabase, table: str, column: str) -> bool:
+    """Проверяет наличие колонки column в таблице table."""
+    return any(column_info.name == column for column_info in database.get_columns(table))
+
+
+def _player_scores(database: SqliteDatabase) -> None:
+    """Добавляет в таблицу players счетчик очков текущей игры и заполняет его по таблице city2player."""
+    if not database.table_exists(Player) or _has_column(database, "players", "scores"):
+        return
+    database.execute_sql('ALTER TABLE "players" ADD COLUMN "scores" INTEGER NOT NULL DEFAULT 0')
+    database.execute_sql(
+        'UPDATE "players" SET "scores" = '
+        '(SELECT COUNT(*) FROM "city2player" WHERE "city2player"."player_id" = "players"."id")'
+    )
+
+
+def _typed_cities(database: SqliteDatabase) -> None:
+    """Пересоздает таблицу cities с координатами REAL, нормализованным названием и населением.
+
+    SQLite не изменяет тип существующей колонки, поэтому данные копируются в новую таблицу,
+    которая затем занимает место старой. id городов сохраняются, ссылки из city2player остаются верными.
+    """
+    if not database.table_exists(City):
+        return
+    columns = {column_info.name: column_info.data_type.upper() for column_info in database.get_columns("cities")}
+    if "city_norm" in columns and columns["lat"] == "REAL":
+        return
+    database.register_function(normalize_city_name, "normalize_city_name", 1)
+    database.execute_sql(
+        'CREATE TABLE "cities_v2" ("id" INTEGER NOT NULL PRIMARY KEY, "country_en" VARCHAR(255) NOT NULL, '
+        '"region_en" VARCHAR(255) NOT NULL, "city_en" VARCHAR(255) NOT NULL, "country" VARCHAR(255) NOT NULL, '
+        '"region" VARCHAR(255) NOT NULL, "city" VARCHAR(255) NOT NULL, "city_norm" VARCHAR(255) NOT NULL, '
+        '"lat" REAL NOT NULL, "lng" REAL NOT NULL, "population" INTEGER)'
+    )
+    population = "population" if "population" in columns else "NULL"
+    database.execute_sql(
+        'INSERT INTO "cities_v2" SELECT id, country_en, region_en, city_en, country, region, city, '
+        f"normalize_city_name(city), CAST(lat AS REAL), CAST(lng AS REAL), {population} FROM cities"
+    )
+    database.execute_sql('DROP TABLE "cities"')
+    database.execute_sql('ALTER TABLE "cities_v2" RENAME TO "cities"')
+    City._schema.create_indexes(safe=True)
+
+
+def _game_indexes(database: SqliteDatabase) -> None:
+    """Создает составной индекс (player_id, city_id) таблицы city2player и индекс рекордов таблицы players."""
+    for model in (City2Player, Player):
+        if database.table_exists(model):
+            model._schema.create_indexes(safe=True)
+
+
+MIGRATIONS: List[Migration] = [
+    (1, "running scores in players", _player_scores),
+    (2, "typed coordinates, normalized names and population in cities", _typed_cities),
+    (3, "indexes for moves and leaderboard", _game_indexes),
+]
+
+
+def migrate() -> None:
+    """Применяет недостающие миграции к БД игры и создает отсутствующие таблицы и индексы.
+
+    Миграции проверяют текущую схему, поэтому безопасны как для развернутой БД, так и для новой.
+    Изменения планов выполнения основных запросов игры выводятся в лог.
+    """
+    run_migrations(db_game, MIGRATIONS, REPORT_QUERIES)
+    db_game.create_tables(TABLES, safe=True)
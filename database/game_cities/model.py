@@ -9,8 +9,8 @@ Classes:
     City2Player: Класс, определяющий таблицу соответствия игроков названным в игре городам
 """
 
-from peewee import (BigIntegerField, CharField, ForeignKeyField, IntegerField,
-                    Model, SqliteDatabase)
+from peewee import (BigIntegerField, CharField, FloatField, ForeignKeyField,
+                    IntegerField, Model, SqliteDatabase)
 
 db_game = SqliteDatabase("database/game_cities/game.db")
 
@@ -34,6 +34,7 @@ class City(BaseModel):
         country: Название страны на русском
         region: Название региона на русском
         city: Название города на русском
+        city_norm: Нормализованное название города на русском (без учета регистра, "ё" и дефисов)
         lat: Широта (города)
         lng = Долгота (города)
         population: Население города
@@ -44,10 +45,11 @@ class City(BaseModel):
     city_en = CharField()
     country = CharField()
     region = CharField()
-    city = CharField()
-    lat = CharField()
-    lng = CharField()
-    population = IntegerField
+    city = CharField(index=True)
+    city_norm = CharField(default="", index=True)
+    lat = FloatField()
+    lng = FloatField()
+    population = IntegerField(null=True)
 
     class Meta:
         """Класс Meta."""
@@ -61,11 +63,13 @@ class Player(BaseModel):
     Attributes:
         player_id: id Telegram аккаунта пользователя
         max_scores: Максимальное количество очков игрока
+        scores: Количество очков игрока в текущей игре
         nickname: Игровое имя пользователя
     """
 
     player_id = BigIntegerField(unique=True)
     max_scores = IntegerField()
+    scores = IntegerField(default=0)
     nickname = CharField()
 
     class Meta:
@@ -74,6 +78,9 @@ class Player(BaseModel):
         table_name = "players"
 
 
+Player.add_index(Player.max_scores.desc(), Player.id, name="player_max_scores_desc_id")
+
+
 class City2Player(BaseModel):
     """Класс, описывающий структуру таблицы city2player БД.
 
@@ -91,3 +98,4 @@ class City2Player(BaseModel):
         """Класс Meta."""
 
         table_name = "city2player"
+        indexes = ((("player_id", "city_id"), False),)
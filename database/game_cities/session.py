@@ -0,0 +1,272 @@
+"""Модуль игровых сессий игры Города в памяти с отложенной записью в БД.
+
+Во время игры последний город, множество сыгранных городов и очки игрока хранятся в памяти.
+Изменения записываются в таблицы city2player и players фоновым потоком пакетами; пакет, который не удалось
+записать, записывается повторно до освобождения ожидающих flush.
+Сессия удаляется из памяти по окончании игры и после idle_timeout секунд без ходов. После перезапуска бота
+или удаления сессии она восстанавливается из БД при следующем ходе игрока.
+Количество и объем загруженных сессий учитываются в отчете о расходе памяти.
+
+Classes:
+    PersistWriter: Фоновая пакетная запись изменений игровых сессий в БД
+    GameSession: Игровая сессия игрока
+
+Functions:
+    get_last_letter: Получает букву, на которую должен начинаться следующий город
+"""
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from peewee import fn
+
+from database.game_cities.city_index import PlayedCities, get_city_index
+from database.game_cities.leaderboard import get_leaderboard
+from database.game_cities.model import City2Player, Player, db_game
+from utils.logging import logger
+from utils.memory import deep_size, register_gauge
+
+
+def get_last_letter(city: Optional[str]) -> Optional[str]:
+    """Получает последнюю букву города (предпоследнюю, если последняя 'Ъ' или 'Ь').
+
+    :param city: Название города
+    :return: Буква в верхнем регистре или None, если город не задан
+    """
+    if city:
+        last_letter = city[-1].upper()
+        if last_letter in "ЪЬ":
+            last_letter = city[-2].upper()
+        return last_letter
+    return None
+
+
+class PersistWriter:
+    """Класс PersistWriter, записывающий изменения игровых сессий в БД в фоновом потоке.
+
+    Операции применяются в порядке поступления: добавленные подряд города записываются одним insert_many,
+    все накопленные операции выполняются в одной транзакции. При ошибке записи транзакция откатывается
+    и пакет записывается повторно (не больше max_attempts раз) до приема следующих операций.
+
+    Attributes:
+        flush_interval: Максимальное время (сек.) ожидания накопления операций
+        batch_size: Максимальное количество операций в одной транзакции
+        max_attempts: Количество попыток записи пакета
+        retry_delay: Пауза (сек.) перед первой повторной попыткой, удваивается с каждой попыткой
+    """
+
+    flush_interval = 1.0
+    batch_size = 200
+    max_attempts = 5
+    retry_delay = 0.1
+
+    def __init__(self) -> None:
+        """Создает очередь операций и запускает фоновый поток записи."""
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="game-persist-writer", daemon=True)
+        self._thread.start()
+
+    def add_cities(self, player_db_id: int, city_ids: List[int]) -> None:
+        """Ставит в очередь запись сыгранного города."""
+        self._queue.put(("add", player_db_id, city_ids))
+
+    def finish_game(self, player_db_id: int, max_scores: int) -> None:
+        """Ставит в очередь удаление сыгранных городов и сохранение рекорда игрока."""
+        self._queue.put(("finish", player_db_id, max_scores))
+
+    def flush(self) -> None:
+        """Блокирует вызывающий поток до записи всех операций, поставленных в очередь ранее."""
+        done = threading.Event()
+        self._queue.put(("flush", done, None))
+        done.wait()
+
+    def _run(self) -> None:
+        """Забирает операции из очереди и записывает их пакетами."""
+        while True:
+            operations = [self._queue.get()]
+            while len(operations) < self.batch_size and operations[-1][0] != "flush":
+                try:
+                    operations.append(self._queue.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    break
+            self._write_with_retry(operations)
+            for action, done, _ in operations:
+                if action == "flush":
+                    done.set()
+
+    def _write_with_retry(self, operations: List[Tuple]) -> None:
+        """Записывает пакет операций, повторяя запись при ошибке. Неудачный пакет записывается в лог полностью."""
+        delay = self.retry_delay
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._write(operations)
+                return
+            except Exception as exc:
+                logger.error(f"Game persist writer attempt {attempt}: {exc}", user_id=0)
+                if attempt < self.max_attempts:
+                    time.sleep(delay)
+                    delay *= 2
+        lost = [operation for operation in operations if operation[0] != "flush"]
+        logger.critical(f"Game persist writer dropped {len(lost)} operations: {lost}", user_id=0)
+
+    @staticmethod
+    def _write(operations: List[Tuple]) -> None:
+        """Применяет пакет операций в одной транзакции."""
+        rows: List[Dict] = list()
+        with db_game.atomic():
+            for action, player_db_id, value in operations:
+                if action == "add":
+                    rows.extend({"city_id": city_id, "player_id": player_db_id} for city_id in value)
+                    Player.update(scores=Player.scores + len(value)).where(Player.id == player_db_id).execute()
+                    continue
+                if rows:
+                    City2Player.insert_many(rows).execute()
+                    rows = list()
+                if action == "finish":
+                    City2Player.delete().where(City2Player.player_id == player_db_id).execute()
+                    max_scores = fn.MAX(Player.max_scores, value)
+                    Player.update(max_scores=max_scores, scores=0).where(Player.id == player_db_id).execute()
+            if rows:
+                City2Player.insert_many(rows).execute()
+
+
+class GameSession:
+    """Класс GameSession, описывающий текущую игру игрока.
+
+    Attributes:
+        player_id: Telegram id пользователя
+        player_db_id: id записи игрока в таблице players
+        played: Множество сыгранных городов
+        last_city: Номер названия последнего сыгранного города в индексе городов
+        scores: Очки игрока в текущей игре
+        lock: Блокировка, исключающая одновременную обработку ходов игрока
+        last_used: Время последнего обращения к сессии (time.monotonic)
+        all_sessions: Словарь со всеми загруженными игровыми сессиями
+        writer: Фоновая запись изменений в БД
+        idle_timeout: Время (сек.) без обращений, после которого сессия удаляется из памяти
+    """
+
+    all_sessions: Dict[int, GameSession] = dict()
+    writer: Optional[PersistWriter] = None
+    idle_timeout = 3600.0
+    _sessions_lock = threading.Lock()
+    _evicted = time.monotonic()
+
+    def __init__(self, player_id: int, player_db_id: int, played: PlayedCities, last_city: Optional[int], scores: int):
+        """Создает игровую сессию."""
+        self.player_id: int = player_id
+        self.player_db_id: int = player_db_id
+        self.played: PlayedCities = played
+        self.last_city: Optional[int] = last_city
+        self.scores: int = scores
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    @classmethod
+    def get(cls, player_id: int) -> GameSession:
+        """Получает игровую сессию игрока, при необходимости восстанавливая ее из БД.
+
+        Не чаще раза в idle_timeout секунд удаляет из памяти сессии, к которым не обращались idle_timeout секунд.
+        """
+        session = cls.all_sessions.get(player_id)
+        if session is None:
+            # изменения, поставленные в очередь до удаления сессии из памяти, должны попасть в БД до ее восстановления
+            cls.get_writer().flush()
+            with cls._sessions_lock:
+                session = cls.all_sessions.get(player_id)
+                if session is None:
+                    cls._evict_idle()
+                    session = cls._restore(player_id)
+                    cls.all_sessions[player_id] = session
+        session.last_used = time.monotonic()
+        return session
+
+    @classmethod
+    def _evict_idle(cls) -> None:
+        """Удаляет сессии без обращений дольше idle_timeout секунд. Вызывается под блокировкой _sessions_lock."""
+        now = time.monotonic()
+        if now - cls._evicted < cls.idle_timeout:
+            return
+        cls._evicted = now
+        idle = [
+            player_id for player_id, session in cls.all_sessions.items() if now - session.last_used > cls.idle_timeout
+        ]
+        for player_id in idle:
+            del cls.all_sessions[player_id]
+        if idle:
+            logger.info(f"Evicted {len(idle)} idle game sessions", user_id=0)
+
+    @classmethod
+    def _restore(cls, player_id: int) -> GameSession:
+        """Восстанавливает игровую сессию из таблиц players и city2player."""
+        city_index = get_city_index()
+        with db_game.atomic():
+            player = Player.get(player_id=player_id)
+            city_ids = [
+                city_id
+                for city_id, in City2Player.select(City2Player.city_id)
+                .where(City2Player.player_id == player.id)
+                .order_by(City2Player.id)
+                .tuples()
+            ]
+        last_city = city_index.number_by_id(city_ids[-1]) if city_ids else None
+        logger.info(f"Game session restored, {len(city_ids)} played cities", user_id=player_id)
+        return cls(player_id, player.id, city_index.new_played(city_ids), last_city, player.scores)
+
+    @classmethod
+    def get_writer(cls) -> PersistWriter:
+        """Возвращает фоновую запись изменений, запуская ее при первом обращении."""
+        if cls.writer is None:
+            with cls._sessions_lock:
+                if cls.writer is None:
+                    cls.writer = PersistWriter()
+                    atexit.register(cls.writer.flush)
+        return cls.writer
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """Записывает накопленные изменения и удаляет все сессии из памяти (например, перед очисткой БД)."""
+        cls.get_writer().flush()
+        with cls._sessions_lock:
+            cls.all_sessions.clear()
+
+    @property
+    def last_letter(self) -> Optional[str]:
+        """Буква, на которую должен начинаться следующий город, или None в начале игры."""
+        if self.last_city is None:
+            return None
+        return get_last_letter(get_city_index().names[self.last_city])
+
+    def play(self, number: int) -> None:
+        """Отмечает город сыгранным и ставит его запись в очередь."""
+        city_ids = get_city_index().city_ids[number]
+        self.played.add(number)
+        self.last_city = number
+        self.scores += len(city_ids)
+        self.get_writer().add_cities(self.player_db_id, city_ids)
+
+    def finish(self, win_scores: int = 0) -> int:
+        """Завершает игру: ставит в очередь сохранение рекорда и очистку сыгранных городов, удаляет сессию из памяти.
+
+        :param win_scores: Количество очков, которое дополнительно добавляется, если пользователь выиграл
+        :return: Количество очков пользователя в завершенной игре
+        """
+        scores = self.scores + win_scores
+        self.get_writer().finish_game(self.player_db_id, scores)
+        get_leaderboard().record_scores(self.player_id, scores)
+        self.played = get_city_index().new_played()
+        self.last_city = None
+        self.scores = 0
+        with self._sessions_lock:
+            if self.all_sessions.get(self.player_id) is self:
+                del self.all_sessions[self.player_id]
+        return scores
+
+
+register_gauge(
+    "GameSession.all_sessions", lambda: (len(GameSession.all_sessions), deep_size(GameSession.all_sessions))
+)
@@ -3,6 +3,9 @@
 Modules:
     model: Модель базы данных
     crud: Взаимодействие с базой данных
+    migrations: Миграции базы данных
+    maintenance: Архивирование старых запросов и сжатие базы данных
+    export: Выгрузка истории запросов в файл
 """
 
-from . import crud, model
+from . import crud, export, maintenance, migrations, model
@@ -1,23 +1,46 @@
 """Модуль взаимодействия с базой данных истории запросов.
 
+Транзакции записи начинаются с блокировки БД на запись (BEGIN IMMEDIATE): при одновременной записи
+из нескольких потоков они ждут освобождения блокировки, а не получают ошибку "database is locked"
+при повышении блокировки чтения до блокировки записи.
+
 Functions:
     try_open_db: Декоратор для попыток подключения к БД
     add_result_to_db: Добавить результаты поиска в БД
     add_request_to_db: Добавить запрос пользователя в БД
     get_requests_from_db: Получить запросы пользователя из БД
     get_results_from_db:  Получить результаты поиск по запросу пользователя из БД
+    get_price_percentiles: Получить процентили цены за ночь по всем результатам поиска
+    get_popular_regions: Получить самые популярные города поиска
+    get_popular_searches: Получить самые частые предстоящие сочетания города и дат поиска
+    add_price_watch: Оформить подписку на снижение цены по запросу пользователя
+    cancel_price_watch: Отменить подписку на снижение цены
+    cancel_user_price_watches: Отменить все подписки пользователя
+    expire_price_watches: Отменить подписки с прошедшей датой заезда
+    get_due_watch_groups: Получить группы подписок (город, даты), цену которых пора проверить
+    get_group_watches: Получить действующие подписки группы
+    update_watch_prices: Сохранить результат проверки цены для подписок
+    load_scheduler_state: Получить состояние фоновой задачи
+    save_scheduler_state: Сохранить состояние фоновой задачи
+    add_api_usage: Сохранить количество запросов к API
+    get_api_usage: Получить количество запросов к API за день
 """
 import functools
+import math
 from collections.abc import Callable
-from time import sleep
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from time import perf_counter, sleep
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import peewee
 
 from states.users import Users
 from utils.logging import logger
 
-from .model import Request, Result, User, db
+from .model import (ApiUsage, PriceWatch, Request, Result, SchedulerState,
+                    User, db)
+
+MAX_PRICE_WATCHES = 5
 
 
 def try_open_db(func: Callable) -> Callable:
@@ -31,10 +54,13 @@ def try_open_db(func: Callable) -> Callable:
             user_id = args[0]
         else:
             user_id = args[0][0]["request_id"].user.user_id
+        started = perf_counter()
         while True:
             try:
                 result = func(*args, **kwargs)
-                logger.success(f"{func.__name__} completed successfully", user_id=user_id)
+                logger.success(
+                    f"{func.__name__} completed successfully in {perf_counter() - started:.3f} s", user_id=user_id
+                )
                 return result
             except peewee.OperationalError as exc:
                 logger.debug(f"{func.__name__} {exc}", user_id=user_id)
@@ -49,7 +75,7 @@ def add_result_to_db(results: List[Dict]) -> None:
 
     :param results: Список результатов поиска. Каждый результат - словарь
     """
-    with db.atomic():
+    with db.atomic("IMMEDIATE"):
         Result.insert_many(results).execute()
 
 
@@ -59,7 +85,7 @@ def add_request_to_db(user: Users) -> None:
 
     :param user: Объект класса User, атрибуты которого содержат полную информацию о запросе
     """
-    with db.atomic():
+    with db.atomic("IMMEDIATE"):
         user_db = User.get_or_create(user_id=user.user_id)
         user_requests = Request.select().join(User).order_by(Request.created_time).where(User.user_id == user.user_id)
 
@@ -109,3 +135,306 @@ def get_results_from_db(user_id: int, request_id: int) -> peewee.ModelSelect:
     with db.atomic():
         results = Result.select().where(Result.request_id == request_id)
     return results
+
+
+@try_open_db
+def get_price_percentiles(user_id: int, percentiles: Sequence[int]) -> Tuple[int, Dict[int, float]]:
+    """Получает процентили цены за ночь по всем результатам поиска.
+
+    Процентили вычисляются методом ближайшего ранга: каждое значение выбирается запросом
+    с OFFSET по индексу на колонке price, без загрузки всех цен в память.
+
+    :param user_id: Telegram id пользователя, запросившего статистику
+    :param percentiles: Процентили от 1 до 100
+    :return: Кортеж из количества результатов с ценой и словаря {процентиль: цена}
+    """
+    with db.atomic():
+        total = Result.select().where(Result.price.is_null(False)).count()
+        values = dict()
+        if total == 0:
+            return total, values
+        for percentile in percentiles:
+            rank = max(math.ceil(percentile / 100 * total) - 1, 0)
+            values[percentile] = (
+                Result.select(Result.price)
+                .where(Result.price.is_null(False))
+                .order_by(Result.price)
+                .limit(1)
+                .offset(rank)
+                .scalar()
+            )
+    return total, values
+
+
+@try_open_db
+def get_popular_regions(user_id: int, limit: int = 10) -> List[Tuple[str, str, int]]:
+    """Получает самые популярные города поиска.
+
+    Группировка выполняется по составному индексу (region_id, city) таблицы requests.
+
+    :param user_id: Telegram id пользователя, запросившего статистику
+    :param limit: Количество городов
+    :return: Список кортежей (id города, название города, количество запросов)
+    """
+    searches = peewee.fn.COUNT(Request.id)
+    with db.atomic():
+        regions = (
+            Request.select(Request.region_id, peewee.fn.MAX(Request.city), searches)
+            .group_by(Request.region_id)
+            .order_by(searches.desc())
+            .limit(limit)
+            .tuples()
+        )
+        return list(regions)
+
+
+@try_open_db
+def get_popular_searches(user_id: int, since: datetime, limit: int) -> List[Tuple[str, date, date, int]]:
+    """Получает самые частые сочетания города и дат в запросах, созданных после since, с датой заезда не ранее сегодня.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param since: Начало периода истории запросов
+    :param limit: Количество сочетаний
+    :return: Список кортежей (id города, дата заезда, дата выезда, количество запросов)
+    """
+    searches = peewee.fn.COUNT(Request.id)
+    with db.atomic():
+        rows = (
+            Request.select(Request.region_id, Request.check_in_date, Request.check_out_date, searches)
+            .where(Request.created_time >= since, Request.check_in_date >= date.today())
+            .group_by(Request.region_id, Request.check_in_date, Request.check_out_date)
+            .order_by(searches.desc())
+            .limit(limit)
+            .tuples()
+        )
+        return [
+            (region_id, _as_date(check_in_date), _as_date(check_out_date), count)
+            for region_id, check_in_date, check_out_date, count in rows
+        ]
+
+
+@try_open_db
+def add_price_watch(user_id: int, request_id: int) -> Tuple[Optional[PriceWatch], bool]:
+    """Оформляет подписку на снижение цены по запросу пользователя из истории.
+
+    Начальная цена - минимальная цена за ночь среди сохраненных результатов запроса.
+    Повторная подписка на те же город и даты возвращает действующую подписку.
+
+    :param user_id: Telegram id пользователя
+    :param request_id: id запроса из истории
+    :return: Кортеж из подписки (None, если у пользователя уже MAX_PRICE_WATCHES подписок) и признака ее создания
+    """
+    with db.atomic("IMMEDIATE"):
+        request = Request.get_by_id(request_id)
+        user_watches = PriceWatch.select().join(User).where(User.user_id == user_id, PriceWatch.active)
+        existing = user_watches.where(
+            PriceWatch.region_id == request.region_id,
+            PriceWatch.check_in_date == request.check_in_date,
+            PriceWatch.check_out_date == request.check_out_date,
+        ).first()
+        if existing is not None:
+            return existing, False
+        if user_watches.count() >= MAX_PRICE_WATCHES:
+            return None, False
+        last_price = (
+            Result.select(peewee.fn.MIN(Result.price))
+            .where(Result.request_id == request_id, Result.price.is_null(False))
+            .scalar()
+        )
+        watch = PriceWatch.create(
+            user=User.get(User.user_id == user_id),
+            request_id=request_id,
+            region_id=request.region_id,
+            city=request.city,
+            check_in_date=request.check_in_date,
+            check_out_date=request.check_out_date,
+            last_price=last_price,
+            created_time=datetime.now(),
+        )
+    return watch, True
+
+
+@try_open_db
+def cancel_price_watch(user_id: int, watch_id: int) -> bool:
+    """Отменяет подписку пользователя на снижение цены.
+
+    :param user_id: Telegram id пользователя
+    :param watch_id: id подписки
+    :return: True, если подписка была действующей
+    """
+    with db.atomic("IMMEDIATE"):
+        user_ids = User.select(User.id).where(User.user_id == user_id)
+        updated = (
+            PriceWatch.update(active=False)
+            .where(PriceWatch.id == watch_id, PriceWatch.user.in_(user_ids), PriceWatch.active)
+            .execute()
+        )
+    return updated > 0
+
+
+@try_open_db
+def cancel_user_price_watches(user_id: int) -> int:
+    """Отменяет все подписки пользователя на снижение цены (например, если пользователь заблокировал бота).
+
+    :param user_id: Telegram id пользователя
+    :return: Количество отмененных подписок
+    """
+    with db.atomic("IMMEDIATE"):
+        user_ids = User.select(User.id).where(User.user_id == user_id)
+        return PriceWatch.update(active=False).where(PriceWatch.user.in_(user_ids), PriceWatch.active).execute()
+
+
+@try_open_db
+def expire_price_watches(user_id: int) -> int:
+    """Отменяет подписки с прошедшей датой заезда.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :return: Количество отмененных подписок
+    """
+    with db.atomic("IMMEDIATE"):
+        return (
+            PriceWatch.update(active=False)
+            .where(PriceWatch.active, PriceWatch.check_in_date < date.today())
+            .execute()
+        )
+
+
+@try_open_db
+def get_due_watch_groups(user_id: int, checked_before: datetime, limit: int) -> List[Tuple[str, str, date, date]]:
+    """Получает группы действующих подписок с одинаковыми городом и датами, цену которых пора проверить.
+
+    Группа требует проверки, если в ней есть еще не проверенная подписка или последняя проверка была раньше
+    checked_before. Первыми возвращаются группы с непроверенными подписками, затем - проверенные раньше других.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param checked_before: Граница времени последней проверки
+    :param limit: Максимальное количество групп
+    :return: Список кортежей (id города, название города, дата заезда, дата выезда)
+    """
+    unchecked = peewee.fn.MAX(PriceWatch.last_checked.is_null())
+    last_checked = peewee.fn.MIN(PriceWatch.last_checked)
+    with db.atomic():
+        groups = (
+            PriceWatch.select(
+                PriceWatch.region_id,
+                peewee.fn.MAX(PriceWatch.city),
+                PriceWatch.check_in_date,
+                PriceWatch.check_out_date,
+            )
+            .where(PriceWatch.active)
+            .group_by(PriceWatch.region_id, PriceWatch.check_in_date, PriceWatch.check_out_date)
+            .having((unchecked == 1) | (last_checked < checked_before))
+            .order_by(unchecked.desc(), last_checked)
+            .limit(limit)
+            .tuples()
+        )
+        return [
+            (region_id, city, _as_date(check_in_date), _as_date(check_out_date))
+            for region_id, city, check_in_date, check_out_date in groups
+        ]
+
+
+def _as_date(value: Any) -> date:
+    """Преобразует дату из результата запроса с группировкой (строка) в объект date."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+@try_open_db
+def get_group_watches(user_id: int, region_id: str, check_in_date: date, check_out_date: date) -> List[PriceWatch]:
+    """Получает действующие подписки на город и даты вместе с Telegram id пользователей.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param region_id: id города
+    :param check_in_date: Дата заезда
+    :param check_out_date: Дата выезда
+    :return: Список подписок
+    """
+    with db.atomic():
+        return list(
+            PriceWatch.select(PriceWatch, User)
+            .join(User)
+            .where(
+                PriceWatch.active,
+                PriceWatch.region_id == region_id,
+                PriceWatch.check_in_date == check_in_date,
+                PriceWatch.check_out_date == check_out_date,
+            )
+        )
+
+
+@try_open_db
+def update_watch_prices(
+    user_id: int, watch_ids: List[int], checked: datetime, price: Optional[float] = None, priced_ids: Sequence[int] = ()
+) -> None:
+    """Сохраняет результат проверки цены для подписок.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param watch_ids: id проверенных подписок
+    :param checked: Время проверки
+    :param price: Минимальная цена за ночь - новая цена отсчета подписок priced_ids
+    :param priced_ids: id подписок, для которых сохраняется price (у остальных цена отсчета не меняется)
+    """
+    with db.atomic("IMMEDIATE"):
+        PriceWatch.update(last_checked=checked).where(PriceWatch.id.in_(watch_ids)).execute()
+        if price is not None and priced_ids:
+            PriceWatch.update(last_price=price).where(PriceWatch.id.in_(list(priced_ids))).execute()
+
+
+@try_open_db
+def load_scheduler_state(user_id: int, name: str, tokens: float, updated: float) -> Tuple[float, float]:
+    """Получает состояние фоновой задачи, создавая его при первом обращении.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param name: Название задачи
+    :param tokens: Начальный бюджет задачи
+    :param updated: Начальное время обновления бюджета (timestamp)
+    :return: Кортеж из бюджета задачи и времени его обновления
+    """
+    with db.atomic():
+        state, _ = SchedulerState.get_or_create(name=name, defaults={"tokens": tokens, "updated": updated})
+    return state.tokens, state.updated
+
+
+@try_open_db
+def save_scheduler_state(user_id: int, name: str, tokens: float, updated: float) -> None:
+    """Сохраняет состояние фоновой задачи.
+
+    :param user_id: Telegram id пользователя, выполняющего задачу (0 - бот)
+    :param name: Название задачи
+    :param tokens: Бюджет задачи
+    :param updated: Время обновления бюджета (timestamp)
+    """
+    with db.atomic("IMMEDIATE"):
+        SchedulerState.update(tokens=tokens, updated=updated).where(SchedulerState.name == name).execute()
+
+
+@try_open_db
+def add_api_usage(user_id: int, usage: Dict[Tuple[date, int, str], int]) -> None:
+    """Добавляет запросы к API к сохраненному количеству запросов одним запросом к БД.
+
+    :param user_id: Telegram id пользователя, выполняющего запрос (0 - бот)
+    :param usage: Словарь {(дата, Telegram id пользователя, endpoint): количество запросов}
+    """
+    rows = [
+        {"day": day, "user_id": usage_user_id, "endpoint": endpoint, "calls": calls}
+        for (day, usage_user_id, endpoint), calls in usage.items()
+    ]
+    with db.atomic("IMMEDIATE"):
+        ApiUsage.insert_many(rows).on_conflict(
+            conflict_target=[ApiUsage.day, ApiUsage.user_id, ApiUsage.endpoint],
+            update={ApiUsage.calls: ApiUsage.calls + peewee.EXCLUDED.calls},
+        ).execute()
+
+
+@try_open_db
+def get_api_usage(user_id: int, day: date) -> List[Tuple[int, str, int]]:
+    """Получает количество запросов к API за день по пользователям и endpoint.
+
+    :param user_id: Telegram id пользователя, выполняющего запрос (0 - бот)
+    :param day: Дата
+    :return: Список кортежей (Telegram id пользователя, endpoint, количество запросов)
+    """
+    with db.atomic():
+        return list(
+            ApiUsage.select(ApiUsage.user_id, ApiUsage.endpoint, ApiUsage.calls).where(ApiUsage.day == day).tuples()
+        )
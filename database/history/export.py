@@ -0,0 +1,130 @@
+"""Модуль выгрузки истории запросов в файл CSV или JSONL.
+
+История читается пакетами по EXPORT_CHUNK запросов: для каждого пакета выполняется отдельный запрос к БД
+(запросы пакета вместе с результатами поиска), строки которого читаются курсором (.iterator()) без кэширования
+в ModelSelect и сразу записываются в файл. Поэтому расход памяти не зависит от объема истории,
+а блокировка чтения БД удерживается только на время одного пакета и не мешает записи истории обработчиками бота.
+
+CSV: одна строка на результат поиска (запрос без результатов - одна строка с пустыми полями результата).
+JSONL: одна строка JSON на запрос, результаты поиска - в списке results.
+
+Functions:
+    export_history: Записывает историю запросов пользователя (или всех пользователей) в файл
+"""
+import csv
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from peewee import JOIN
+
+from config_data.config import EXPORT_CHUNK
+
+from .crud import try_open_db
+from .model import Request, Result, User
+
+FORMATS = ("csv", "jsonl")
+REQUEST_FIELDS = [
+    "request_id", "user_id", "command", "created_time", "city", "region_id", "check_in_date", "check_out_date",
+    "results_size", "number_of_photos", "min_price", "max_price", "min_distance", "max_distance",
+]
+RESULT_FIELDS = ["property_id", "hotel", "hotel_city", "distance", "price", "total", "currency"]
+
+
+def _iterate_rows(user_id: Optional[int]) -> Iterator[Dict[str, Any]]:
+    """Возвращает строки запросов с результатами поиска, упорядоченные по запросу, пакетами по EXPORT_CHUNK запросов.
+
+    :param user_id: ID пользователя (None - все пользователи)
+    """
+    last_id = 0
+    while True:
+        conditions = [Request.id > last_id]
+        if user_id is not None:
+            conditions.append(User.user_id == user_id)
+        ids = [
+            request_id
+            for request_id, in Request.select(Request.id)
+            .join(User)
+            .where(*conditions)
+            .order_by(Request.id)
+            .limit(EXPORT_CHUNK)
+            .tuples()
+        ]
+        if not ids:
+            return
+        rows = (
+            Request.select(
+                Request.id.alias("request_id"),
+                User.user_id,
+                *(getattr(Request, field) for field in REQUEST_FIELDS[2:]),
+                Result.property_id,
+                Result.name.alias("hotel"),
+                Result.city.alias("hotel_city"),
+                Result.distance,
+                Result.price,
+                Result.total,
+                Result.currency,
+            )
+            .join(User)
+            .switch(Request)
+            .join(Result, JOIN.LEFT_OUTER, on=Result.request_id == Request.id)
+            .where(*conditions[1:], Request.id.between(ids[0], ids[-1]))
+            .order_by(Request.id, Result.id)
+            .dicts()
+        )
+        yield from rows.iterator()
+        last_id = ids[-1]
+
+
+def _write_csv(out: IO[str], rows: Iterator[Dict[str, Any]]) -> int:
+    """Записывает строки в CSV, возвращает количество запросов."""
+    writer = csv.DictWriter(out, fieldnames=REQUEST_FIELDS + RESULT_FIELDS)
+    writer.writeheader()
+    requests = 0
+    last_id = None
+    for row in rows:
+        writer.writerow(row)
+        if row["request_id"] != last_id:
+            requests += 1
+            last_id = row["request_id"]
+    return requests
+
+
+def _write_jsonl(out: IO[str], rows: Iterator[Dict[str, Any]]) -> int:
+    """Записывает строки в JSONL по одной строке на запрос, возвращает количество запросов."""
+    requests = 0
+    request: Optional[Dict[str, Any]] = None
+    results: List[Dict[str, Any]] = list()
+    for row in rows:
+        if request is None or row["request_id"] != request["request_id"]:
+            if request is not None:
+                out.write(json.dumps(dict(request, results=results), ensure_ascii=False, default=str) + "\n")
+                requests += 1
+            request = {field: row[field] for field in REQUEST_FIELDS}
+            results = list()
+        if row["hotel"] is not None:
+            results.append({field: row[field] for field in RESULT_FIELDS})
+    if request is not None:
+        out.write(json.dumps(dict(request, results=results), ensure_ascii=False, default=str) + "\n")
+        requests += 1
+    return requests
+
+
+@try_open_db
+def export_history(user_id: int, out: IO[str], export_format: str, all_users: bool = False) -> int:
+    """Записывает историю запросов с результатами поиска в файл.
+
+    При повторной попытке после ошибки доступа к БД файл записывается заново с начала.
+
+    :param user_id: Telegram id пользователя
+    :param out: Текстовый файл с поддержкой seek и truncate (для CSV без преобразования переводов строк)
+    :param export_format: Формат файла: csv или jsonl
+    :param all_users: Выгрузить историю всех пользователей
+    :return: Количество выгруженных запросов
+    :except ValueError: Неизвестный формат файла
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format {export_format}")
+    out.seek(0)
+    out.truncate()
+    writer = _write_csv if export_format == "csv" else _write_jsonl
+    return writer(out, _iterate_rows(None if all_users else user_id))
@@ -0,0 +1,244 @@
+"""Модуль обслуживания БД истории запросов: архивирование, удаление лишних записей и сжатие файла.
+
+Раз в сутки в час HISTORY_MAINTENANCE_HOUR (и по команде администратора /maintenance):
+    1. Запросы старше HISTORY_ARCHIVE_DAYS дней вместе с результатами поиска дописываются
+       в сжатые файлы по месяцам (HISTORY_ARCHIVE_DIR/requests_ГГГГ-ММ.jsonl.gz, одна строка JSON на запрос)
+       и удаляются из БД.
+    2. Удаляются результаты поиска, запрос которых уже удален (при вытеснении старых запросов пользователя).
+    3. Освободившиеся страницы возвращаются системе (PRAGMA incremental_vacuum), статистика для планировщика
+       запросов обновляется (PRAGMA optimize).
+Каждый шаг выполняется короткими транзакциями по HISTORY_MAINTENANCE_BATCH записей (или страниц) с паузами,
+поэтому запись истории обработчиками бота не блокируется на время обслуживания.
+Для БД, созданной без auto_vacuum = INCREMENTAL, режим включается однократно полным VACUUM при запуске бота
+(migrations.migrate), до начала обработки обновлений; обслуживание выполняет только incremental_vacuum.
+Пакет записывается в архив до удаления из БД: при прерывании обслуживания запросы не теряются,
+но последний пакет может попасть в архив повторно.
+Время последнего обслуживания хранится в таблице scheduler_state.
+
+Classes:
+    MaintenanceReport: Отчет об обслуживании БД
+    HistoryMaintenance: Планировщик обслуживания БД истории
+"""
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from peewee import SqliteDatabase
+
+from config_data.config import (HISTORY_ARCHIVE_DAYS, HISTORY_ARCHIVE_DIR,
+                                HISTORY_MAINTENANCE_BATCH,
+                                HISTORY_MAINTENANCE_HOUR)
+from utils.logging import logger
+
+from .crud import load_scheduler_state, save_scheduler_state
+from .model import Request, Result, User, db
+
+CHECK_PERIOD = 300
+BATCH_PAUSE = 0.05
+INCREMENTAL = 2
+
+
+def database_size(database: SqliteDatabase) -> int:
+    """Возвращает размер файла БД по количеству страниц, байт."""
+    return database.pragma("page_count") * database.pragma("page_size")
+
+
+class MaintenanceReport:
+    """Класс MaintenanceReport, описывающий отчет об обслуживании БД истории.
+
+    Attributes:
+        started: Время начала обслуживания
+        duration: Длительность обслуживания, с
+        archived_requests: Количество перенесенных в архив запросов
+        archived_results: Количество перенесенных в архив результатов поиска
+        orphans: Количество удаленных результатов поиска без запроса
+        size_before: Размер файла БД до обслуживания, байт
+        size_after: Размер файла БД после обслуживания, байт
+        files: Файлы архива, в которые добавлены запросы
+    """
+
+    def __init__(self, started: datetime, size_before: int) -> None:
+        """Создает пустой отчет."""
+        self.started = started
+        self.duration = 0.0
+        self.archived_requests = 0
+        self.archived_results = 0
+        self.orphans = 0
+        self.size_before = size_before
+        self.size_after = size_before
+        self.files: List[str] = list()
+
+    @property
+    def reclaimed(self) -> int:
+        """Освобожденное место, байт."""
+        return self.size_before - self.size_after
+
+    def format(self) -> str:
+        """Форматирует отчет: перенесенные в архив и удаленные записи и освобожденное место."""
+        return (
+            f"History maintenance {self.started:%Y-%m-%d %H:%M}: archived {self.archived_requests} requests "
+            f"with {self.archived_results} results, deleted {self.orphans} orphaned results, "
+            f"reclaimed {self.reclaimed / 1024:.0f} KiB ({self.size_before / 1024:.0f} -> "
+            f"{self.size_after / 1024:.0f} KiB) in {self.duration:.1f} s"
+        )
+
+
+class HistoryMaintenance:
+    """Класс HistoryMaintenance, описывающий планировщик обслуживания БД истории.
+
+    Attributes:
+        name: Название задачи в таблице scheduler_state
+        report: Отчет о последнем обслуживании в текущем запуске бота
+    """
+
+    name = "history_maintenance"
+
+    def __init__(self) -> None:
+        """Создает планировщик."""
+        self.report: Optional[MaintenanceReport] = None
+        self._running = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_due(self, now: datetime) -> bool:
+        """Проверяет, что наступил час обслуживания и за последние сутки БД еще не обслуживалась."""
+        if now.hour != HISTORY_MAINTENANCE_HOUR:
+            return False
+        _, last_run = load_scheduler_state(0, self.name, 0, 0)
+        return now.timestamp() - last_run > 20 * 3600
+
+    def _pause(self) -> bool:
+        """Выдерживает паузу между пакетами. Возвращает False, если планировщик остановлен."""
+        return not self._stop.wait(BATCH_PAUSE)
+
+    @staticmethod
+    def _write_archive(requests: List[Dict[str, Any]], results: Dict[int, List[Dict[str, Any]]]) -> List[str]:
+        """Дописывает запросы с их результатами в файлы архива по месяцам создания запроса.
+
+        :return: Пути к файлам архива
+        """
+        by_month: Dict[str, List[str]] = dict()
+        for request in requests:
+            request["results"] = results.get(request["id"], list())
+            by_month.setdefault(str(request["created_time"])[:7], list()).append(
+                json.dumps(request, ensure_ascii=False, default=str)
+            )
+        archive_dir = Path(HISTORY_ARCHIVE_DIR)
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        paths = list()
+        for month, lines in by_month.items():
+            path = archive_dir / f"requests_{month}.jsonl.gz"
+            with gzip.open(path, "at", encoding="utf-8") as archive:
+                archive.write("\n".join(lines) + "\n")
+            paths.append(str(path))
+        return paths
+
+    def archive(self, report: MaintenanceReport, cutoff: datetime) -> None:
+        """Переносит запросы, созданные раньше cutoff, и их результаты в архив пакетами."""
+        while True:
+            requests = list(
+                Request.select(Request, User.user_id)
+                .join(User)
+                .where(Request.created_time < cutoff)
+                .order_by(Request.id)
+                .limit(HISTORY_MAINTENANCE_BATCH)
+                .dicts()
+            )
+            if not requests:
+                return
+            ids = [request["id"] for request in requests]
+            results: Dict[int, List[Dict[str, Any]]] = dict()
+            for result in Result.select().where(Result.request_id.in_(ids)).dicts():
+                results.setdefault(result["request_id"], list()).append(result)
+            for path in self._write_archive(requests, results):
+                if path not in report.files:
+                    report.files.append(path)
+            with db.atomic("IMMEDIATE"):
+                report.archived_results += Result.delete().where(Result.request_id.in_(ids)).execute()
+                report.archived_requests += Request.delete().where(Request.id.in_(ids)).execute()
+            if not self._pause():
+                return
+
+    def delete_orphans(self, report: MaintenanceReport) -> None:
+        """Удаляет пакетами результаты поиска, запрос которых удален."""
+        while True:
+            ids = [
+                result_id
+                for result_id, in Result.select(Result.id)
+                .where(Result.request_id.not_in(Request.select(Request.id)))
+                .limit(HISTORY_MAINTENANCE_BATCH)
+                .tuples()
+            ]
+            if not ids:
+                return
+            with db.atomic("IMMEDIATE"):
+                report.orphans += Result.delete().where(Result.id.in_(ids)).execute()
+            if not self._pause():
+                return
+
+    def compact(self) -> None:
+        """Возвращает системе свободные страницы файла БД пакетами и обновляет статистику планировщика запросов.
+
+        Без auto_vacuum = INCREMENTAL (включается при запуске бота) свободные страницы остаются в файле.
+        """
+        incremental = db.pragma("auto_vacuum") == INCREMENTAL
+        while incremental and db.pragma("freelist_count") > 0:
+            # execute освобождает за один вызов только одну страницу, executescript выполняет PRAGMA полностью
+            db.connection().executescript(f"PRAGMA incremental_vacuum({HISTORY_MAINTENANCE_BATCH});")
+            if not self._pause():
+                break
+        db.pragma("analysis_limit", 1000)
+        db.execute_sql("PRAGMA optimize").fetchall()
+
+    def run_once(self, now: Optional[datetime] = None) -> Optional[MaintenanceReport]:
+        """Выполняет обслуживание БД и сохраняет время его выполнения.
+
+        :param now: Текущее время (для расчета возраста архивируемых запросов)
+        :return: Отчет об обслуживании (None, если обслуживание уже выполняется)
+        """
+        if not self._running.acquire(blocking=False):
+            return None
+        try:
+            now = now or datetime.now()
+            started = time.perf_counter()
+            report = MaintenanceReport(now, database_size(db))
+            save_scheduler_state(0, self.name, 0, now.timestamp())
+            self.archive(report, now - timedelta(days=HISTORY_ARCHIVE_DAYS))
+            self.delete_orphans(report)
+            self.compact()
+            report.size_after = database_size(db)
+            report.duration = time.perf_counter() - started
+        finally:
+            self._running.release()
+        logger.info(report.format(), user_id=0)
+        self.report = report
+        return report
+
+    def _loop(self) -> None:
+        """Проверяет каждые CHECK_PERIOD секунд, не пора ли обслужить БД, до остановки планировщика."""
+        while not self._stop.is_set():
+            try:
+                if self.is_due(datetime.now()):
+                    self.run_once()
+            except Exception as exc:
+                logger.error(f"History maintenance failed: {exc!r}", user_id=0)
+            self._stop.wait(CHECK_PERIOD)
+
+    def start(self) -> None:
+        """Запускает планировщик в фоновом потоке."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="history_maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает планировщик."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+history_maintenance = HistoryMaintenance()
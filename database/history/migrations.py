@@ -0,0 +1,98 @@
+"""Модуль миграций базы данных истории запросов.
+
+Кроме версионных миграций, для БД, созданной без auto_vacuum = INCREMENTAL, этот режим включается однократно
+полным VACUUM (вне транзакции миграции, до начала обработки обновлений ботом).
+
+Versions:
+    1: Числовые цены, валюта, id отеля и город в таблице results
+    2: Таблицы подписок на снижение цены и состояния фоновых задач
+    3: Таблица учета запросов к API
+
+Functions:
+    migrate: Создает таблицы и применяет недостающие миграции
+"""
+
+from time import perf_counter
+from typing import List
+
+from peewee import SqliteDatabase
+
+from database.migrations import Migration, get_schema_version, run_migrations
+from utils.hotel_info import parse_hotel_link, parse_price
+from utils.logging import logger
+
+from .maintenance import INCREMENTAL
+from .model import (ApiUsage, PriceWatch, Request, Result, SchedulerState,
+                    User, db)
+
+TABLES = [User, Request, Result, PriceWatch, SchedulerState, ApiUsage]
+
+
+def _numeric_results(database: SqliteDatabase) -> None:
+    """Переводит таблицу results на схему с числовыми ценами.
+
+    Строки вида "$123" переводятся в числа, ссылка в стиле Markdown разделяется на название и id отеля,
+    город берется из запроса.
+    """
+    rows = database.execute_sql(
+        "SELECT results.request_id, results.name, results.distance, results.price, results.total, requests.city "
+        "FROM results LEFT JOIN requests ON requests.id = results.request_id ORDER BY results.id"
+    ).fetchall()
+    database.drop_tables([Result])
+    database.create_tables([Result])
+    converted = list()
+    for request_id, link, distance, price, total, city in rows:
+        name, property_id = parse_hotel_link(link)
+        converted.append(
+            {
+                "request_id": request_id,
+                "property_id": property_id,
+                "name": name,
+                "city": city,
+                "distance": distance,
+                "price": parse_price(price),
+                "total": parse_price(total),
+                "currency": "USD",
+            }
+        )
+    for index in range(0, len(converted), 500):
+        Result.insert_many(converted[index: index + 500]).execute()
+
+
+def _price_watches(database: SqliteDatabase) -> None:
+    """Создает таблицы подписок на снижение цены и состояния фоновых задач."""
+    database.create_tables([PriceWatch, SchedulerState], safe=True)
+
+
+def _api_usage(database: SqliteDatabase) -> None:
+    """Создает таблицу учета запросов к API."""
+    database.create_tables([ApiUsage], safe=True)
+
+
+MIGRATIONS: List[Migration] = [
+    (1, "numeric prices in results", _numeric_results),
+    (2, "price watches", _price_watches),
+    (3, "api usage", _api_usage),
+]
+LATEST_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+
+def migrate() -> None:
+    """Создает таблицы БД истории и применяет недостающие миграции.
+
+    Новая БД сразу создается по последней схеме (с auto_vacuum = INCREMENTAL для обслуживания БД),
+    поэтому миграции применяются только к существующим файлам. В существующей БД режим auto_vacuum
+    переключается полным VACUUM: он блокирует БД, поэтому выполняется при запуске, а не при обслуживании.
+    """
+    if not db.table_exists(Result) and get_schema_version(db) == 0:
+        db.pragma("auto_vacuum", INCREMENTAL)
+        db.create_tables(TABLES, safe=True)
+        db.pragma("user_version", LATEST_VERSION)
+        return
+    run_migrations(db, MIGRATIONS)
+    db.create_tables(TABLES, safe=True)
+    if db.pragma("auto_vacuum") != INCREMENTAL:
+        started = perf_counter()
+        db.pragma("auto_vacuum", INCREMENTAL)
+        db.execute_sql("VACUUM")
+        logger.info(f"History DB: incremental auto_vacuum enabled in {perf_counter() - started:.1f} s", user_id=0)
@@ -7,9 +7,13 @@ Classes:
     User: Таблица с данным о пользователе
     Request: Таблица с данными о запросах пользователя
     Result: Таблица с данными о результатах поиска по запросам пользователя
+    PriceWatch: Таблица с подписками пользователей на снижение цены
+    SchedulerState: Таблица с состоянием фоновых задач
+    ApiUsage: Таблица с количеством запросов к API по дням, пользователям и endpoint
 """
-from peewee import (CharField, DateField, DateTimeField, FloatField,
-                    ForeignKeyField, IntegerField, Model, SqliteDatabase)
+from peewee import (BooleanField, CharField, DateField, DateTimeField,
+                    FloatField, ForeignKeyField, IntegerField, Model,
+                    SqliteDatabase)
 
 db = SqliteDatabase("database/history/history.db")
 
@@ -76,6 +80,7 @@ class Request(BaseModel):
         """Класс Meta."""
 
         table_name = "requests"
+        indexes = ((("region_id", "city"), False),)
 
 
 class Result(BaseModel):
@@ -83,19 +88,102 @@ class Result(BaseModel):
 
     Attributes:
         request_id: Ссылка на запрос (объект класса Request, запись таблицы requests) с соответствующим id
+        property_id: id отеля на сайте Hotels.com
         name: Название отеля
+        city: Название города, в котором находится отель
         distance: Расстояние до центра
         price: Цена за ночь в отеле
         total: Общая стоимость проживания
+        currency: Код валюты цены и общей стоимости
     """
 
     request_id = ForeignKeyField(Request)
+    property_id = CharField(null=True)
     name = CharField()
+    city = CharField(null=True)
     distance = FloatField()
-    price = CharField()
-    total = CharField()
+    price = FloatField(null=True, index=True)
+    total = FloatField(null=True)
+    currency = CharField(default="USD")
 
     class Meta:
         """Класс Meta."""
 
         table_name = "results"
+
+
+class PriceWatch(BaseModel):
+    """Класс, описывающий структуру таблицы price_watches БД, содержащую подписки на снижение цены.
+
+    Параметры поиска копируются из запроса, поэтому подписка сохраняется после удаления запроса из истории.
+
+    Attributes:
+        user: Ссылка на пользователя (объект класса User, запись таблицы users)
+        request_id: id запроса из истории, на который оформлена подписка
+        region_id: id города
+        city: Название города
+        check_in_date: Дата заезда
+        check_out_date: Дата выезда
+        last_price: Последняя известная минимальная цена за ночь (None до первой проверки)
+        created_time: Дата и время оформления подписки
+        last_checked: Дата и время последней проверки цены
+        active: Подписка действует
+    """
+
+    user = ForeignKeyField(User)
+    request_id = IntegerField(null=True)
+    region_id = CharField()
+    city = CharField()
+    check_in_date = DateField()
+    check_out_date = DateField()
+    last_price = FloatField(null=True)
+    created_time = DateTimeField()
+    last_checked = DateTimeField(null=True)
+    active = BooleanField(default=True)
+
+    class Meta:
+        """Класс Meta."""
+
+        table_name = "price_watches"
+        indexes = ((("active", "region_id", "check_in_date", "check_out_date"), False),)
+
+
+class SchedulerState(BaseModel):
+    """Класс, описывающий структуру таблицы scheduler_state БД, содержащую состояние фоновых задач.
+
+    Attributes:
+        name: Название задачи
+        tokens: Количество доступных запросов к API (бюджет задачи)
+        updated: Время последнего обновления бюджета (timestamp)
+    """
+
+    name = CharField(unique=True)
+    tokens = FloatField()
+    updated = FloatField()
+
+    class Meta:
+        """Класс Meta."""
+
+        table_name = "scheduler_state"
+
+
+class ApiUsage(BaseModel):
+    """Класс, описывающий структуру таблицы api_usage БД, содержащую количество запросов к API Hotels.com.
+
+    Attributes:
+        day: Дата
+        user_id: Telegram id пользователя (0 - фоновые задачи бота)
+        endpoint: Окончание ссылки на endpoint
+        calls: Количество запросов
+    """
+
+    day = DateField()
+    user_id = IntegerField()
+    endpoint = CharField()
+    calls = IntegerField(default=0)
+
+    class Meta:
+        """Класс Meta."""
+
+        table_name = "api_usage"
+        indexes = ((("day", "user_id", "endpoint"), True),)
@@ -0,0 +1,72 @@
+"""Модуль версионных миграций баз данных SQLite.
+
+Номер версии схемы хранится в PRAGMA user_version файла базы данных.
+
+Functions:
+    get_schema_version: Получает текущую версию схемы БД
+    explain_query_plan: Получает план выполнения запроса
+    run_migrations: Применяет к БД недостающие миграции
+"""
+
+from typing import Callable, Sequence, Tuple
+
+from peewee import OperationalError, SqliteDatabase
+
+from utils.logging import logger
+
+Migration = Tuple[int, str, Callable[[SqliteDatabase], None]]
+
+
+def get_schema_version(database: SqliteDatabase) -> int:
+    """Получает текущую версию схемы БД.
+
+    :param database: База данных SQLite
+    :return: Номер версии схемы (0, если миграции еще не применялись)
+    """
+    return database.pragma("user_version") or 0
+
+
+def explain_query_plan(database: SqliteDatabase, sql: str) -> str:
+    """Получает план выполнения запроса.
+
+    :param database: База данных SQLite
+    :param sql: Текст запроса
+    :return: Шаги плана через "; " или текст ошибки, если запрос не может быть выполнен на текущей схеме
+    """
+    try:
+        rows = database.execute_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    except OperationalError as exc:
+        return f"error: {exc}"
+    return "; ".join(row[-1] for row in rows)
+
+
+def run_migrations(
+    database: SqliteDatabase, migrations: Sequence[Migration], report_queries: Sequence[str] = ()
+) -> int:
+    """Применяет к БД миграции с номером версии больше текущего.
+
+    Каждая миграция выполняется в отдельной транзакции вместе с обновлением номера версии,
+    поэтому прерванный запуск можно безопасно повторить.
+    Если миграции применялись, в лог выводятся изменившиеся планы выполнения запросов report_queries.
+
+    :param database: База данных SQLite
+    :param migrations: Последовательность миграций (номер версии, описание, функция миграции)
+    :param report_queries: Запросы, планы выполнения которых сравниваются до и после миграций
+    :return: Номер версии схемы после применения миграций
+    """
+    version = get_schema_version(database)
+    pending = [migration for migration in sorted(migrations, key=lambda item: item[0]) if migration[0] > version]
+    if not pending:
+        return version
+    plans_before = {sql: explain_query_plan(database, sql) for sql in report_queries}
+    for migration_version, description, migration in pending:
+        with database.atomic():
+            migration(database)
+            database.pragma("user_version", migration_version)
+        version = migration_version
+        logger.info(f"Migration {database.database} v{version}: {description}", user_id=0)
+    for sql in report_queries:
+        plan_after = explain_query_plan(database, sql)
+        if plan_after != plans_before[sql]:
+            logger.info(f"Query plan {sql!r}: {plans_before[sql]} -> {plan_after}", user_id=0)
+    return version
@@ -0,0 +1,195 @@
+"""Модуль предварительного заполнения кэша ответов API в часы низкой нагрузки.
+
+Раз в сутки в часы PREWARM_HOURS из истории запросов за последние PREWARM_LOOKBACK дней выбираются
+самые частые предстоящие сочетания города и дат. Для них запрашиваются список самых дешевых отелей
+и информация о первых PREWARM_DETAILS отелях списка - не чаще PREWARM_RATE запросов в минуту.
+Записи хранятся в кэше PREWARM_TTL часов, поэтому утренние поиски по популярным городам не обращаются к API.
+Время последнего заполнения хранится в БД истории (таблица scheduler_state).
+
+После заполнения в лог (при следующем заполнении) и администратору по команде /stats выводится отчет:
+сколько записей добавлено и какая доля обращений к кэшу с тех пор пришлась на эти записи.
+
+Classes:
+    PrewarmReport: Отчет о заполнении кэша
+    CachePrewarmer: Планировщик заполнения кэша
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from config_data.config import (PREWARM_DETAILS, PREWARM_HOURS, PREWARM_LIMIT,
+                                PREWARM_LOOKBACK, PREWARM_RATE, PREWARM_TTL)
+from database.api_requests.cache import api_cache, cache_key
+from database.api_requests.common import api_request
+from database.api_requests.details import details_request_data
+from database.api_requests.lowprice import lowprice_request_data
+from database.history.crud import (get_popular_searches, load_scheduler_state,
+                                   save_scheduler_state)
+from utils.logging import logger
+
+PREWARM_SOURCE = "prewarm"
+CHECK_PERIOD = 300
+
+
+class PrewarmReport:
+    """Класс PrewarmReport, описывающий отчет о заполнении кэша.
+
+    Attributes:
+        started: Время начала заполнения
+        duration: Длительность заполнения, с
+        searches: Количество сочетаний города и дат
+        lists: Количество добавленных списков отелей
+        details: Количество добавленных описаний отелей
+        skipped: Количество записей, уже находившихся в кэше
+        hits: Количество попаданий в кэш (всего и в добавленные записи) на момент окончания заполнения
+        lookups: Количество обращений к кэшу на момент окончания заполнения
+    """
+
+    def __init__(self, started: datetime) -> None:
+        """Создает пустой отчет."""
+        self.started = started
+        self.duration = 0.0
+        self.searches = 0
+        self.lists = 0
+        self.details = 0
+        self.skipped = 0
+        self.hits = 0
+        self.lookups = 0
+
+    def finish(self, started: float) -> None:
+        """Запоминает длительность заполнения и счетчики кэша на момент его окончания."""
+        self.duration = time.perf_counter() - started
+        self.hits = api_cache.hits_by_source.get(PREWARM_SOURCE, 0)
+        self.lookups = api_cache.hits + api_cache.misses
+
+    def format(self) -> str:
+        """Форматирует отчет: добавленные записи и доля обращений к кэшу, пришедшихся на них с момента заполнения."""
+        lookups = api_cache.hits + api_cache.misses - self.lookups
+        hits = api_cache.hits_by_source.get(PREWARM_SOURCE, 0) - self.hits
+        rate = hits / lookups if lookups else 0.0
+        return (
+            f"Prewarm {self.started:%Y-%m-%d %H:%M}: {self.searches} searches, {self.lists} lists, "
+            f"{self.details} details, {self.skipped} already cached in {self.duration:.0f} s; "
+            f"since then {hits} of {lookups} cache lookups hit prewarmed entries ({rate:.0%})"
+        )
+
+
+class CachePrewarmer:
+    """Класс CachePrewarmer, описывающий планировщик заполнения кэша в часы низкой нагрузки.
+
+    Attributes:
+        name: Название задачи в таблице scheduler_state
+        report: Отчет о последнем заполнении в текущем запуске бота
+    """
+
+    name = "prewarm"
+
+    def __init__(self) -> None:
+        """Создает планировщик."""
+        self.report: Optional[PrewarmReport] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def in_window(now: datetime, hours: Tuple[int, int] = PREWARM_HOURS) -> bool:
+        """Проверяет, что время now попадает в часы заполнения [начало, конец) (возможно, через полночь)."""
+        start, end = hours
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def is_due(self, now: datetime) -> bool:
+        """Проверяет, что сейчас часы заполнения и за последние сутки кэш еще не заполнялся."""
+        if not self.in_window(now):
+            return False
+        _, last_run = load_scheduler_state(0, self.name, 0, 0)
+        return now.timestamp() - last_run > 20 * 3600
+
+    def _throttle(self) -> bool:
+        """Выдерживает паузу между запросами к API. Возвращает False, если планировщик остановлен."""
+        return not self._stop.wait(60 / PREWARM_RATE)
+
+    def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Tuple[Optional[Dict], bool]:
+        """Запрашивает и кэширует ответ API, если его нет в кэше.
+
+        :return: Кортеж из ответа (None при ошибке или если ответ уже в кэше) и признака запроса к API
+        """
+        key = cache_key(endpoint, params)
+        if key in api_cache:
+            return None, False
+        try:
+            response = api_request(method_endswith=endpoint, params=params, method_type="POST")
+        except ConnectionError as exc:
+            logger.error(f"Prewarm {endpoint}: {exc}", user_id=0)
+            return None, True
+        api_cache.set(key, response, ttl=PREWARM_TTL * 3600, source=PREWARM_SOURCE)
+        return response, True
+
+    def run_once(self) -> PrewarmReport:
+        """Заполняет кэш для самых частых предстоящих сочетаний города и дат.
+
+        :return: Отчет о заполнении
+        """
+        if self.report is not None:
+            logger.info(self.report.format(), user_id=0)
+        started = time.perf_counter()
+        report = PrewarmReport(datetime.now())
+        save_scheduler_state(0, self.name, 0, report.started.timestamp())
+        since = datetime.now() - timedelta(days=PREWARM_LOOKBACK)
+        searches = get_popular_searches(0, since, PREWARM_LIMIT)
+        report.searches = len(searches)
+        for region_id, check_in_date, check_out_date, _ in searches:
+            if self._stop.is_set():
+                break
+            params = lowprice_request_data(0, region_id, check_in_date, check_out_date)
+            results, requested = self._fetch("properties/v2/list", params)
+            if requested and not self._throttle():
+                break
+            if results is None:
+                report.skipped += not requested
+                continue
+            report.lists += 1
+            try:
+                hotels = results["data"]["propertySearch"]["properties"][:PREWARM_DETAILS]
+            except TypeError:
+                continue
+            for hotel in hotels:
+                details, requested = self._fetch("properties/v2/detail", details_request_data(0, hotel["id"]))
+                report.details += details is not None
+                report.skipped += not requested
+                if requested and not self._throttle():
+                    break
+        report.finish(started)
+        logger.info(
+            f"Prewarm finished: {report.lists} lists, {report.details} details, {report.skipped} already cached "
+            f"in {report.duration:.0f} s",
+            user_id=0,
+        )
+        self.report = report
+        return report
+
+    def _loop(self) -> None:
+        """Проверяет каждые CHECK_PERIOD секунд, не пора ли заполнить кэш, до остановки планировщика."""
+        while not self._stop.is_set():
+            try:
+                if self.is_due(datetime.now()):
+                    self.run_once()
+            except Exception as exc:
+                logger.error(f"Prewarm failed: {exc!r}", user_id=0)
+            self._stop.wait(CHECK_PERIOD)
+
+    def start(self) -> None:
+        """Запускает планировщик в фоновом потоке."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает планировщик."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+prewarmer = CachePrewarmer()
@@ -0,0 +1,155 @@
+"""Модуль фоновой проверки цен по подпискам пользователей на снижение цены.
+
+Подписки с одинаковыми городом и датами объединяются в группу, для которой выполняется один запрос
+списка самых дешевых отелей. Каждая группа проверяется не чаще одного раза в PRICE_WATCH_INTERVAL часов.
+Количество запросов к API ограничено бюджетом (PRICE_WATCH_DAILY_BUDGET запросов в сутки,
+не более PRICE_WATCH_BURST подряд), поэтому проверки распределяются по времени. Бюджет хранится
+в БД истории, поэтому перезапуск бота не восстанавливает израсходованный бюджет.
+Цена отсчета подписки (last_price) снижается только после отправленного уведомления о снижении цены:
+рост цены ее не меняет, поэтому цена, выросшая и вернувшаяся ниже цены отсчета, тоже вызывает уведомление.
+
+Classes:
+    TokenBucket: Бюджет запросов, пополняемый с постоянной скоростью
+    PriceWatchScheduler: Планировщик проверки цен по подпискам
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from config_data.config import (PRICE_WATCH_BURST, PRICE_WATCH_DAILY_BUDGET,
+                                PRICE_WATCH_INTERVAL, PRICE_WATCH_MIN_DROP,
+                                PRICE_WATCH_TICK)
+from database.api_requests.compare import ComparisonRow, search_cheapest
+from database.history.crud import (expire_price_watches, get_due_watch_groups,
+                                   get_group_watches, load_scheduler_state,
+                                   save_scheduler_state, update_watch_prices)
+from database.history.model import PriceWatch
+from utils.logging import logger
+
+Notify = Callable[[PriceWatch, ComparisonRow], None]
+
+
+class TokenBucket:
+    """Класс TokenBucket, описывающий бюджет запросов, пополняемый с постоянной скоростью.
+
+    Attributes:
+        rate: Скорость пополнения, запросов в секунду
+        capacity: Максимальный бюджет
+        tokens: Текущий бюджет
+        updated: Время последнего пополнения (timestamp)
+    """
+
+    def __init__(self, rate: float, capacity: float, tokens: float, updated: float) -> None:
+        """Создает бюджет с текущим значением tokens на момент updated."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = tokens
+        self.updated = updated
+
+    def refill(self, now: float) -> None:
+        """Пополняет бюджет за время, прошедшее с последнего пополнения."""
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1) -> bool:
+        """Списывает cost запросов, если бюджета достаточно.
+
+        :return: True, если бюджет списан
+        """
+        self.refill(now)
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class PriceWatchScheduler:
+    """Класс PriceWatchScheduler, описывающий планировщик проверки цен по подпискам.
+
+    Attributes:
+        name: Название задачи в таблице scheduler_state
+        notify: Функция уведомления пользователя о снижении цены
+        bucket: Бюджет запросов к API
+    """
+
+    name = "price_watch"
+
+    def __init__(self, notify: Notify) -> None:
+        """Создает планировщик. Бюджет загружается из БД при запуске."""
+        self.notify = notify
+        self.bucket: Optional[TokenBucket] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _load_bucket(self) -> TokenBucket:
+        """Загружает бюджет запросов из БД (при первом запуске - полный)."""
+        tokens, updated = load_scheduler_state(0, self.name, PRICE_WATCH_BURST, time.time())
+        return TokenBucket(PRICE_WATCH_DAILY_BUDGET / 86400, PRICE_WATCH_BURST, tokens, updated)
+
+    def run_once(self) -> int:
+        """Проверяет цены групп подписок, пока хватает бюджета запросов.
+
+        :return: Количество проверенных групп
+        """
+        if self.bucket is None:
+            self.bucket = self._load_bucket()
+        expire_price_watches(0)
+        checked_before = datetime.now() - timedelta(hours=PRICE_WATCH_INTERVAL)
+        self.bucket.refill(time.time())
+        groups = get_due_watch_groups(0, checked_before, int(self.bucket.tokens))
+        checked = 0
+        for region_id, city, check_in_date, check_out_date in groups:
+            if not self.bucket.take(time.time()):
+                break
+            save_scheduler_state(0, self.name, self.bucket.tokens, self.bucket.updated)
+            nights = (check_out_date - check_in_date).days
+            row = search_cheapest(0, {"name": city, "id": region_id}, check_in_date, nights)
+            if row.error:
+                break
+            self._check_group(row, get_group_watches(0, region_id, check_in_date, check_out_date))
+            checked += 1
+        if checked:
+            logger.info(f"Price watch checked {checked} groups, tokens {self.bucket.tokens:.2f}", user_id=0)
+        return checked
+
+    def _check_group(self, row: ComparisonRow, watches: List[PriceWatch]) -> None:
+        """Уведомляет пользователей группы о снижении цены и снижает цену отсчета уведомленных подписок.
+
+        Подписка без цены отсчета (цена не была известна при оформлении) получает найденную цену.
+        """
+        priced_ids = list()
+        for watch in watches:
+            if row.min_price is None:
+                break
+            if watch.last_price is None:
+                priced_ids.append(watch.id)
+            elif row.min_price <= watch.last_price * (1 - PRICE_WATCH_MIN_DROP):
+                try:
+                    self.notify(watch, row)
+                except Exception as exc:
+                    logger.error(f"Price watch {watch.id} notification failed: {exc!r}", user_id=watch.user.user_id)
+                else:
+                    priced_ids.append(watch.id)
+        update_watch_prices(0, [watch.id for watch in watches], datetime.now(), row.min_price, priced_ids)
+
+    def _loop(self) -> None:
+        """Проверяет цены каждые PRICE_WATCH_TICK секунд до остановки планировщика."""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                logger.error(f"Price watch failed: {exc!r}", user_id=0)
+            self._stop.wait(PRICE_WATCH_TICK)
+
+    def start(self) -> None:
+        """Запускает планировщик в фоновом потоке."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="price_watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает планировщик."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -3,10 +3,21 @@
 Modules:
     bestdeal: Модуль ввода дополнительных параметров для команды bestdeal
     clear_data_base: Модуль очистки баз данных
+    compare: Модуль сравнения цен в нескольких городах и на разные даты
     common_search_handlers: Общий модуль обработки команд bestdeal, lowprice и highprice
+    export: Модуль выгрузки истории запросов в файл
+    flexible_dates: Модуль поиска самых дешевых дат заезда в течение месяца
     game_cities: Модуль игры "Города"
     history: Модуль истории запросов пользователя
+    maintenance: Модуль обслуживания БД истории запросов
+    memory: Модуль отчета о расходе памяти
+    price_watch: Модуль подписок на снижение цены
+    profile: Модуль профилирования по требованию
+    quota: Модуль расхода лимитов запросов к API
+    stats: Модуль статистики поиска отелей
+    wizard: Модуль сообщения-мастера поиска отелей
 """
 
-from . import (bestdeal, clear_data_base, common_search_handlers, game_cities,
-               history)
+from . import (bestdeal, clear_data_base, common_search_handlers, compare,
+               export, flexible_dates, game_cities, history, maintenance,
+               memory, price_watch, profile, quota, stats, wizard)
@@ -13,6 +13,7 @@ from loader import bot
 from states.search_data import UserSearchState
 from states.users import Users
 
+from . import wizard
 from .common_search_handlers import ask_number_of_hotels
 
 
@@ -22,14 +23,14 @@ def enter_min_price(message: Message) -> None:
 
     Запрашивает максимальную стоимость.
     """
+    user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     if message.text.isdigit():
-        Users.get_user(message.from_user.id).min_price = int(message.text)
+        user.min_price = int(message.text)
         bot.set_state(message.from_user.id, UserSearchState.max_price, message.chat.id)
-        bot.send_message(message.chat.id, "🏰Введите максимальную стоимость проживания за ночь")
+        wizard.show(user, message.chat.id, "🏰Введите максимальную стоимость проживания за ночь")
     else:
-        bot.send_message(message.chat.id, "❗Минимальная стоимость должна быть числом больше 1. Повторите ввод")
-    bot.delete_message(message.chat.id, message.message_id)
-    bot.delete_message(message.chat.id, message.message_id - 1)
+        wizard.show(user, message.chat.id, "❗Минимальная стоимость должна быть числом больше 1. Повторите ввод")
 
 
 @bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.max_price)
@@ -39,17 +40,14 @@ def enter_max_price(message: Message) -> None:
     Запрашивает минимальное расстояние от центра
     """
     user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     if message.text.isdigit():
         user.max_price = int(message.text)
-        bot.send_message(
-            message.chat.id, "💵Выбран диапазон цен: ${min}-{max}".format(min=user.min_price, max=user.max_price)
-        )
+        wizard.confirm(user, "💵Выбран диапазон цен: ${min}-{max}".format(min=user.min_price, max=user.max_price))
         bot.set_state(message.from_user.id, UserSearchState.min_distance, message.chat.id)
-        bot.send_message(message.chat.id, "🚶Введите минимальное расстояние от центра до отеля")
+        wizard.show(user, message.chat.id, "🚶Введите минимальное расстояние от центра до отеля")
     else:
-        bot.send_message(message.chat.id, "❗Максимальная стоимость должна быть числом больше 1. Повторите ввод")
-    bot.delete_message(message.chat.id, message.message_id)
-    bot.delete_message(message.chat.id, message.message_id - 1)
+        wizard.show(user, message.chat.id, "❗Максимальная стоимость должна быть числом больше 1. Повторите ввод")
 
 
 @bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.min_distance)
@@ -58,14 +56,14 @@ def enter_min_distance(message: Message) -> None:
 
     Запрашивает максимальное расстояние от центра
     """
+    user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     if message.text.isdigit():
-        Users.get_user(message.from_user.id).min_distance = int(message.text)
+        user.min_distance = int(message.text)
         bot.set_state(message.from_user.id, UserSearchState.max_distance, message.chat.id)
-        bot.send_message(message.chat.id, "🏃Введите максимальное расстояние от центра до отеля")
+        wizard.show(user, message.chat.id, "🏃Введите максимальное расстояние от центра до отеля")
     else:
-        bot.send_message(message.chat.id, "❗Минимальное расстояние должно быть числом. Повторите ввод")
-    bot.delete_message(message.chat.id, message.message_id)
-    bot.delete_message(message.chat.id, message.message_id - 1)
+        wizard.show(user, message.chat.id, "❗Минимальное расстояние должно быть числом. Повторите ввод")
 
 
 @bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.max_distance)
@@ -75,11 +73,10 @@ def enter_max_distance(message: Message) -> None:
     Запрашивает требуемое количество отелей
     """
     user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     if message.text.isdigit():
         user.max_distance = int(message.text)
-        bot.send_message(message.chat.id, f"🚏Расстояние от центра: {user.min_distance}-{user.max_distance} миль")
+        wizard.confirm(user, f"🚏Расстояние от центра: {user.min_distance}-{user.max_distance} миль")
         ask_number_of_hotels(message.from_user.id, message.chat.id)
     else:
-        bot.send_message(message.chat.id, "❗Максимальное расстояние должно быть числом. Повторите ввод")
-    bot.delete_message(message.chat.id, message.message_id)
-    bot.delete_message(message.chat.id, message.message_id - 1)
+        wizard.show(user, message.chat.id, "❗Максимальное расстояние должно быть числом. Повторите ввод")
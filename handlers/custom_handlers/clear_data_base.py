@@ -8,8 +8,10 @@ Functions:
 from telebot.types import Message
 
 from config_data.config import ADMIN_ID, ADMIN_PASSWORD
+from database.game_cities.leaderboard import reset_leaderboard
 from database.game_cities.model import City2Player, Player, db_game
-from database.history.model import Request, Result, User, db
+from database.game_cities.session import GameSession
+from database.history.model import PriceWatch, Request, Result, User, db
 from loader import bot
 from states.search_data import UserSearchState
 from utils.logging import logger
@@ -38,20 +40,24 @@ def get_password(message: Message) -> None:
 def clear_db(message: Message) -> None:
     """В соответствии с выбором администратора очищает соответствующую базу данных."""
     if message.text == "1":
-        db.drop_tables([User, Result, Request], safe=True)
-        db.create_tables([User, Result, Request], safe=True)
+        db.drop_tables([User, Result, Request, PriceWatch], safe=True)
+        db.create_tables([User, Result, Request, PriceWatch], safe=True)
         bot.send_message(message.chat.id, "БД с историей запросов пользователей очищена")
         logger.info("Cleared db History", user_id=message.from_user.id)
     elif message.text == "2":
+        GameSession.reset_all()
         db_game.drop_tables([Player, City2Player])
         db_game.create_tables([Player, City2Player], safe=True)
+        reset_leaderboard()
         bot.send_message(message.chat.id, "БД с игровой статистикой пользователей очищена")
         logger.info("Cleared db Game", user_id=message.from_user.id)
     elif message.text == "3":
-        db.drop_tables([User, Result, Request], safe=True)
-        db.create_tables([User, Result, Request], safe=True)
+        db.drop_tables([User, Result, Request, PriceWatch], safe=True)
+        db.create_tables([User, Result, Request, PriceWatch], safe=True)
+        GameSession.reset_all()
         db_game.drop_tables([Player, City2Player])
         db_game.create_tables([Player, City2Player], safe=True)
+        reset_leaderboard()
         bot.send_message(
             message.chat.id, "Базы данных с историей запросов и с игровой статистикой пользователей очищены"
         )
@@ -13,6 +13,8 @@ Functions:
         Листает календарь и сохраняет выбранную дату
     check_date:
         Пользователь проверяет дату, подтверждает или меняет
+    date_prompt:
+        Возвращает вопрос о дате заезда или выезда
     ask_number_of_hotels:
         Запрашивает количество выводимых отелей
     enter_number_of_hotels:
@@ -25,6 +27,8 @@ Functions:
         Выбор количества фотографий пользователем
     get_search_results:
         Возвращает пользователю результаты поиска
+
+Диалог поиска ведется в одном сообщении-мастере бота (модуль wizard), которое изменяется на каждом шаге.
 """
 from datetime import date, timedelta
 
@@ -36,15 +40,24 @@ from database.api_requests.bestdeal import get_bestdeal_results
 from database.api_requests.cities import find_city
 from database.api_requests.highprice import get_highprice_results
 from database.api_requests.lowprice import get_lowprice_results
+from database.api_requests.quota import (QuotaExceededError,
+                                         estimate_search_cost, quota)
+from database.game_cities.crud import get_nearby_cities
 from database.history.crud import add_request_to_db
 from keyboards.inline import (change_date, clarify_city, number_of_hotels,
                               number_of_photos)
 from loader import bot
 from states.search_data import UserSearchState
 from states.users import Users
-from utils.calendar_style import LSTEP, MyStyleCalendar
+from utils.calendar_style import (LSTEP, build_calendar, is_calendar_callback,
+                                  process_calendar)
 from utils.city_translator import translate
 from utils.logging import logger
+from utils.profiling import profiled
+
+from . import wizard
+
+CITY_PROMPT = "В каком городе найти отель? 🗺"
 
 
 @bot.message_handler(commands=["lowprice", "highprice", "bestdeal"])
@@ -54,32 +67,41 @@ def start_hotels_search(message: Message) -> None:
     user.cmd_message = message
     logger.info(f"Command {user.cmd_message.text}", user_id=message.from_user.id)
     bot.set_state(message.from_user.id, UserSearchState.city, message.chat.id)
-    user.next_delete_message = bot.send_message(message.from_user.id, "В каком городе найти отель? 🗺").id
+    wizard.start(user, message.chat.id, CITY_PROMPT)
 
 
 @bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.city)
 def get_city_from_user(message: Message) -> None:
     """Получает название города от пользователя. Направляет перечень возвращенных сервером городов для уточнения.
 
+    :except QuotaExceededError: Исчерпан лимит запросов к API
     :except ConnectionError: При отсутствии ответа от сервера вызывается исключение
     """
     user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     user.city = translate(message.text)
     try:
         cities = find_city(user)
         if len(cities) > 0:
-            bot.delete_message(message.chat.id, message.message_id)
-            bot.delete_message(message.chat.id, user.next_delete_message)
-            user.next_delete_message = bot.send_message(
-                message.from_user.id, "Выберите город", reply_markup=clarify_city(cities)
-            ).id
+            wizard.show(user, message.chat.id, "Выберите город", reply_markup=clarify_city(cities))
             bot.set_state(message.from_user.id, UserSearchState.verified_city, message.chat.id)
         else:
-            bot.send_message(message.from_user.id, "❗️Город отсутствует в базе Hotels.com. Повторите запрос")
-            start_hotels_search(user.cmd_message)
+            nearby = ", ".join(f"{name} ({distance:.0f} км)" for name, distance in get_nearby_cities(message.text))
+            hint = f"Ближайшие города: {nearby}\n" if nearby else ""
+            wizard.show(
+                user,
+                message.chat.id,
+                f"❗️Город отсутствует в базе Hotels.com. Повторите запрос\n{hint}{CITY_PROMPT}",
+            )
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user.user_id)
+        wizard.show(user, message.chat.id, exc.hint)
+        wizard.finish(user, message.chat.id)
+        bot.delete_state(message.from_user.id, message.chat.id)
     except ConnectionError as exc:
         logger.error(f"{exc}", user_id=user.user_id)
-        bot.send_message(message.chat.id, "Нет ответа от сервера📡. Повторите запрос позже")
+        wizard.show(user, message.chat.id, "Нет ответа от сервера📡. Повторите запрос позже")
+        wizard.finish(user, message.chat.id)
         bot.delete_state(message.from_user.id, message.chat.id)
 
 
@@ -87,56 +109,58 @@ def get_city_from_user(message: Message) -> None:
 def select_city(call: CallbackQuery) -> None:
     """Сохраняет выбранный пользователем город и запрашивает дату заезда."""
     user = Users.get_user(call.from_user.id)
-    bot.delete_message(call.message.chat.id, user.next_delete_message)
     if call.data == "again":
-        start_hotels_search(user.cmd_message)
+        wizard.show(user, call.message.chat.id, CITY_PROMPT)
+        bot.set_state(call.from_user.id, UserSearchState.city, call.message.chat.id)
         return
     city, user.region_id = call.data.split("#")
-    bot.send_message(call.message.chat.id, f"📍Выбран город {city}")
+    wizard.confirm(user, f"📍Выбран город {city}")
     bot.set_state(call.from_user.id, UserSearchState.checkin_date, call.message.chat.id)
-    user.next_delete_message = bot.send_message(call.message.chat.id, "📅Выберите дату заезда").id
     start_calendar(call)
 
 
+def date_prompt(user_id: int, chat_id: int) -> str:
+    """Возвращает вопрос о дате заезда или выезда в зависимости от состояния пользователя."""
+    if bot.get_state(user_id, chat_id) == "UserSearchState:checkin_date":
+        return "📅Выберите дату заезда"
+    return "📅Выберите дату выезда"
+
+
 def start_calendar(call: CallbackQuery) -> None:
     """Запускает календарь."""
     user = Users.get_user(call.from_user.id)
-    calendar, step = MyStyleCalendar(
-        locale="ru",
+    calendar, step = build_calendar(
+        current_date=user.check_in_date + timedelta(days=1),
         min_date=user.check_in_date + timedelta(days=1),
         max_date=user.check_out_date,
-        current_date=user.check_in_date + timedelta(days=1),
-    ).build()
-    bot.send_message(call.message.chat.id, f"Выберите {LSTEP[step]}", reply_markup=calendar)
+    )
+    prompt = date_prompt(call.from_user.id, call.message.chat.id)
+    wizard.show(user, call.message.chat.id, f"{prompt}\nВыберите {LSTEP[step]}", reply_markup=calendar)
 
 
-@bot.callback_query_handler(func=MyStyleCalendar.func())
+@bot.callback_query_handler(func=is_calendar_callback)
+@profiled
 def next_step_calendar(calendar: CallbackQuery) -> None:
     """Сохраняет дату заезда или выезда, выбранную пользователем."""
     user = Users.get_user(calendar.from_user.id)
-    result, key, step = MyStyleCalendar(
-        locale="ru",
-        min_date=user.check_in_date + timedelta(days=1),
-        max_date=user.check_out_date,
-    ).process(calendar.data)
+    result, key, step = process_calendar(
+        calendar.data, min_date=user.check_in_date + timedelta(days=1), max_date=user.check_out_date
+    )
+    chat_id = calendar.message.chat.id
     if not result and key:
-        bot.edit_message_text(
-            f"Выберите {LSTEP[step]}", calendar.message.chat.id, calendar.message.message_id, reply_markup=key
-        )
+        prompt = date_prompt(calendar.from_user.id, chat_id)
+        wizard.show(user, chat_id, f"{prompt}\nВыберите {LSTEP[step]}", reply_markup=key)
     elif result:
-        if bot.get_state(calendar.from_user.id, calendar.message.chat.id) == "UserSearchState:checkin_date":
+        if bot.get_state(calendar.from_user.id, chat_id) == "UserSearchState:checkin_date":
             current_state = "checkin_date"
             user.check_in_date = result
         else:
             current_state = "checkout_date"
             user.check_out_date = result
-        bot.edit_message_text(
-            f'Вы выбрали дату {result.strftime("%d.%m.%Y")}',
-            calendar.message.chat.id,
-            calendar.message.message_id,
-            reply_markup=change_date(current_state),
+        wizard.show(
+            user, chat_id, f'Вы выбрали дату {result.strftime("%d.%m.%Y")}', reply_markup=change_date(current_state)
         )
-        bot.set_state(calendar.from_user.id, UserSearchState.check_date, calendar.message.chat.id)
+        bot.set_state(calendar.from_user.id, UserSearchState.check_date, chat_id)
 
 
 @bot.callback_query_handler(func=lambda call: True, state=UserSearchState.check_date)
@@ -147,7 +171,6 @@ def check_date(call: CallbackQuery) -> None:
     Для команды /bestdeal запрашивает минимальную стоимость за ночь.
     """
     user = Users.get_user(call.from_user.id)
-    bot.delete_message(call.message.chat.id, call.message.message_id)
     if call.data == "wrong checkin_date":
         user.check_in_date = date.today() - timedelta(days=1)
         user.check_out_date = None
@@ -158,30 +181,27 @@ def check_date(call: CallbackQuery) -> None:
         user.check_out_date = user.check_in_date + timedelta(days=28)
         start_calendar(call)
     elif call.data == "checkin_date":
-        bot.delete_message(call.message.chat.id, user.next_delete_message)
-        user.next_delete_message = bot.send_message(call.message.chat.id, "📅Выберите дату выезда").id
         bot.set_state(call.from_user.id, UserSearchState.checkout_date, call.message.chat.id)
         start_calendar(call)
     elif call.data == "checkout_date":
-        bot.delete_message(call.message.chat.id, user.next_delete_message)
-        bot.send_message(
-            call.message.chat.id,
-            f'📅Период проживания: c {user.check_in_date:"%d.%m.%Y"} по {user.check_out_date:"%d.%m.%Y"}',
+        wizard.confirm(
+            user, f'📅Период проживания: c {user.check_in_date:"%d.%m.%Y"} по {user.check_out_date:"%d.%m.%Y"}'
         )
         if user.current_cmd != "/bestdeal":
             ask_number_of_hotels(user_id=call.from_user.id, chat_id=call.message.chat.id)
         else:
-            user.next_delete_message = bot.send_message(
-                call.message.chat.id, "🏠Введите минимальную стоимость проживания за ночь"
-            ).id
+            wizard.show(user, call.message.chat.id, "🏠Введите минимальную стоимость проживания за ночь")
             bot.set_state(call.from_user.id, UserSearchState.min_price, call.message.chat.id)
 
 
-def ask_number_of_hotels(user_id: int, chat_id: int) -> None:
+def ask_number_of_hotels(user_id: int, chat_id: int, error: str = "") -> None:
     """Запрашивает у пользователя количество отелей (результатов поиска)."""
-    Users.get_user(user_id).next_delete_message = bot.send_message(
-        chat_id, "Выберите количество результатов поиска или введите число от 1 до 10", reply_markup=number_of_hotels()
-    ).id
+    wizard.show(
+        Users.get_user(user_id),
+        chat_id,
+        f"{error}Выберите количество результатов поиска или введите число от 1 до 10",
+        reply_markup=number_of_hotels(),
+    )
     bot.set_state(user_id, UserSearchState.number_of_hotels, chat_id)
 
 
@@ -189,28 +209,29 @@ def ask_number_of_hotels(user_id: int, chat_id: int) -> None:
 def enter_number_of_hotels(message: Message) -> None:
     """Получает введенное пользователем количество отелей."""
     user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
     if message.text in (str(n) for n in range(1, 11)):
         user.results_size = int(message.text)
-        bot.delete_message(message.chat.id, message.message_id)
-        bot.delete_message(message.chat.id, user.next_delete_message)
-        bot.send_message(message.chat.id, f"🏨Показать результатов: {message.text}")
+        wizard.confirm(user, f"🏨Показать результатов: {message.text}")
         ask_number_of_photos(user_id=message.from_user.id, chat_id=message.chat.id)
     else:
-        bot.send_message(message.from_user.id, "❗️Неверное количество. Введите число от 1 до 10")
+        ask_number_of_hotels(message.from_user.id, message.chat.id, error="❗️Неверное количество. ")
 
 
 @bot.callback_query_handler(func=lambda call: True, state=UserSearchState.number_of_hotels)
 def select_number_of_hotels(call: CallbackQuery) -> None:
     """Получает выбранное пользователем количество отелей."""
-    Users.get_user(call.from_user.id).results_size = int(call.data)
-    bot.delete_message(call.message.chat.id, call.message.message_id)
-    bot.send_message(call.message.chat.id, f"🏨Показать результатов: {call.data}")
+    user = Users.get_user(call.from_user.id)
+    user.results_size = int(call.data)
+    wizard.confirm(user, f"🏨Показать результатов: {call.data}")
     ask_number_of_photos(user_id=call.from_user.id, chat_id=call.message.chat.id)
 
 
 def ask_number_of_photos(user_id: int, chat_id: int) -> None:
     """Запрашивает количество фотографий."""
-    bot.send_message(chat_id, "Выберите количество фотографий отеля", reply_markup=number_of_photos())
+    wizard.show(
+        Users.get_user(user_id), chat_id, "Выберите количество фотографий отеля", reply_markup=number_of_photos()
+    )
     bot.set_state(user_id, UserSearchState.number_of_photo, chat_id)
 
 
@@ -219,40 +240,53 @@ def select_number_of_photos(call: CallbackQuery) -> None:
     """Получает выбранное пользователем количество фотографий."""
     user = Users.get_user(call.from_user.id)
     user.number_of_photos = int(call.data)
-    bot.delete_message(call.message.chat.id, call.message.message_id)
-    bot.send_message(call.message.chat.id, f"🌇Показать фотографий отеля: {call.data}")
+    wizard.confirm(user, f"🌇Показать фотографий отеля: {call.data}")
     bot.delete_state(call.from_user.id, call.message.chat.id)
     get_search_results(chat_id=call.message.chat.id, user_id=call.from_user.id)
 
 
+@profiled
 def get_search_results(chat_id: int, user_id: int) -> None:
     """Возвращает результаты поиска.
 
+    Перед поиском проверяется, что оценка количества запросов к API укладывается в лимиты.
+
     :except TypeError: Вызывает исключение, если результаты по запросу пользователя отсутствуют
+    :except QuotaExceededError: Вызывает исключение, если поиск не укладывается в лимиты запросов к API
     :except ConnectionError: Вызывает исключение, если соединение с сервером отсутствует
     """
     user = Users.get_user(user_id)
+    logger.info(f"Search {user.current_cmd} started", user_id=user_id)
+    try:
+        quota.admit(user_id, estimate_search_cost(user.current_cmd, user.results_size))
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user_id)
+        wizard.show(user, chat_id, exc.hint)
+        wizard.finish(user, chat_id)
+        return
     add_request_to_db(user)
     try:
         if user.current_cmd == "/lowprice":
-            user.next_delete_message = bot.send_message(chat_id, "🔍Выполняется поиск самых дешёвых отелей⌛️").id
+            wizard.show(user, chat_id, "🔍Выполняется поиск самых дешёвых отелей⌛️")
             results = get_lowprice_results(user)
         elif user.current_cmd == "/highprice":
-            user.next_delete_message = bot.send_message(chat_id, "🔍Выполняется поиск самых дорогих отелей⌛️").id
+            wizard.show(user, chat_id, "🔍Выполняется поиск самых дорогих отелей⌛️")
             results = get_highprice_results(user)
         else:
-            user.next_delete_message = bot.send_message(chat_id, "🔍Выполняется поиск лучшего предложения⌛️").id
+            wizard.show(user, chat_id, "🔍Выполняется поиск лучшего предложения⌛️")
             results, flag = get_bestdeal_results(user)
             if not flag:
-                bot.send_message(
-                    chat_id,
+                wizard.confirm(
+                    user,
                     "По вашему запросу ничего не найдено, показаны результаты "
                     "только в соответствии с указанным диапазоном стоимости",
                 )
-        bot.delete_message(chat_id, user.next_delete_message)
+        wizard.show(user, chat_id, f"✅Найдено отелей: {len(results)}")
         for result in results:
             if user.number_of_photos != 0:
-                bot.send_media_group(
+                wizard.api_call(
+                    user,
+                    bot.send_media_group,
                     user_id,
                     [
                         telebot.types.InputMediaPhoto(photo, caption=result[0], parse_mode="Markdown")
@@ -262,13 +296,17 @@ def get_search_results(chat_id: int, user_id: int) -> None:
                     ],
                 )
             else:
-                bot.send_message(chat_id, result[0], parse_mode="Markdown", disable_web_page_preview=True)
-        logger.success(f"Command {user.current_cmd} completed successfully", user_id=user_id)
+                wizard.api_call(
+                    user, bot.send_message, chat_id, result[0], parse_mode="Markdown", disable_web_page_preview=True
+                )
+        logger.success(f"Command {user.current_cmd} completed successfully", user_id=user_id, keep=True)
     except TypeError as exc:
         logger.info(f"{exc}", user_id=user_id)
-        bot.send_message(chat_id, "По Вашему запросу ничего не найдено️☹️. Измените параметры поиска")
-        bot.delete_message(chat_id, user.next_delete_message)
+        wizard.show(user, chat_id, "По Вашему запросу ничего не найдено️☹️. Измените параметры поиска")
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user_id)
+        wizard.show(user, chat_id, exc.hint)
     except ConnectionError as exc:
         logger.error(f"{exc}", user_id=user_id)
-        bot.send_message(chat_id, "Нет ответа от сервера📡. Повторите запрос позже")
-        bot.delete_message(chat_id, user.next_delete_message)
+        wizard.show(user, chat_id, "Нет ответа от сервера📡. Повторите запрос позже")
+    wizard.finish(user, chat_id)
@@ -0,0 +1,127 @@
+"""Модуль, обрабатывающий команду compare - сравнение цен в нескольких городах и на разные даты заезда.
+
+Пользователь вводит до пяти городов и до пяти дат заезда с количеством ночей. Поиски самых дешевых отелей
+для всех пар город - дата выполняются параллельно, результат выводится одной таблицей.
+
+Functions:
+    start_compare: В ответ на команду compare запрашивает названия городов
+    enter_cities: Получает названия городов и запрашивает даты заезда
+    parse_dates: Получает даты заезда и количество ночей из сообщения пользователя
+    enter_dates: Получает даты заезда, выполняет поиски и выводит таблицу сравнения
+"""
+import re
+from datetime import date, datetime
+from typing import List, Tuple
+
+from telebot.types import Message
+
+from config_data.config import COMMAND_MESSAGES
+from database.api_requests.compare import (compare_lowprice,
+                                           format_comparison, resolve_cities)
+from database.api_requests.quota import QuotaExceededError, quota
+from loader import bot
+from states.search_data import UserSearchState
+from states.users import Users
+from utils.logging import logger
+
+from . import wizard
+
+MAX_CITIES = 5
+MAX_DATES = 5
+MAX_NIGHTS = 28
+CITIES_PROMPT = f"🆚Введите через запятую до {MAX_CITIES} городов для сравнения цен"
+DATES_PROMPT = (
+    f"📅Введите через запятую до {MAX_DATES} дат заезда в формате ДД.ММ.ГГГГ и в конце количество ночей, "
+    "например: 01.12.2026, 08.12.2026 3"
+)
+
+
+@bot.message_handler(commands=["compare"])
+def start_compare(message: Message) -> None:
+    """Запрашивает названия городов для сравнения."""
+    user = Users(message.from_user.id)
+    user.cmd_message = message
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    bot.set_state(message.from_user.id, UserSearchState.compare_cities, message.chat.id)
+    wizard.start(user, message.chat.id, CITIES_PROMPT)
+
+
+@bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.compare_cities)
+def enter_cities(message: Message) -> None:
+    """Получает названия городов (повторы не учитываются) и запрашивает даты заезда."""
+    user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
+    names = list(dict.fromkeys(name.strip() for name in message.text.split(",") if name.strip()))
+    if not names or len(names) > MAX_CITIES:
+        wizard.show(user, message.chat.id, f"❗️Нужно от 1 до {MAX_CITIES} городов. {CITIES_PROMPT}")
+        return
+    user.compare_cities = names
+    wizard.confirm(user, f"📍Города: {', '.join(names)}")
+    wizard.show(user, message.chat.id, DATES_PROMPT)
+    bot.set_state(message.from_user.id, UserSearchState.compare_dates, message.chat.id)
+
+
+def parse_dates(text: str) -> Tuple[List[date], int]:
+    """Получает даты заезда и количество ночей из сообщения пользователя.
+
+    :param text: Сообщение вида "01.12.2026, 08.12.2026 3" (количество ночей можно не указывать - 1 ночь)
+    :return: Отсортированные даты заезда без повторов и количество ночей
+    :except ValueError: Вызывает исключение при неверном формате, дате в прошлом или неверном количестве ночей
+    """
+    tokens = re.split(r"[,\s]+", text.strip())
+    nights = 1
+    if tokens and tokens[-1].isdigit():
+        nights = int(tokens.pop())
+    if not 1 <= nights <= MAX_NIGHTS:
+        raise ValueError(f"количество ночей должно быть от 1 до {MAX_NIGHTS}")
+    try:
+        dates = sorted({datetime.strptime(token, "%d.%m.%Y").date() for token in tokens})
+    except ValueError:
+        raise ValueError("неверный формат даты")
+    if not dates or len(dates) > MAX_DATES:
+        raise ValueError(f"нужно от 1 до {MAX_DATES} дат")
+    if dates[0] < date.today():
+        raise ValueError("дата заезда не может быть в прошлом")
+    return dates, nights
+
+
+@bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.compare_dates)
+def enter_dates(message: Message) -> None:
+    """Получает даты заезда, выполняет поиски для всех пар город - дата и выводит таблицу сравнения.
+
+    :except QuotaExceededError: Вызывает исключение, если поиски не укладываются в лимиты запросов к API
+    :except ConnectionError: Вызывает исключение, если соединение с сервером отсутствует
+    """
+    user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
+    try:
+        dates, nights = parse_dates(message.text)
+    except ValueError as exc:
+        wizard.show(user, message.chat.id, f"❗️Ошибка: {exc}\n{DATES_PROMPT}")
+        return
+    bot.delete_state(message.from_user.id, message.chat.id)
+    wizard.confirm(user, f"📅Заезд: {', '.join(f'{day:%d.%m.%Y}' for day in dates)}, ночей: {nights}")
+    wizard.show(user, message.chat.id, "🔍Выполняется сравнение цен⌛️")
+    logger.info(f"Search {user.current_cmd} started", user_id=user.user_id)
+    try:
+        quota.admit(user.user_id, len(user.compare_cities) * (1 + len(dates)))
+        resolved = resolve_cities(user.user_id, user.compare_cities)
+        cities = [city for _, city in resolved if city is not None]
+        missing = [name for name, city in resolved if city is None]
+        if missing:
+            wizard.confirm(user, f"❗️Не найдены: {', '.join(missing)}")
+        if not cities:
+            wizard.show(user, message.chat.id, "По Вашему запросу ничего не найдено️☹️. Измените параметры поиска")
+        else:
+            rows = compare_lowprice(user.user_id, cities, dates, nights)
+            wizard.show(user, message.chat.id, f"✅Выполнено поисков: {len(rows)}")
+            text = format_comparison(rows, nights)
+            wizard.api_call(user, bot.send_message, message.chat.id, text, parse_mode="Markdown")
+            logger.success(f"Command {user.current_cmd} completed successfully", user_id=user.user_id, keep=True)
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user.user_id)
+        wizard.show(user, message.chat.id, exc.hint)
+    except ConnectionError as exc:
+        logger.error(f"{exc}", user_id=user.user_id)
+        wizard.show(user, message.chat.id, "Нет ответа от сервера📡. Повторите запрос позже")
+    wizard.finish(user, message.chat.id)
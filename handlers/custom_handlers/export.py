@@ -0,0 +1,60 @@
+"""Модуль, обрабатывающий команду пользователя export для выгрузки истории запросов в файл.
+
+/export - вся история запросов пользователя с результатами поиска файлом CSV;
+/export jsonl - то же файлом JSONL;
+/export all, /export jsonl all - история всех пользователей (только для администратора).
+
+Functions:
+    send_export: Выгружает историю запросов во временный файл и отправляет его документом
+"""
+import codecs
+import os
+import tempfile
+from datetime import datetime
+
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID, EXPORT_SPOOL_SIZE
+from database.history.export import FORMATS, export_history
+from loader import bot
+from utils.logging import logger
+
+DOCUMENT_LIMIT = 50 * 1024 * 1024
+
+
+@bot.message_handler(commands=["export"])
+def send_export(message: Message) -> None:
+    """Выгружает историю запросов в файл CSV или JSONL и отправляет его документом.
+
+    Файл хранится в памяти до EXPORT_SPOOL_SIZE байт, затем переносится на диск. Текст кодируется в UTF-8
+    при записи (codecs.getwriter): io.TextIOWrapper над SpooledTemporaryFile не работает в Python до 3.11.
+    """
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    args = [arg.lower() for arg in message.text.split()[1:]]
+    all_users = "all" in args
+    if all_users and message.from_user.id != int(ADMIN_ID):
+        bot.send_message(message.chat.id, "Выгрузка истории всех пользователей доступна только администратору")
+        return
+    formats = [arg for arg in args if arg != "all"]
+    export_format = formats[0] if formats else "csv"
+    if export_format not in FORMATS or len(formats) > 1:
+        bot.send_message(message.chat.id, f"Неизвестный формат {' '.join(formats)}. Форматы: {', '.join(FORMATS)}")
+        return
+    with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE) as file:
+        out = codecs.getwriter("utf-8")(file)
+        requests = export_history(message.from_user.id, out, export_format, all_users)
+        size = file.tell()
+        logger.info(f"Exported {requests} requests, {size} bytes", user_id=message.from_user.id)
+        if not requests:
+            bot.send_message(message.chat.id, "История запросов пуста")
+            return
+        if size > DOCUMENT_LIMIT:
+            bot.send_message(
+                message.chat.id, f"Файл истории ({size / 1024 / 1024:.0f} МБ) больше лимита Telegram 50 МБ"
+            )
+            return
+        file.seek(0, os.SEEK_SET)
+        name = f"history_{'all' if all_users else message.from_user.id}_{datetime.now():%Y%m%d}.{export_format}"
+        bot.send_document(
+            message.chat.id, file, caption=f"🗄История запросов: {requests}", visible_file_name=name
+        )
@@ -0,0 +1,139 @@
+"""Модуль, обрабатывающий команду flexdates - поиск самых дешевых дат заезда в течение месяца.
+
+Пользователь выбирает город, месяц и количество ночей. Бот выполняет поиски самых дешевых отелей
+для каждой даты заезда месяца и выводит минимальные цены по датам и лучшие даты заезда.
+Выбор месяца и количества ночей принимает только нажатия кнопок своих клавиатур: другие кнопки
+(например, "Отписаться" из списка подписок) в эти моменты игнорируются.
+
+Functions:
+    start_flexible_dates: В ответ на команду flexdates запрашивает название города
+    get_flexible_city: Получает название города и предлагает уточнить его
+    select_flexible_city: Сохраняет выбранный город и запрашивает месяц
+    select_month: Сохраняет выбранный месяц и запрашивает количество ночей
+    select_nights: Выполняет поиски по датам месяца и выводит результат
+"""
+import re
+from datetime import date
+
+from telebot.types import CallbackQuery, Message
+
+from config_data.config import COMMAND_MESSAGES
+from database.api_requests.cities import search_cities
+from database.api_requests.flexible_dates import (format_price_calendar,
+                                                  month_dates, scan_dates)
+from database.api_requests.quota import QuotaExceededError, quota
+from keyboards.inline import clarify_city, months, number_of_nights
+from loader import bot
+from states.search_data import UserSearchState
+from states.users import Users
+from utils.city_translator import translate
+from utils.logging import logger
+
+from . import wizard
+from .common_search_handlers import CITY_PROMPT
+
+MONTH_CALLBACK = re.compile(r"\d{4}-\d{1,2}")
+
+
+@bot.message_handler(commands=["flexdates"])
+def start_flexible_dates(message: Message) -> None:
+    """Запрашивает название города."""
+    user = Users(message.from_user.id)
+    user.cmd_message = message
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    bot.set_state(message.from_user.id, UserSearchState.flex_city, message.chat.id)
+    wizard.start(user, message.chat.id, CITY_PROMPT)
+
+
+@bot.message_handler(func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.flex_city)
+def get_flexible_city(message: Message) -> None:
+    """Получает название города от пользователя и направляет перечень найденных городов для уточнения.
+
+    :except QuotaExceededError: Исчерпан лимит запросов к API
+    :except ConnectionError: При отсутствии ответа от сервера вызывается исключение
+    """
+    user = Users.get_user(message.from_user.id)
+    wizard.defer_delete(user, message.message_id)
+    try:
+        cities = search_cities(user.user_id, translate(message.text))
+    except ConnectionError as exc:
+        if isinstance(exc, QuotaExceededError):
+            logger.warning(f"{exc}", user_id=user.user_id)
+            wizard.show(user, message.chat.id, exc.hint)
+        else:
+            logger.error(f"{exc}", user_id=user.user_id)
+            wizard.show(user, message.chat.id, "Нет ответа от сервера📡. Повторите запрос позже")
+        wizard.finish(user, message.chat.id)
+        bot.delete_state(message.from_user.id, message.chat.id)
+        return
+    if cities:
+        wizard.show(user, message.chat.id, "Выберите город", reply_markup=clarify_city(cities))
+        bot.set_state(message.from_user.id, UserSearchState.flex_verified_city, message.chat.id)
+    else:
+        wizard.show(user, message.chat.id, f"❗️Город отсутствует в базе Hotels.com. Повторите запрос\n{CITY_PROMPT}")
+
+
+@bot.callback_query_handler(func=lambda call: True, state=UserSearchState.flex_verified_city)
+def select_flexible_city(call: CallbackQuery) -> None:
+    """Сохраняет выбранный пользователем город и запрашивает месяц заезда."""
+    user = Users.get_user(call.from_user.id)
+    if call.data == "again":
+        wizard.show(user, call.message.chat.id, CITY_PROMPT)
+        bot.set_state(call.from_user.id, UserSearchState.flex_city, call.message.chat.id)
+        return
+    user.city, user.region_id = call.data.split("#")
+    wizard.confirm(user, f"📍Выбран город {user.city}")
+    wizard.show(user, call.message.chat.id, "📆Выберите месяц заезда", reply_markup=months(date.today()))
+    bot.set_state(call.from_user.id, UserSearchState.flex_month, call.message.chat.id)
+
+
+@bot.callback_query_handler(
+    func=lambda call: MONTH_CALLBACK.fullmatch(call.data) is not None, state=UserSearchState.flex_month
+)
+def select_month(call: CallbackQuery) -> None:
+    """Сохраняет даты заезда выбранного месяца и запрашивает количество ночей.
+
+    Если выбранный месяц уже прошел (кнопка нажата в старом сообщении), месяцы предлагаются заново.
+    """
+    user = Users.get_user(call.from_user.id)
+    year, month = map(int, call.data.split("-"))
+    user.flex_dates = month_dates(year, month)
+    if not user.flex_dates:
+        wizard.show(user, call.message.chat.id, "📆Выберите месяц заезда", reply_markup=months(date.today()))
+        return
+    wizard.confirm(user, f"📆Даты заезда: {user.flex_dates[0]:%d.%m.%Y} - {user.flex_dates[-1]:%d.%m.%Y}")
+    wizard.show(user, call.message.chat.id, "🌙Выберите количество ночей", reply_markup=number_of_nights())
+    bot.set_state(call.from_user.id, UserSearchState.flex_nights, call.message.chat.id)
+
+
+@bot.callback_query_handler(func=lambda call: call.data.isdigit(), state=UserSearchState.flex_nights)
+def select_nights(call: CallbackQuery) -> None:
+    """Выполняет поиски самых дешевых отелей для каждой даты заезда месяца и выводит результат.
+
+    :except QuotaExceededError: Вызывает исключение, если поиски не укладываются в лимиты запросов к API
+    """
+    user = Users.get_user(call.from_user.id)
+    chat_id = call.message.chat.id
+    nights = int(call.data)
+    bot.delete_state(call.from_user.id, chat_id)
+    wizard.confirm(user, f"🌙Ночей: {nights}")
+    try:
+        quota.admit(user.user_id, len(user.flex_dates))
+    except QuotaExceededError as exc:
+        logger.warning(f"{exc}", user_id=user.user_id)
+        wizard.show(user, chat_id, exc.hint)
+        wizard.finish(user, chat_id)
+        return
+    wizard.show(user, chat_id, f"🔍Выполняется поиск по {len(user.flex_dates)} датам заезда⌛️")
+    logger.info(f"Search {user.current_cmd} started", user_id=user.user_id)
+    rows = scan_dates(user.user_id, {"name": user.city, "id": user.region_id}, user.flex_dates, nights)
+    if all(row.error for row in rows):
+        wizard.show(user, chat_id, "Нет ответа от сервера📡. Повторите запрос позже")
+    elif all(row.min_price is None for row in rows):
+        wizard.show(user, chat_id, "По Вашему запросу ничего не найдено️☹️. Измените параметры поиска")
+    else:
+        wizard.show(user, chat_id, f"✅Выполнено поисков: {len(rows)}")
+        text = format_price_calendar(rows, nights)
+        wizard.api_call(user, bot.send_message, chat_id, text, parse_mode="Markdown")
+        logger.success(f"Command {user.current_cmd} completed successfully", user_id=user.user_id, keep=True)
+    wizard.finish(user, chat_id)
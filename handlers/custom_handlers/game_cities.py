@@ -19,21 +19,22 @@ Functions:
         Продолжает или останавливает игру
     check_players_city:
         Проверяет город, введенный пользователем
+    get_hint:
+        Подсказывает ближайший к последнему городу несыгранный город на нужную букву
     get_next_city:
         Получает следующий город
-    get_last_letter:
-        Получает последнюю букву последнего города
 """
-from typing import Optional
-
 from telebot.types import CallbackQuery, Message, ReplyKeyboardRemove
 
 from config_data.config import COMMAND_MESSAGES
 from database.game_cities import crud
+from database.game_cities.city_index import get_city_index
+from database.game_cities.session import GameSession
 from keyboards.inline.game_menu import game_menu
 from keyboards.reply.quit_game import quit_game
 from loader import bot
 from states.search_data import UserSearchState
+from utils.profiling import profiled
 
 
 def start_game_question(chat_id: int, user_id: int) -> None:
@@ -115,55 +116,77 @@ def select_menu_item(call: CallbackQuery) -> None:
 @bot.message_handler(
     func=lambda message: message.text not in COMMAND_MESSAGES, state=UserSearchState.game_cities_start
 )
+@profiled
 def play_game(message: Message) -> None:
     """Продолжает или завершает игру с выводом и сохранением результата."""
+    session = GameSession.get(message.from_user.id)
     if message.text == "🏳️Сдаюсь":
-        scores = crud.save_max_player_scores(player_id=message.from_user.id)
+        with session.lock:
+            scores = session.finish()
         bot.send_message(message.chat.id, f"Вы набрали {scores} очков", reply_markup=ReplyKeyboardRemove())
-        crud.delete_played_cities_from_db(player_id=message.from_user.id)
         bot.delete_state(message.from_user.id, message.chat.id)
+    elif message.text == "💡Подсказка":
+        with session.lock:
+            answer = get_hint(session)
+        bot.send_message(message.chat.id, answer, reply_markup=quit_game())
     else:
-        bot.send_message(
-            message.chat.id,
-            check_players_city(message.from_user.id, message.text),
-            parse_mode="Markdown",
-            reply_markup=quit_game(),
-        )
-
-
-def check_players_city(player_id: int, city: str) -> str:
-    """Проверяет введенный пользователем город и возвращает следующий город."""
-    first_letter = get_last_letter(player_id)
-    if city[0] != first_letter and first_letter is not None:
+        with session.lock:
+            answer = check_players_city(session, message.text)
+        bot.send_message(message.chat.id, answer, parse_mode="Markdown", reply_markup=quit_game())
+
+
+def check_players_city(session: GameSession, city: str) -> str:
+    """Проверяет введенный пользователем город и возвращает следующий город.
+
+    Город ищется без учета регистра, "ё" и дефисов. Если город не найден, предлагаются похожие названия.
+    """
+    city_index = get_city_index()
+    first_letter = session.last_letter
+    number = city_index.resolve(city)
+    name = city_index.names[number] if number is not None else city
+    if first_letter is not None and name[0].upper() != first_letter:
         return f"Введите город на букву {first_letter}"
-    elif not crud.find_city_in_db(city=city):
+    elif number is None:
+        suggestions = city_index.suggest(city, first_letter=first_letter)
+        if suggestions:
+            names = ", ".join(city_index.names[suggestion] for suggestion in suggestions)
+            return f"Такого города не существует. Возможно, Вы имели в виду: {names}"
         return "Такого города не существует"
-    elif crud.find_in_played_cities(player_id=player_id, city=city):
+    elif number in session.played:
         return "Этот город уже был"
     else:
-        crud.add_played_city_to_db(player_id=player_id, city=city)
-        return get_next_city(player_id=player_id)
+        session.play(number)
+        return get_next_city(session)
+
+
+def get_hint(session: GameSession) -> str:
+    """Подсказывает ближайший к последнему сыгранному городу несыгранный город на нужную букву.
+
+    Выводятся первая буква, длина названия и расстояние от последнего города.
+    """
+    if session.last_city is None:
+        return "Назовите любой город: подсказка доступна со второго хода"
+    city_index = get_city_index()
+    first_letter = session.last_letter
+    nearest = city_index.nearest(session.last_city, 1, first_letter=first_letter, played=session.played)
+    if not nearest:
+        return f"Несыгранных городов на букву {first_letter} не осталось"
+    number, distance = nearest[0]
+    name = city_index.names[number]
+    return (
+        f"💡Ближайший к городу {city_index.names[session.last_city]} город на букву {first_letter} "
+        f"находится в {distance:.0f} км: {name[0]}{'•' * (len(name) - 1)}"
+    )
 
 
-def get_next_city(player_id: int) -> str:
+def get_next_city(session: GameSession) -> str:
     """Получает город на последнюю букву предыдущего города из несыгранных или сообщает о победе игрока."""
-    first_letter = get_last_letter(player_id=player_id)
-    city = crud.get_city_from_db(player_id=player_id, first_letter=first_letter)
-    if city:
-        last_letter = get_last_letter(player_id=player_id)
-        return city + f"Вам на {last_letter}"
+    city_index = get_city_index()
+    first_letter = session.last_letter
+    number = city_index.random_unplayed(first_letter, session.played)
+    if number is not None:
+        session.play(number)
+        return city_index.map_link(number) + f"Вам на {session.last_letter}"
     else:
-        crud.save_max_player_scores(player_id=player_id, win_scores=500)
-        crud.delete_played_cities_from_db(player_id=player_id)
+        session.finish(win_scores=500)
         return f"Я больше не знаю городов на букву {first_letter}. Вы выиграли"
-
-
-def get_last_letter(player_id: int) -> Optional[str]:
-    """Получает последнюю букву последнего города."""
-    city = crud.get_last_city(player_id)
-    if city:
-        last_letter = city[-1].upper()
-        if last_letter in "ЪЬ":
-            last_letter = city[-2].upper()
-        return last_letter
-    return None
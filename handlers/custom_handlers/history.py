@@ -2,17 +2,19 @@
 
 Functions:
     send_history_answer: В ответ на команду history выводит историю запросов пользователя
-    history_request_action: Выводит результаты поиска отелей или повторяет запрос
+    history_request_action: Выводит результаты поиска отелей, повторяет запрос или оформляет подписку на снижение цены
 """
 
 from telebot.types import CallbackQuery, Message
 
 from database.history.crud import get_requests_from_db, get_results_from_db
 from handlers.custom_handlers.common_search_handlers import get_search_results
+from handlers.custom_handlers.price_watch import subscribe
 from keyboards.inline.history_request_action import request_action
 from loader import bot
 from states.search_data import UserSearchState
 from states.users import Users
+from utils.hotel_info import format_price, hotel_link
 from utils.logging import logger
 
 
@@ -42,7 +44,7 @@ def send_history_answer(message: Message) -> None:
 
 @bot.callback_query_handler(func=lambda call: True, state=UserSearchState.history_request_action)
 def history_request_action(call: CallbackQuery) -> None:
-    """Повторяет запрос пользователя или выводит результаты поиска по запросу."""
+    """Повторяет запрос пользователя, выводит результаты поиска по запросу или оформляет подписку на снижение цены."""
     action, request_id = call.data.split()
     if action == "repeat":
         user = Users(call.from_user.id)
@@ -59,13 +61,15 @@ def history_request_action(call: CallbackQuery) -> None:
         user.min_distance = request.min_distance
         user.max_distance = request.max_distance
         get_search_results(chat_id=call.message.chat.id, user_id=call.from_user.id)
+    elif action == "watch":
+        subscribe(call, int(request_id))
     else:
         results = get_results_from_db(call.from_user.id, request_id)
         for result in results:
             text = (
-                f"{result.name}\n"
+                f"{hotel_link(result.name, result.property_id)}\n"
                 f"Расстояние, миль: {result.distance}\n"
-                f"Цена: {result.price}\n"
-                f"Общая стоимость: {result.total}"
+                f"Цена: {format_price(result.price, result.currency)}\n"
+                f"Общая стоимость: {format_price(result.total, result.currency)}"
             )
             bot.send_message(call.message.chat.id, text, parse_mode="Markdown", disable_web_page_preview=True)
@@ -0,0 +1,47 @@
+"""Модуль обслуживания БД истории запросов по команде maintenance (только для администратора).
+
+Functions:
+    run_maintenance: Запускает обслуживание БД истории и выводит отчет
+"""
+import threading
+
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID, HISTORY_ARCHIVE_DAYS
+from database.history.maintenance import history_maintenance
+from loader import bot
+from utils.logging import logger
+
+
+@bot.message_handler(func=lambda message: message.from_user.id == int(ADMIN_ID), commands=["maintenance"])
+def run_maintenance(message: Message) -> None:
+    """Запускает обслуживание БД истории в фоновом потоке, не занимая поток обработки сообщений.
+
+    По окончании выводит количество перенесенных в архив и удаленных записей и освобожденное место.
+    """
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    bot.send_message(
+        message.chat.id, f"🧹Обслуживание БД истории запущено (архив запросов старше {HISTORY_ARCHIVE_DAYS} дней)"
+    )
+
+    def run() -> None:
+        try:
+            report = history_maintenance.run_once()
+        except Exception as exc:
+            logger.error(f"History maintenance failed: {exc!r}", user_id=message.from_user.id)
+            bot.send_message(message.chat.id, "Обслуживание БД истории завершилось ошибкой, подробности в логе")
+            return
+        if report is None:
+            bot.send_message(message.chat.id, "Обслуживание БД истории уже выполняется")
+            return
+        text = [
+            f"🧹Обслуживание БД истории завершено за {report.duration:.1f} с",
+            f"В архив перенесено запросов: {report.archived_requests}, результатов: {report.archived_results}",
+            f"Удалено результатов без запроса: {report.orphans}",
+            f"Освобождено: {report.reclaimed / 1024:.0f} КБ "
+            f"({report.size_before / 1024:.0f} КБ -> {report.size_after / 1024:.0f} КБ)",
+        ]
+        text.extend(f"Архив: {path}" for path in report.files)
+        bot.send_message(message.chat.id, "\n".join(text))
+
+    threading.Thread(target=run, name="history_maintenance_command", daemon=True).start()
@@ -0,0 +1,42 @@
+"""Модуль отчета о расходе памяти по команде memory (только для администратора).
+
+/memory - RSS процесса, количество и объем записей структур бота, рост памяти по строкам кода
+с предыдущего отчета (если включена трассировка);
+/memory trace [кадров] - включить трассировку выделений памяти (tracemalloc);
+/memory off - выключить трассировку.
+
+Functions:
+    send_memory: Выводит отчет о расходе памяти, включает и выключает трассировку
+"""
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID
+from loader import bot
+from utils.logging import logger
+from utils.memory import memory_monitor
+
+
+@bot.message_handler(func=lambda message: message.from_user.id == int(ADMIN_ID), commands=["memory"])
+def send_memory(message: Message) -> None:
+    """Включает (trace) или выключает (off) трассировку выделений памяти и выводит отчет о расходе памяти."""
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    args = message.text.split()[1:]
+    action = args[0].lower() if args else ""
+    if action == "trace":
+        frames = int(args[1]) if len(args) > 1 and args[1].isdigit() else 1
+        memory_monitor.start_tracing(max(frames, 1))
+        bot.send_message(
+            message.chat.id,
+            "🔍Трассировка памяти включена. /memory покажет рост памяти по строкам кода, /memory off - выключить",
+        )
+        return
+    if action == "off":
+        memory_monitor.stop_tracing()
+    elif action:
+        bot.send_message(message.chat.id, f"Неизвестный аргумент {action}. Аргументы: trace [кадров], off")
+        return
+    text = ["🧠Расход памяти:"]
+    text.extend(memory_monitor.format_report())
+    if not memory_monitor.is_tracing():
+        text.append("\nТрассировка выключена. Включить: /memory trace")
+    bot.send_message(message.chat.id, "\n".join(text))
@@ -0,0 +1,88 @@
+"""Модуль подписок пользователей на снижение цены.
+
+Подписка оформляется кнопкой "Следить" у запроса из истории (модуль history). Цены проверяет
+планировщик database.price_watch, запускаемый main.py после подготовки баз данных.
+
+Functions:
+    subscribe: Оформляет подписку на снижение цены по запросу из истории
+    notify_price_drop: Уведомляет пользователя о снижении цены
+    unsubscribe: Отменяет подписку по кнопке "Отписаться"
+"""
+from datetime import date
+
+from telebot.apihelper import ApiTelegramException
+from telebot.types import CallbackQuery
+
+from database.api_requests.compare import ComparisonRow
+from database.history.crud import (MAX_PRICE_WATCHES, add_price_watch,
+                                   cancel_price_watch,
+                                   cancel_user_price_watches,
+                                   get_requests_from_db)
+from database.history.model import PriceWatch
+from database.price_watch import PriceWatchScheduler
+from keyboards.inline import cancel_watch
+from loader import bot
+from utils.hotel_info import format_price
+from utils.logging import logger
+
+
+def subscribe(call: CallbackQuery, request_id: int) -> None:
+    """Оформляет подписку на снижение минимальной цены за ночь в городе и на даты запроса из истории."""
+    request = get_requests_from_db(call.from_user.id, request_id=request_id).first()
+    if request is None or request.check_in_date < date.today():
+        bot.send_message(call.message.chat.id, "❗Даты заезда по этому запросу уже прошли")
+        return
+    watch, created = add_price_watch(call.from_user.id, request_id)
+    if watch is None:
+        bot.send_message(
+            call.message.chat.id,
+            f"❗Можно следить не более чем за {MAX_PRICE_WATCHES} запросами. Отмените одну из подписок",
+        )
+        return
+    if created:
+        logger.info(f"Price watch {watch.id} created", user_id=call.from_user.id)
+    price = f", текущая цена от {format_price(watch.last_price)} за ночь" if watch.last_price is not None else ""
+    bot.send_message(
+        call.message.chat.id,
+        f"🔔Сообщу о снижении цены: {watch.city}, {watch.check_in_date:%d.%m.%Y} - {watch.check_out_date:%d.%m.%Y}"
+        f"{price}",
+        reply_markup=cancel_watch(watch.id),
+    )
+
+
+def notify_price_drop(watch: PriceWatch, row: ComparisonRow) -> None:
+    """Уведомляет пользователя о снижении минимальной цены за ночь.
+
+    Если пользователь заблокировал бота, все его подписки отменяются, чтобы их цены больше не проверялись.
+
+    :param watch: Подписка с последней известной ценой
+    :param row: Результат проверки цены
+    :except ApiTelegramException: Уведомление не отправлено (кроме блокировки бота пользователем)
+    """
+    try:
+        bot.send_message(
+            watch.user.user_id,
+            f"📉Цена снизилась: {watch.city}, {watch.check_in_date:%d.%m.%Y} - {watch.check_out_date:%d.%m.%Y}\n"
+            f"{format_price(watch.last_price)} → {format_price(row.min_price)} за ночь ({row.hotel})",
+            reply_markup=cancel_watch(watch.id),
+        )
+    except ApiTelegramException as exc:
+        if exc.error_code != 403:
+            raise
+        cancelled = cancel_user_price_watches(watch.user.user_id)
+        logger.warning(f"Bot blocked by user, {cancelled} price watches cancelled", user_id=watch.user.user_id)
+        return
+    logger.info(f"Price watch {watch.id} drop {watch.last_price} -> {row.min_price}", user_id=watch.user.user_id)
+
+
+@bot.callback_query_handler(func=lambda call: call.data.startswith("unwatch "))
+def unsubscribe(call: CallbackQuery) -> None:
+    """Отменяет подписку на снижение цены."""
+    watch_id = int(call.data.split()[1])
+    if cancel_price_watch(call.from_user.id, watch_id):
+        logger.info(f"Price watch {watch_id} cancelled", user_id=call.from_user.id)
+    bot.edit_message_reply_markup(call.message.chat.id, call.message.message_id, reply_markup=None)
+    bot.send_message(call.message.chat.id, "🔕Подписка отменена")
+
+
+scheduler = PriceWatchScheduler(notify=notify_price_drop)
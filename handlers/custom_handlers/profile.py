@@ -0,0 +1,64 @@
+"""Модуль профилирования обработчиков и запросов к API по команде profile (только для администратора).
+
+/profile - состояние профилирования и функции с наибольшим собственным временем;
+/profile cprofile или /profile sample - включить профилирование в выбранном режиме;
+/profile off - выключить профилирование и получить файлы с результатами (.pstats и .collapsed).
+
+Functions:
+    profile_report: Формирует отчет о профилировании
+    send_profile: Включает и выключает профилирование, выводит его результаты
+"""
+from datetime import datetime
+from typing import List
+
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID
+from loader import bot
+from utils.logging import logger
+from utils.profiling import MODES, profiler
+
+
+def profile_report() -> List[str]:
+    """Формирует отчет: режим, количество и средняя длительность вызовов, функции с наибольшим собственным временем.
+
+    :return: Строки отчета
+    """
+    if profiler.mode is not None:
+        text = [f"🔬Профилирование в режиме {profiler.mode} с {datetime.fromtimestamp(profiler.started):%H:%M:%S}"]
+    else:
+        text = ["🔬Профилирование выключено. Включить: /profile cprofile или /profile sample"]
+    if profiler.calls:
+        text.append("\n⏱Профилированные вызовы:")
+        text.extend(
+            f"{name}: {count}, в среднем {total / count * 1000:.0f} мс"
+            for name, (count, total) in sorted(profiler.calls.items())
+        )
+    hot_spots = profiler.hot_spots()
+    if hot_spots:
+        text.append("\n🔥Собственное время функций:")
+        text.extend(f"{function}: {share:.1%}" for function, share in hot_spots)
+    return text
+
+
+@bot.message_handler(func=lambda message: message.from_user.id == int(ADMIN_ID), commands=["profile"])
+def send_profile(message: Message) -> None:
+    """Включает профилирование в режиме из аргумента команды, выключает его (off) или выводит отчет."""
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    args = message.text.split()[1:]
+    action = args[0].lower() if args else ""
+    if action in MODES:
+        profiler.start(action)
+        bot.send_message(
+            message.chat.id, f"🔬Профилирование включено в режиме {action}. Выключить и получить файлы: /profile off"
+        )
+    elif action == "off":
+        profiler.stop()
+        bot.send_message(message.chat.id, "\n".join(profile_report()))
+        for path in profiler.dump():
+            with open(path, "rb") as file:
+                bot.send_document(message.chat.id, file)
+    elif action:
+        bot.send_message(message.chat.id, f"Неизвестный режим {action}. Режимы: {', '.join(MODES)}, off")
+    else:
+        bot.send_message(message.chat.id, "\n".join(profile_report()))
@@ -0,0 +1,31 @@
+"""Модуль вывода расхода лимитов запросов к API Hotels.com по команде quota (только для администратора).
+
+Functions:
+    send_quota: Выводит остаток суточных лимитов, запросы по endpoint и пользователей с наибольшим расходом
+"""
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID
+from database.api_requests.quota import quota
+from loader import bot
+from utils.logging import logger
+
+
+@bot.message_handler(func=lambda message: message.from_user.id == int(ADMIN_ID), commands=["quota"])
+def send_quota(message: Message) -> None:
+    """Выводит расход и остаток суточного лимита запросов к API, запросы по endpoint и ТОП5 пользователей."""
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    endpoints, users = quota.usage()
+    _, remaining = quota.remaining(message.from_user.id)
+    used = quota.daily_limit - remaining
+    share = f" ({used / quota.daily_limit:.0%})" if quota.daily_limit else ""
+    text = [
+        f"🎫Запросы к API Hotels.com за сегодня: {used} из {quota.daily_limit}{share}",
+        f"Остаток: {remaining}, дорогие поиски отклоняются после {quota.daily_limit * quota.shed_ratio:.0f}",
+        f"Отклонено поисков и запросов: {quota.rejected}",
+        "\n📡По endpoint:",
+    ]
+    text.extend(f"{endpoint}: {calls}" for endpoint, calls in sorted(endpoints.items()))
+    text.append(f"\n👤Пользователи (лимит {quota.user_limit}):")
+    text.extend(f"{user_id or 'фоновые задачи'}: {calls}" for user_id, calls in users)
+    bot.send_message(message.chat.id, "\n".join(text))
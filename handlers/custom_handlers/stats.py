@@ -0,0 +1,41 @@
+"""Модуль вывода статистики поиска отелей по команде stats (только для администратора).
+
+Functions:
+    send_stats: Выводит процентили цен, самые популярные города поиска и статистику запросов к Bot API
+"""
+from telebot.types import Message
+
+from config_data.config import ADMIN_ID
+from database.api_requests.cache import api_cache
+from database.history.crud import get_popular_regions, get_price_percentiles
+from database.history.maintenance import history_maintenance
+from database.prewarm import prewarmer
+from loader import bot
+from utils import bot_api_metrics
+from utils.hotel_info import format_price
+from utils.logging import logger
+
+PERCENTILES = (25, 50, 75, 90, 95)
+
+
+@bot.message_handler(func=lambda message: message.from_user.id == int(ADMIN_ID), commands=["stats"])
+def send_stats(message: Message) -> None:
+    """Выводит процентили цены за ночь, ТОП10 городов по количеству запросов и статистику запросов к Bot API."""
+    logger.info(f"Command {message.text}", user_id=message.from_user.id)
+    total, percentiles = get_price_percentiles(message.from_user.id, PERCENTILES)
+    text = [f"📊Цена за ночь ({total} результатов):"]
+    text.extend(f"p{percentile}: {format_price(price)}" for percentile, price in percentiles.items())
+    text.append("\n🗺Популярные города:")
+    for place, (region_id, city, searches) in enumerate(get_popular_regions(message.from_user.id), start=1):
+        text.append(f"{place}. {city} (id {region_id}) - {searches}")
+    text.append(
+        f"\n🗃Кэш API Hotels.com: {len(api_cache)} записей, попаданий {api_cache.hit_rate:.0%} "
+        f"({api_cache.hits} из {api_cache.hits + api_cache.misses})"
+    )
+    if prewarmer.report is not None:
+        text.append(prewarmer.report.format())
+    if history_maintenance.report is not None:
+        text.append(history_maintenance.report.format())
+    text.append("\n📡Запросы к Bot API:")
+    text.extend(bot_api_metrics.format_report())
+    bot.send_message(message.chat.id, "\n".join(text))
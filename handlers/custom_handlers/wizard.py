@@ -0,0 +1,90 @@
+"""Модуль сообщения-мастера поиска отелей.
+
+Диалог поиска ведется в одном сообщении бота, которое изменяется на каждом шаге: выбранные параметры
+перечисляются в начале сообщения, ниже выводится текущий вопрос с клавиатурой. Сообщения пользователя
+удаляются одной серией в конце диалога. Вызовы Bot API диалога подсчитываются вместе с их длительностью.
+
+Functions:
+    api_call: Вызывает метод Bot API и учитывает его в счетчике диалога
+    start: Начинает диалог новым сообщением-мастером
+    show: Изменяет сообщение-мастер, выводя выбранные параметры и вопрос
+    confirm: Добавляет выбранный параметр в сообщение-мастер
+    defer_delete: Откладывает удаление сообщения пользователя до конца диалога
+    finish: Удаляет отложенные сообщения и выводит в лог количество вызовов Bot API диалога
+"""
+import time
+from typing import Any, Callable, Optional
+
+from telebot.apihelper import ApiTelegramException
+
+from loader import bot
+from states.users import Users
+from utils.logging import logger
+
+
+def api_call(user: Users, method: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Вызывает метод Bot API и учитывает его в счетчике вызовов и длительности диалога.
+
+    :param user: Пользователь
+    :param method: Метод бота, например bot.send_message
+    :return: Результат метода
+    """
+    started = time.perf_counter()
+    try:
+        return method(*args, **kwargs)
+    finally:
+        user.api_calls += 1
+        user.api_time += time.perf_counter() - started
+
+
+def start(user: Users, chat_id: int, prompt: str, reply_markup: Any = None) -> None:
+    """Начинает диалог: сбрасывает выбранные параметры и счетчики и отправляет новое сообщение-мастер."""
+    user.wizard_lines = list()
+    user.pending_deletes = list()
+    user.api_calls = 0
+    user.api_time = 0.0
+    user.conversation_started = time.perf_counter()
+    user.wizard_message = api_call(user, bot.send_message, chat_id, prompt, reply_markup=reply_markup).id
+
+
+def show(user: Users, chat_id: int, prompt: Optional[str] = None, reply_markup: Any = None) -> None:
+    """Изменяет сообщение-мастер: выбранные параметры и вопрос prompt с клавиатурой reply_markup.
+
+    Если сообщения-мастера нет (например, при повторе запроса из истории) или оно удалено пользователем,
+    отправляется новое сообщение.
+    """
+    text = "\n".join(user.wizard_lines + ([prompt] if prompt else []))
+    if user.wizard_message is not None:
+        try:
+            api_call(user, bot.edit_message_text, text, chat_id, user.wizard_message, reply_markup=reply_markup)
+            return
+        except ApiTelegramException as exc:
+            if "message is not modified" in exc.description:
+                return
+            logger.info(f"Wizard message {user.wizard_message} {exc.description}", user_id=user.user_id)
+    user.wizard_message = api_call(user, bot.send_message, chat_id, text, reply_markup=reply_markup).id
+
+
+def confirm(user: Users, line: str) -> None:
+    """Добавляет выбранный параметр в сообщение-мастер (будет выведен при следующем show)."""
+    user.wizard_lines.append(line)
+
+
+def defer_delete(user: Users, message_id: int) -> None:
+    """Откладывает удаление сообщения пользователя до конца диалога."""
+    user.pending_deletes.append(message_id)
+
+
+def finish(user: Users, chat_id: int) -> None:
+    """Удаляет отложенные сообщения пользователя и выводит в лог количество вызовов Bot API диалога."""
+    for message_id in user.pending_deletes:
+        try:
+            api_call(user, bot.delete_message, chat_id, message_id)
+        except ApiTelegramException as exc:
+            logger.info(f"Message {message_id} {exc.description}", user_id=user.user_id)
+    user.pending_deletes = list()
+    logger.info(
+        f"Conversation {user.current_cmd}: {user.api_calls} Bot API calls in {user.api_time:.3f} s, "
+        f"{time.perf_counter() - user.conversation_started:.1f} s total",
+        user_id=user.user_id,
+    )
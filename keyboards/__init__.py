@@ -1,2 +1,6 @@
-"""Загружает пакеты модулей inline и reply клавиатур."""
-from . import inline, reply
+"""Загружает пакеты модулей inline и reply клавиатур.
+
+Modules:
+    cache: Кэширование статических клавиатур
+"""
+from . import cache, inline, reply
@@ -0,0 +1,26 @@
+"""Модуль кэширования клавиатур.
+
+Functions:
+    static_markup: Декоратор функции создания статической клавиатуры
+"""
+import functools
+from typing import Callable
+
+from telebot.types import JsonSerializable
+
+
+def static_markup(build: Callable[[], JsonSerializable]) -> Callable[[], str]:
+    """Декоратор функции создания статической клавиатуры.
+
+    Клавиатура создается при первом вызове и хранится сериализованной в JSON. telebot передает строку JSON
+    в reply_markup без изменений, поэтому повторные вызовы не создают объекты и не сериализуют их.
+
+    :param build: Функция создания клавиатуры без параметров
+    :return: Функция, возвращающая клавиатуру в JSON
+    """
+
+    @functools.lru_cache(maxsize=None)
+    def serialized() -> str:
+        return build().to_json()
+
+    return functools.update_wrapper(serialized, build)
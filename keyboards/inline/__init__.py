@@ -1,5 +1,8 @@
 """Загружает модули создания inline клавиатур."""
 from .change_date import change_date
 from .cities import clarify_city
+from .months import months
 from .number_of_hotels import number_of_hotels
+from .number_of_nights import number_of_nights
 from .number_of_photos import number_of_photos
+from .price_watch import cancel_watch
@@ -1,7 +1,10 @@
 """Модуль создания клавиатуры игрового меню."""
 from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from keyboards.cache import static_markup
 
+
+@static_markup
 def game_menu() -> InlineKeyboardMarkup:
     """Создание клавиатуры с игровым меню."""
     buttons = [
@@ -7,5 +7,6 @@ def request_action(request_id: int) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardMarkup()
     key_repeat = InlineKeyboardButton(text="Повторить", callback_data=" ".join(("repeat", str(request_id))))
     key_show_results = InlineKeyboardButton(text="Результаты", callback_data=" ".join(("results", str(request_id))))
-    keyboard.add(key_repeat, key_show_results)
+    key_watch = InlineKeyboardButton(text="🔔Следить", callback_data=" ".join(("watch", str(request_id))))
+    keyboard.add(key_repeat, key_show_results, key_watch)
     return keyboard
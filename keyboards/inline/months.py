@@ -0,0 +1,19 @@
+"""Модуль создания клавиатуры выбора месяца."""
+from datetime import date
+
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+MONTHS = (
+    "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
+    "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь",
+)
+
+
+def months(first: date, count: int = 6) -> InlineKeyboardMarkup:
+    """Создание клавиатуры с count месяцами, начиная с месяца даты first (callback_data вида "2026-11")."""
+    buttons = list()
+    for shift in range(count):
+        year, month = divmod(first.month - 1 + shift, 12)
+        year += first.year
+        buttons.append(InlineKeyboardButton(f"{MONTHS[month]} {year}", callback_data=f"{year}-{month + 1}"))
+    return InlineKeyboardMarkup([buttons[index:index + 2] for index in range(0, len(buttons), 2)])
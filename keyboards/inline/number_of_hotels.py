@@ -1,7 +1,10 @@
 """Модуль создания клавиатуры с количеством отелей."""
 from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from keyboards.cache import static_markup
 
+
+@static_markup
 def number_of_hotels() -> InlineKeyboardMarkup:
     """Создание клавиатуры с количеством отелей для вывода в результатах."""
     buttons = [
@@ -0,0 +1,14 @@
+"""Модуль создания клавиатуры с количеством ночей."""
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from keyboards.cache import static_markup
+
+
+@static_markup
+def number_of_nights() -> InlineKeyboardMarkup:
+    """Создание клавиатуры с количеством ночей проживания."""
+    buttons = [
+        [InlineKeyboardButton(str(number), callback_data=number) for number in (1, 2, 3, 4)],
+        [InlineKeyboardButton(str(number), callback_data=number) for number in (5, 7, 10, 14)],
+    ]
+    return InlineKeyboardMarkup(buttons)
@@ -1,7 +1,10 @@
 """Модуль создания клавиатуры с количеством фотографий."""
 from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from keyboards.cache import static_markup
 
+
+@static_markup
 def number_of_photos() -> InlineKeyboardMarkup:
     """Создание клавиатуры с количеством фотографий отеля."""
     buttons = [
@@ -0,0 +1,9 @@
+"""Модуль создания клавиатуры отмены подписки на снижение цены."""
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+
+def cancel_watch(watch_id: int) -> InlineKeyboardMarkup:
+    """Создание клавиатуры с кнопкой отмены подписки на снижение цены."""
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton(text="🔕Отписаться", callback_data=" ".join(("unwatch", str(watch_id)))))
+    return keyboard
@@ -1,9 +1,12 @@
 """Модуль создания клавиатуры остановки игры."""
 from telebot.types import ReplyKeyboardMarkup
 
+from keyboards.cache import static_markup
 
+
+@static_markup
 def quit_game() -> ReplyKeyboardMarkup:
-    """Создает кнопку для окончания игры."""
+    """Создает кнопки подсказки и окончания игры."""
     keyboard = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True)
-    keyboard.add("🏳️Сдаюсь")
+    keyboard.add("💡Подсказка", "🏳️Сдаюсь")
     return keyboard
@@ -1,13 +1,122 @@
-"""Данный модуль создает экземпляр Телеграм бота и таблицы баз данных истории и игровой статистики."""
+"""Данный модуль создает экземпляр Телеграм бота и подготавливает базы данных истории и игровой статистики.
 
-from telebot import TeleBot
+Подготовка баз данных (миграции и загрузка индекса городов) выполняется функцией init_databases,
+которую main.py запускает одновременно с началом опроса сервера Telegram.
+
+Запросы к Bot API выполняются через общую сессию requests с пулом keep-alive соединений
+(размер пула и таймауты задаются в настройках); длительность и ошибки запросов каждого метода
+накапливаются в utils.bot_api_metrics.
+
+Если задан режим профилирования (PROFILE_MODE), профилирование включается при запуске бота,
+а его результаты сохраняются в PROFILE_DIR при остановке. Неизвестный режим записывается в лог как предупреждение,
+профилирование при этом не включается.
+Количество и объем записей хранилища состояний учитываются в отчете о расходе памяти (utils.memory).
+
+Classes:
+    Bot: Телеграм бот, начинающий обработку обновлений после подготовки баз данных
+
+Functions:
+    create_session: Создает сессию requests с пулом соединений для Bot API
+    send_request: Выполняет запрос к Bot API через общую сессию и учитывает его в статистике
+    init_databases: Применяет миграции баз данных и загружает индекс городов
+"""
+import atexit
+import threading
+import time
+from typing import Any, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from telebot import TeleBot, apihelper
 from telebot.storage import StateMemoryStorage
+from telebot.types import Update
 
 from config_data import config
-from database.game_cities.model import City, City2Player, Player, db_game
-from database.history.model import Request, Result, User, db
+from database.game_cities import migrations as game_migrations
+from database.game_cities.city_index import get_city_index
+from database.history import migrations as history_migrations
+from utils import bot_api_metrics
+from utils.memory import deep_size, register_gauge
+from utils.logging import logger
+from utils.profiling import MODES, profiler
+
+databases_ready = threading.Event()
+
+
+class Bot(TeleBot):
+    """Класс Bot, описывающий Телеграм бота, который обрабатывает обновления только после подготовки баз данных."""
+
+    def process_new_updates(self, updates: List[Update]) -> None:
+        """Ожидает подготовки баз данных и обрабатывает обновления."""
+        databases_ready.wait()
+        super().process_new_updates(updates)
+
+
+def create_session(pool_size: int = config.BOT_API_POOL_SIZE) -> requests.Session:
+    """Создает сессию requests с пулом из pool_size keep-alive соединений к api.telegram.org.
+
+    Запросы к Bot API не повторяются: при заданном apihelper.CUSTOM_REQUEST_SENDER telebot вызывает его
+    напрямую, без собственных повторных попыток, а адаптер создается с max_retries=0.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+    return session
+
+
+session = create_session()
+
+
+def send_request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """Выполняет запрос к Bot API через общую сессию (apihelper.CUSTOM_REQUEST_SENDER).
+
+    Длительность запроса и ошибка (код ответа HTTP или класс исключения requests) учитываются
+    в статистике метода Bot API, имя которого - последняя часть url.
+
+    :param method: Метод HTTP
+    :param url: Ссылка на метод Bot API
+    :return: Ответ сервера
+    """
+    api_method = url.rsplit("/", 1)[-1]
+    error = None
+    started = time.perf_counter()
+    try:
+        response = session.request(method, url, **kwargs)
+        if response.status_code != 200:
+            error = str(response.status_code)
+        return response
+    except requests.RequestException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        bot_api_metrics.record(api_method, time.perf_counter() - started, error)
+
+
+def init_databases() -> float:
+    """Применяет миграции баз данных истории и игры и загружает индекс городов.
+
+    :return: Время подготовки баз данных в секундах
+    """
+    started = time.perf_counter()
+    history_migrations.migrate()
+    game_migrations.migrate()
+    get_city_index()
+    databases_ready.set()
+    return time.perf_counter() - started
+
+
+apihelper.CUSTOM_REQUEST_SENDER = send_request
+apihelper.CONNECT_TIMEOUT = config.BOT_API_CONNECT_TIMEOUT
+apihelper.READ_TIMEOUT = config.BOT_API_READ_TIMEOUT
+atexit.register(bot_api_metrics.log_summary)
+atexit.register(profiler.dump)
+if config.PROFILE_MODE in MODES:
+    profiler.start(config.PROFILE_MODE)
+elif config.PROFILE_MODE:
+    logger.warning(
+        f"Unknown PROFILE_MODE {config.PROFILE_MODE!r}, expected one of {', '.join(MODES)}; profiling disabled",
+        user_id=0,
+    )
 
 storage = StateMemoryStorage()
-bot = TeleBot(token=config.BOT_TOKEN, state_storage=storage)
-db.create_tables([User, Result, Request], safe=True)
-db_game.create_tables([Player, City, City2Player], safe=True)
+bot = Bot(token=config.BOT_TOKEN, state_storage=storage)
+register_gauge("state storage", lambda: (sum(map(len, list(storage.data.values()))), deep_size(storage.data)))
@@ -1,12 +1,93 @@
-"""Модуль запуска телеграмм бота."""
+"""Модуль запуска телеграмм бота.
 
-from telebot import custom_filters, types
+Подготовка баз данных и создание меню команд выполняются в фоновых потоках одновременно с началом опроса
+сервера Telegram. Время холодного старта выводится в лог: на Linux - от запуска процесса (/proc/self/stat),
+то есть вместе с запуском интерпретатора и импортом модулей, на других системах - от окончания импорта модулей.
+После подготовки баз данных запускаются планировщики проверки цен по подпискам на снижение цены
+и заполнения кэша ответов API в часы низкой нагрузки, обслуживания БД истории,
+а также периодический вывод расхода памяти в лог.
+Профиль времени импорта модулей: python -m benchmarks.startup_profile
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+from telebot import custom_filters
 
 import handlers
-from loader import bot
+from database.history.maintenance import history_maintenance
+from database.prewarm import prewarmer
+from handlers.custom_handlers.price_watch import scheduler as price_watch_scheduler
+from loader import bot, init_databases
+from utils.logging import complete as complete_logging
+from utils.logging import logger
+from utils.memory import memory_monitor
 from utils.set_bot_commands import set_default_commands
 
+STARTED = time.perf_counter()
+
+
+def process_uptime() -> Optional[float]:
+    """Возвращает время с запуска процесса по /proc (Linux), с; None, если /proc недоступен."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # поля после имени процесса в скобках: starttime - 22-е поле, в тактах таймера от загрузки системы
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            return float(uptime.read().split()[0]) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def since_start() -> float:
+    """Возвращает время с запуска процесса или, если оно неизвестно, с окончания импорта модулей, с."""
+    uptime = process_uptime()
+    return uptime if uptime is not None else time.perf_counter() - STARTED
+
+
+def set_commands() -> None:
+    """Создает меню команд бота. Ошибка выводится в лог и не останавливает бота."""
+    try:
+        set_default_commands(bot)
+    except Exception as exc:
+        logger.error(f"Bot commands were not set: {exc!r}", user_id=0)
+
+
+def start_background_init(startup_time: float) -> None:
+    """Запускает подготовку баз данных и создание меню команд в фоновых потоках.
+
+    После подготовки баз данных запускаются планировщики и вывод расхода памяти,
+    после завершения обеих задач в лог выводится время холодного старта.
+    Если базы данных подготовить не удалось, бот завершает работу.
+
+    :param startup_time: Время запуска интерпретатора и импорта модулей бота в секундах
+    """
+    commands = threading.Thread(target=set_commands, name="set_commands", daemon=True)
+    commands.start()
+
+    def init() -> None:
+        try:
+            databases_time = init_databases()
+        except Exception as exc:
+            logger.critical(f"Databases initialization failed: {exc!r}", user_id=0)
+            complete_logging()
+            os._exit(1)
+        price_watch_scheduler.start()
+        prewarmer.start()
+        history_maintenance.start()
+        memory_monitor.start()
+        commands.join()
+        logger.info(
+            f"Cold start {since_start():.3f} s "
+            f"(startup and imports {startup_time:.3f} s, databases {databases_time:.3f} s)",
+            user_id=0,
+        )
+
+    threading.Thread(target=init, name="init_databases", daemon=True).start()
+
+
 if __name__ == "__main__":
-    set_default_commands(bot)
+    start_background_init(since_start())
     bot.add_custom_filter(custom_filters.StateFilter(bot))
     bot.infinity_polling()
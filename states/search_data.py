@@ -24,6 +24,12 @@ class UserSearchState(StatesGroup):
         game_change_name: Состояние, при котором ожидается изменение игрового имени
         get_password: Состояние, при котором ожидается ввод пароля
         choice_db: Состояние, при котором ожидается выбор базы данных для очистки
+        compare_cities: Состояние, при котором ожидается ввод городов для сравнения цен
+        compare_dates: Состояние, при котором ожидается ввод дат заезда для сравнения цен
+        flex_city: Состояние, при котором ожидается ввод города для поиска дешевых дат заезда
+        flex_verified_city: Состояние, при котором ожидается выбор города для поиска дешевых дат заезда
+        flex_month: Состояние, при котором ожидается выбор месяца заезда
+        flex_nights: Состояние, при котором ожидается выбор количества ночей
     """
 
     city = State()
@@ -44,3 +50,9 @@ class UserSearchState(StatesGroup):
     game_change_name = State()
     get_password = State()
     choice_db = State()
+    compare_cities = State()
+    compare_dates = State()
+    flex_city = State()
+    flex_verified_city = State()
+    flex_month = State()
+    flex_nights = State()
@@ -1,8 +1,11 @@
 """Модуль с информацией о текущем запросе пользователя."""
 from __future__ import annotations
 
+import time
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from utils.memory import deep_size, register_gauge
 
 
 class Users:
@@ -11,7 +14,12 @@ class Users:
     current_cmd: Текущая команда поиска пользователя
     creation_instance_time: Дата и время создания экземпляра класса
     cmd_message: Объект класса telebot.types.Message последнего сообщения с командой пользователя
-    next_delete_message: Номер сообщения, которое требует удаления
+    wizard_message: id сообщения-мастера поиска, которое изменяется на каждом шаге диалога
+    wizard_lines: Выбранные параметры поиска, выводимые в сообщении-мастере
+    pending_deletes: id сообщений пользователя, которые будут удалены в конце диалога
+    api_calls: Количество вызовов Bot API в текущем диалоге поиска
+    api_time: Суммарная длительность вызовов Bot API в текущем диалоге поиска, с
+    conversation_started: Время начала текущего диалога поиска (time.perf_counter)
     user_id: Telegram id пользователя
     request: Объект класса Request. Последний запрос пользователя. Используется для добавления результатов поиска
     region_id: id города, выбранного пользователем
@@ -25,6 +33,8 @@ class Users:
     total_days: Общее количество дней
     min_distance: Минимальное расстояние до центра, введенное пользователем
     max_distance: Максимальное расстояние до центра, введенное пользователем
+    compare_cities: Названия городов для сравнения цен (команда compare)
+    flex_dates: Даты заезда выбранного месяца (команда flexdates)
     all_users: Словарь со всеми пользователями бота
     """
 
@@ -35,7 +45,12 @@ class Users:
         self.__current_cmd: Optional[str] = None
         self.creation_instance_time: date = datetime.now()
         self.cmd_message: Any = None
-        self.next_delete_message: Optional[int] = None
+        self.wizard_message: Optional[int] = None
+        self.wizard_lines: List[str] = list()
+        self.pending_deletes: List[int] = list()
+        self.api_calls: int = 0
+        self.api_time: float = 0.0
+        self.conversation_started: float = time.perf_counter()
         self.user_id: int = user_id
         self.request = None
 
@@ -51,6 +66,8 @@ class Users:
         self.__total_days: int = 0
         self.__min_distance: int = 0
         self.__max_distance: int = 0
+        self.compare_cities: List[str] = list()
+        self.flex_dates: List[date] = list()
         Users.add_user(user_id, self)
 
     @classmethod
@@ -149,3 +166,6 @@ class Users:
         """Геттер общего количества дней."""
         self.__total_days = (self.check_out_date - self.check_in_date).days
         return self.__total_days
+
+
+register_gauge("Users.all_users", lambda: (len(Users.all_users), deep_size(Users.all_users)))
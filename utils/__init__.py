@@ -1,11 +1,21 @@
 """Загружает дополнительные утилиты для работы бота.
 
+Пакет импортирует только модули без побочных эффектов. Модули, которые при импорте настраивают логирование
+(logging и использующие его bot_api_metrics, memory, profiling) или читают настройки бота (set_bot_commands),
+импортируются там, где они нужны. Поэтому скрипт python -m utils.log_analytics не создает файлы логов
+в анализируемом каталоге.
+
 Modules:
+   bot_api_metrics: Статистика длительности и ошибок запросов к Telegram Bot API
    calendar_style: Изменение стиля календаря
    city_translator: Перевод названия городов с русского на английский
+   histogram: Гистограмма с логарифмическими корзинами для подсчета процентилей
+   hotel_info: Преобразование информации об отеле между форматами API, БД и сообщений
    logging: Модуль настройки loguru
+   log_analytics: Анализ логов бота (длительность команд и запросов, ошибки)
+   memory: Отчет о расходе памяти и трассировка выделений памяти
+   profiling: Профилирование обработчиков и запросов к API по требованию
    set_bot_commands: Создание меню команд бота
 """
 
-from . import calendar_style, city_translator, logging, set_bot_commands
-from .logging import logger
+from . import calendar_style, city_translator, hotel_info
@@ -0,0 +1,109 @@
+"""Модуль статистики запросов бота к Telegram Bot API.
+
+Для каждого метода Bot API (sendMessage, editMessageText, getUpdates и т.д.) накапливаются гистограмма
+длительности запросов и количество ошибок по их виду (код ответа HTTP или класс исключения requests).
+Статистика выводится администратору по команде /stats и в лог при остановке бота.
+
+Classes:
+    MethodStats: Статистика запросов одного метода Bot API
+
+Functions:
+    record: Добавляет запрос в статистику
+    snapshot: Возвращает копию статистики
+    reset: Очищает статистику
+    format_report: Форматирует статистику для вывода
+    log_summary: Выводит статистику в лог
+"""
+import copy
+import threading
+from typing import Dict, List, Optional
+
+from utils.histogram import LogHistogram
+from utils.logging import logger
+
+
+class MethodStats:
+    """Класс MethodStats, описывающий статистику запросов одного метода Bot API.
+
+    Attributes:
+        latency: Гистограмма длительности запросов, с
+        errors: Словарь {вид ошибки: количество}
+    """
+
+    def __init__(self) -> None:
+        """Создает пустую статистику."""
+        self.latency = LogHistogram()
+        self.errors: Dict[str, int] = dict()
+
+    @property
+    def error_count(self) -> int:
+        """Общее количество ошибок."""
+        return sum(self.errors.values())
+
+
+_stats: Dict[str, MethodStats] = dict()
+_lock = threading.Lock()
+
+
+def record(method: str, seconds: float, error: Optional[str] = None) -> None:
+    """Добавляет запрос в статистику.
+
+    :param method: Метод Bot API
+    :param seconds: Длительность запроса
+    :param error: Вид ошибки (None, если запрос выполнен успешно)
+    """
+    with _lock:
+        stats = _stats.get(method)
+        if stats is None:
+            stats = _stats[method] = MethodStats()
+        stats.latency.add(seconds)
+        if error is not None:
+            stats.errors[error] = stats.errors.get(error, 0) + 1
+
+
+def snapshot() -> Dict[str, MethodStats]:
+    """Возвращает копию статистики {метод: статистика}."""
+    with _lock:
+        return copy.deepcopy(_stats)
+
+
+def reset() -> None:
+    """Очищает статистику."""
+    with _lock:
+        _stats.clear()
+
+
+def format_report(stats: Optional[Dict[str, MethodStats]] = None, top: int = 10) -> List[str]:
+    """Форматирует статистику методов, отсортированных по суммарной длительности запросов.
+
+    getUpdates (long polling) ожидает новые сообщения и в сортировке не участвует - выводится последним.
+
+    :param stats: Статистика (по умолчанию текущая)
+    :param top: Количество выводимых методов
+    :return: Строки отчета
+    """
+    stats = snapshot() if stats is None else stats
+    methods = sorted(stats, key=lambda name: (name == "getUpdates", -stats[name].latency.total))[:top]
+    lines = list()
+    for name in methods:
+        method = stats[name]
+        line = (
+            f"{name}: {method.latency.count} запр., {method.latency.total:.1f} с, "
+            f"p50 {method.latency.percentile(50) * 1000:.0f} мс, p95 {method.latency.percentile(95) * 1000:.0f} мс"
+        )
+        if method.errors:
+            errors = ", ".join(f"{error} x{count}" for error, count in sorted(method.errors.items()))
+            line += f", ошибки: {errors}"
+        lines.append(line)
+    return lines
+
+
+def log_summary() -> None:
+    """Выводит статистику запросов к Bot API в лог."""
+    for name, method in snapshot().items():
+        logger.info(
+            f"Bot API {name}: {method.latency.count} requests, {method.latency.total:.3f} s, "
+            f"p50 {method.latency.percentile(50):.3f} s, p95 {method.latency.percentile(95):.3f} s, "
+            f"errors {method.error_count}",
+            user_id=0,
+        )
@@ -1,27 +1,99 @@
-"""Модуль изменяющий стиль календаря telegram_bot_calendar."""
-from telegram_bot_calendar import DetailedTelegramCalendar
-from telegram_bot_calendar.base import DAY
+"""Модуль изменяющий стиль календаря telegram_bot_calendar.
+
+Библиотека календаря импортируется при первом построении календаря, а не при запуске бота.
+Клавиатуры календаря (JSON) кэшируются с вытеснением давно не использованных, поэтому листание календаря
+не строит сетку заново, пока она есть в кэше.
+
+Functions:
+    is_calendar_callback: Проверяет, что callback запрос отправлен кнопкой календаря
+    get_calendar: Создает календарь в стиле бота
+    build_calendar: Строит начальную клавиатуру календаря
+    process_calendar: Обрабатывает нажатие кнопки календаря
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+from telebot.types import CallbackQuery
 
 LSTEP = {"y": "год", "m": "месяц", "d": "день"}
+CALENDAR_CACHE_SIZE = 1024
+# Префикс callback data календаря: CB_CALENDAR + "_" + calendar_id библиотеки telegram_bot_calendar
+CALENDAR_CALLBACK_PREFIX = "cbcal_0"
+
+
+def is_calendar_callback(call: CallbackQuery) -> bool:
+    """Проверяет, что callback запрос отправлен кнопкой календаря (аналог DetailedTelegramCalendar.func())."""
+    return call.data.startswith(CALENDAR_CALLBACK_PREFIX)
+
+
+@lru_cache(maxsize=None)
+def _calendar_class() -> type:
+    """Импортирует библиотеку календаря и создает класс календаря в стиле бота."""
+    from telegram_bot_calendar import DetailedTelegramCalendar
+    from telegram_bot_calendar.base import DAY
+
+    class MyStyleCalendar(DetailedTelegramCalendar):
+        """Класс MyStyleCalendar, изменяющий стиль календаря.
+
+        Attributes:
+            first_step: Изначальный вид календаря при его вызове (DAY - отображение дней)
+            prev_button: Надпись на кнопке 'назад'
+            next_button: Надпись на кнопке 'вперед'
+            empty_nav_button: Надпись на кнопке 'действие недоступно'
+            empty_month_button: Надпись на пустой кнопке месяца
+            empty_year_button: Надпись на пустой кнопке года
+            empty_day_button: Надпись на пустой кнопке дня
+        """
+
+        first_step = DAY
+        prev_button = "⬅️"
+        next_button = "➡️"
+        empty_nav_button = "🚫"
+        empty_month_button = ""
+        empty_year_button = ""
+        empty_day_button = "✖️"
 
+    return MyStyleCalendar
 
-class MyStyleCalendar(DetailedTelegramCalendar):
-    """Класс MyStyleCalendar, изменяющий стиль календаря.
 
-    Attributes:
-        first_step: Изначальный вид календаря при его вызове (DAY - отображение дней)
-        prev_button: Надпись на кнопке 'назад'
-        next_button: Надпись на кнопке 'вперед'
-        empty_nav_button: Надпись на кнопке 'действие недоступно'
-        empty_month_button: Надпись на пустой кнопке месяца
-        empty_year_button: Надпись на пустой кнопке года
-        empty_day_button: Надпись на пустой кнопке дня
+def get_calendar(**kwargs: Any) -> Any:
+    """Создает календарь в стиле бота.
+
+    :param kwargs: Параметры DetailedTelegramCalendar (locale, min_date, max_date, current_date)
+    :return: Экземпляр MyStyleCalendar
+    """
+    return _calendar_class()(**kwargs)
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def build_calendar(
+    current_date: date, min_date: date, max_date: Optional[date], locale: str = "ru"
+) -> Tuple[str, str]:
+    """Строит начальную клавиатуру календаря.
+
+    :param current_date: Дата, с месяца которой начинается календарь
+    :param min_date: Минимальная доступная дата
+    :param max_date: Максимальная доступная дата (None - без ограничения)
+    :param locale: Язык названий месяцев и дней недели
+    :return: Клавиатура в JSON и шаг календаря (y, m или d)
     """
+    return get_calendar(locale=locale, min_date=min_date, max_date=max_date, current_date=current_date).build()
 
-    first_step = DAY
-    prev_button = "⬅️"
-    next_button = "➡️"
-    empty_nav_button = "🚫"
-    empty_month_button = ""
-    empty_year_button = ""
-    empty_day_button = "✖️"
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def process_calendar(
+    call_data: str, min_date: date, max_date: Optional[date], locale: str = "ru"
+) -> Tuple[Optional[date], Optional[str], Optional[str]]:
+    """Обрабатывает нажатие кнопки календаря.
+
+    callback data календаря содержит действие, шаг и дату (кнопки календаря создаются без случайной соли),
+    поэтому результат определяется ключом (call_data, min_date, max_date, locale) и кэшируется.
+
+    :param call_data: callback data кнопки календаря
+    :param min_date: Минимальная доступная дата
+    :param max_date: Максимальная доступная дата (None - без ограничения)
+    :param locale: Язык названий месяцев и дней недели
+    :return: Выбранная дата (или None), клавиатура в JSON (или None) и шаг календаря
+    """
+    return get_calendar(locale=locale, min_date=min_date, max_date=max_date).process(call_data)
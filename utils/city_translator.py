@@ -1,10 +1,15 @@
-"""Модуль-переводчик ru-en."""
-import translators as ts
+"""Модуль-переводчик ru-en.
+
+Библиотека translators при импорте обращается к сети, поэтому она импортируется при первом переводе,
+а не при запуске бота.
+"""
 
 
 def translate(text: str) -> str:
     """Переводит текст на английский язык."""
     rus = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
     if text[0].lower() in rus:
+        import translators as ts
+
         return ts.translate_text(query_text=text, translator="google", to_language="en")
     return text
@@ -0,0 +1,91 @@
+"""Модуль гистограммы с логарифмическими корзинами для подсчета процентилей.
+
+Гистограмма занимает память, пропорциональную логарифму диапазона значений, а не их количеству,
+и объединяется с другой гистограммой сложением корзин. Поэтому процентили можно считать потоково
+и по частям (например, по файлам в разных процессах).
+
+Classes:
+    LogHistogram: Гистограмма с логарифмическими корзинами
+"""
+import math
+from typing import Dict, Iterable
+
+
+class LogHistogram:
+    """Класс LogHistogram, описывающий гистограмму положительных значений с логарифмическими корзинами.
+
+    Каждая корзина охватывает значения [2 ** (i / precision), 2 ** ((i + 1) / precision)),
+    поэтому относительная погрешность процентиля не превышает 2 ** (1 / precision) - 1 (около 4% при precision=16).
+
+    Attributes:
+        precision: Количество корзин на каждое удвоение значения
+        buckets: Словарь {номер корзины: количество значений}
+        zeros: Количество нулевых (и отрицательных) значений
+        count: Общее количество значений
+        total: Сумма значений
+        min: Минимальное значение
+        max: Максимальное значение
+    """
+
+    def __init__(self, precision: int = 16) -> None:
+        """Создает пустую гистограмму."""
+        self.precision = precision
+        self.buckets: Dict[int, int] = dict()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Добавляет значение value count раз."""
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += count
+            return
+        index = math.floor(math.log2(value) * self.precision)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Добавляет значения values."""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Добавляет значения другой гистограммы с той же точностью."""
+        if other.precision != self.precision:
+            raise ValueError(f"Histogram precision {other.precision} != {self.precision}")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        """Среднее значение (0, если значений нет)."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Вычисляет процентиль методом ближайшего ранга.
+
+        :param percent: Процентиль от 0 до 100
+        :return: Середина корзины, содержащей процентиль, в пределах [min, max] (0, если значений нет)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        if rank <= self.zeros:
+            return max(self.min, 0.0)
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                value = 2 ** ((index + 0.5) / self.precision)
+                return min(max(value, self.min), self.max)
+        return self.max
@@ -0,0 +1,69 @@
+"""Модуль преобразования информации об отеле между форматами API, БД и сообщений пользователю.
+
+Functions:
+    parse_price: Получает число из отформатированной строки с ценой
+    format_price: Форматирует цену для вывода пользователю
+    hotel_link: Формирует ссылку на отель в стиле Markdown
+    parse_hotel_link: Получает название и id отеля из ссылки в стиле Markdown
+"""
+import re
+from typing import Optional, Tuple
+
+CURRENCY_SIGNS = {"USD": "$", "EUR": "€", "GBP": "£"}
+HOTEL_URL = "https://www.hotels.com/h{property_id}.Hotel-Information"
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_HOTEL_LINK = re.compile(r"^\[(?P<name>.*)\]\(https://www\.hotels\.com/h(?P<property_id>\d+)\.Hotel-Information\)$")
+
+
+def parse_price(text: Optional[str]) -> Optional[float]:
+    """Получает число из отформатированной строки с ценой.
+
+    :param text: Строка вида "$1,234" или "$1,234 total"
+    :return: Цена или None, если строка не содержит числа
+    """
+    if not text:
+        return None
+    number = _NUMBER.search(text)
+    if number is None:
+        return None
+    return float(number.group().replace(",", ""))
+
+
+def format_price(price: Optional[float], currency: str = "USD") -> str:
+    """Форматирует цену для вывода пользователю.
+
+    :param price: Цена
+    :param currency: Код валюты
+    :return: Строка вида "$1,234"
+    """
+    if price is None:
+        return "-"
+    sign = CURRENCY_SIGNS.get(currency)
+    if sign:
+        return f"{sign}{price:,.0f}"
+    return f"{price:,.0f} {currency}"
+
+
+def hotel_link(name: str, property_id: Optional[str]) -> str:
+    """Формирует ссылку на страницу отеля на сайте Hotels.com в стиле Markdown.
+
+    :param name: Название отеля
+    :param property_id: id отеля. Если None - возвращается только название
+    :return: Ссылка на отель
+    """
+    if property_id is None:
+        return name
+    return f"[{name}]({HOTEL_URL.format(property_id=property_id)})"
+
+
+def parse_hotel_link(link: str) -> Tuple[str, Optional[str]]:
+    """Получает название и id отеля из ссылки в стиле Markdown.
+
+    :param link: Ссылка на отель, сформированная hotel_link
+    :return: Кортеж из названия и id отеля. Если строка не является ссылкой, id равен None
+    """
+    match = _HOTEL_LINK.match(link)
+    if match is None:
+        return link, None
+    return match.group("name"), match.group("property_id")
@@ -0,0 +1,396 @@
+"""Модуль анализа логов бота.
+
+Файлы logs/*.json (в том числе сжатые .json.gz) читаются построчно, поэтому объем памяти не зависит
+от их размера. События одного пользователя связываются в цепочки: команда -> поиск -> запросы к API и БД ->
+успешное завершение или ошибка. Для команд и endpoint API (и операций БД) выводятся процентили длительности,
+доля ошибок и самые активные пользователи. Файлы могут обрабатываться параллельно в нескольких процессах:
+каждый процесс возвращает статистику файла и события пользователей до их первой команды в файле,
+которые затем связываются с незавершенными командами предыдущего файла.
+
+Usage:
+    python -m utils.log_analytics [logs] [--jobs 4] [--since 2026-01-01] [--until "2026-01-02 12:00"] [--top 10]
+
+Classes:
+    CommandStats: Статистика команды
+    EndpointStats: Статистика endpoint API или операции БД
+    LogAnalyzer: Потоковый анализ событий логов
+
+Functions:
+    parse_line: Разбирает строку лога в событие
+    analyze_file: Анализирует один файл с логами
+    analyze: Анализирует файлы с логами, при необходимости параллельно
+    format_report: Формирует текстовый отчет
+"""
+import argparse
+import functools
+import gzip
+import json
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+from utils.histogram import LogHistogram
+
+Event = Tuple[float, int, str, str, Optional[float]]
+
+COMMAND, SEARCH, DONE, REQUEST, RETRY, DB, ERROR, OTHER = (
+    "command", "search", "done", "request", "retry", "db", "error", "other"
+)
+PERCENTILES = (50, 90, 95, 99)
+
+_DONE = re.compile(r"^Command /?(\w+) completed successfully$")
+_COMMAND = re.compile(r"^Command (/\w+)")
+_SEARCH = re.compile(r"^Search /?(\w+) started$")
+_REQUEST = re.compile(r"^(?:GET|POST) Request https?://[^/]+/(\S+) OK(?: in ([\d.]+) s)?$")
+_RETRY = re.compile(r"^Try \d+, delay [\d.]+ sec, \w+, https?://[^/]+/(\S+)$")
+_DB = re.compile(r"^(\w+) completed successfully(?: in ([\d.]+) s)?$")
+
+
+def parse_line(line: str) -> Optional[Event]:
+    """Разбирает строку лога в событие.
+
+    :param line: Строка файла с логами в формате utils.logging.serialize
+    :return: Событие (время, id пользователя, вид события, команда или endpoint, длительность)
+        или None, если строка не является сообщением лога (например, строка трассировки исключения)
+    """
+    if not line.startswith("{"):
+        return None
+    try:
+        record = json.loads(line)
+        timestamp, user_id, message, level = record["timestamp"], record["user_id"], record["message"], record["level"]
+    except (ValueError, KeyError):
+        return None
+    match = _DONE.match(message)
+    if match:
+        return timestamp, user_id, DONE, f"/{match.group(1)}", None
+    match = _COMMAND.match(message)
+    if match:
+        return timestamp, user_id, COMMAND, match.group(1), None
+    match = _SEARCH.match(message)
+    if match:
+        return timestamp, user_id, SEARCH, f"/{match.group(1)}", None
+    match = _REQUEST.match(message)
+    if match:
+        endpoint, duration = match.groups()
+        return timestamp, user_id, REQUEST, endpoint.split("?")[0], float(duration) if duration else None
+    match = _RETRY.match(message)
+    if match:
+        return timestamp, user_id, RETRY, match.group(1).split("?")[0], None
+    match = _DB.match(message)
+    if match:
+        operation, duration = match.groups()
+        return timestamp, user_id, DB, f"db:{operation}", float(duration) if duration else None
+    if level in ("ERROR", "CRITICAL"):
+        return timestamp, user_id, ERROR, message, None
+    return timestamp, user_id, OTHER, "", None
+
+
+class CommandStats:
+    """Класс CommandStats, описывающий статистику команды.
+
+    Attributes:
+        count: Количество вызовов команды
+        completed: Количество успешно завершенных команд
+        failed: Количество команд, завершенных ошибкой
+        unfinished: Количество команд, прерванных следующей командой пользователя
+        total: Длительность от команды до успешного завершения, с учетом времени ввода данных пользователем
+        search: Длительность от начала поиска (после ввода всех данных) до успешного завершения
+    """
+
+    def __init__(self) -> None:
+        """Создает пустую статистику."""
+        self.count = 0
+        self.completed = 0
+        self.failed = 0
+        self.unfinished = 0
+        self.total = LogHistogram()
+        self.search = LogHistogram()
+
+    def merge(self, other: "CommandStats") -> None:
+        """Добавляет статистику other."""
+        self.count += other.count
+        self.completed += other.completed
+        self.failed += other.failed
+        self.unfinished += other.unfinished
+        self.total.merge(other.total)
+        self.search.merge(other.search)
+
+
+class EndpointStats:
+    """Класс EndpointStats, описывающий статистику endpoint API или операции БД.
+
+    Attributes:
+        count: Количество успешных запросов
+        errors: Количество неудачных попыток запроса
+        latency: Длительность успешных запросов
+    """
+
+    def __init__(self) -> None:
+        """Создает пустую статистику."""
+        self.count = 0
+        self.errors = 0
+        self.latency = LogHistogram()
+
+    def merge(self, other: "EndpointStats") -> None:
+        """Добавляет статистику other."""
+        self.count += other.count
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+
+class _UserState:
+    """Состояние пользователя: время последнего события и незавершенная команда."""
+
+    __slots__ = ("last_ts", "command", "command_ts", "search_ts")
+
+    def __init__(self) -> None:
+        self.last_ts: Optional[float] = None
+        self.command: Optional[str] = None
+        self.command_ts: Optional[float] = None
+        self.search_ts: Optional[float] = None
+
+
+class LogAnalyzer:
+    """Класс LogAnalyzer, описывающий потоковый анализ событий логов.
+
+    Attributes:
+        buffering: Сохранять события пользователя до его первой команды в heads, а не обрабатывать их.
+            Используется при анализе одного файла из нескольких: такие события могут относиться
+            к команде из предыдущего файла
+        heads: Словарь {id пользователя: события до первой команды пользователя}
+        commands: Словарь {команда: статистика}
+        endpoints: Словарь {endpoint API или операция БД: статистика}
+        user_commands: Количество команд каждого пользователя
+        user_errors: Количество ошибок каждого пользователя
+        lines: Количество прочитанных строк
+        skipped: Количество строк, не являющихся сообщениями лога
+        first_ts: Время первого события
+        last_ts: Время последнего события
+    """
+
+    def __init__(self, buffering: bool = False) -> None:
+        """Создает пустой анализ."""
+        self.buffering = buffering
+        self.heads: Dict[int, List[Event]] = dict()
+        self.commands: Dict[str, CommandStats] = dict()
+        self.endpoints: Dict[str, EndpointStats] = dict()
+        self.user_commands: Counter = Counter()
+        self.user_errors: Counter = Counter()
+        self.lines = 0
+        self.skipped = 0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self._states: Dict[int, _UserState] = dict()
+
+    def _command(self, name: str) -> CommandStats:
+        """Возвращает статистику команды, создавая ее при первом обращении."""
+        return self.commands.setdefault(name, CommandStats())
+
+    def _endpoint(self, name: str) -> EndpointStats:
+        """Возвращает статистику endpoint, создавая ее при первом обращении."""
+        return self.endpoints.setdefault(name, EndpointStats())
+
+    def feed(self, event: Event) -> None:
+        """Обрабатывает событие (в порядке времени)."""
+        timestamp, user_id, kind, _, _ = event
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp
+        if self.buffering and kind != COMMAND and user_id not in self._states:
+            self.heads.setdefault(user_id, []).append(event)
+            return
+        self._process(event)
+
+    def _process(self, event: Event) -> None:
+        """Обновляет статистику и состояние пользователя по событию."""
+        timestamp, user_id, kind, key, duration = event
+        state = self._states.get(user_id)
+        if state is None:
+            state = self._states[user_id] = _UserState()
+        if kind == COMMAND:
+            if state.command is not None:
+                self._command(state.command).unfinished += 1
+            self._command(key).count += 1
+            self.user_commands[user_id] += 1
+            state.command, state.command_ts, state.search_ts = key, timestamp, None
+        elif kind == SEARCH:
+            state.search_ts = timestamp
+        elif kind == DONE:
+            stats = self._command(key)
+            stats.completed += 1
+            if state.command_ts is not None:
+                stats.total.add(timestamp - state.command_ts)
+            if state.search_ts is not None:
+                stats.search.add(timestamp - state.search_ts)
+            state.command, state.command_ts, state.search_ts = None, None, None
+        elif kind in (REQUEST, DB):
+            stats = self._endpoint(key)
+            stats.count += 1
+            if duration is None and kind == REQUEST and state.last_ts is not None:
+                duration = timestamp - state.last_ts
+            if duration is not None:
+                stats.latency.add(duration)
+        elif kind == RETRY:
+            self._endpoint(key).errors += 1
+            self.user_errors[user_id] += 1
+        elif kind == ERROR:
+            self.user_errors[user_id] += 1
+            if state.command is not None:
+                self._command(state.command).failed += 1
+                state.command, state.command_ts, state.search_ts = None, None, None
+        state.last_ts = timestamp
+
+    def merge(self, part: "LogAnalyzer") -> None:
+        """Добавляет анализ следующего по времени файла.
+
+        События пользователей до их первой команды в файле обрабатываются с учетом состояния после предыдущих
+        файлов, затем состояние пользователей заменяется состоянием на конец файла.
+        """
+        for events in part.heads.values():
+            for event in events:
+                self._process(event)
+        for user_id, state in part._states.items():
+            carried = self._states.get(user_id)
+            if carried is not None and carried.command is not None:
+                self._command(carried.command).unfinished += 1
+            self._states[user_id] = state
+        for name, command_stats in part.commands.items():
+            self._command(name).merge(command_stats)
+        for name, endpoint_stats in part.endpoints.items():
+            self._endpoint(name).merge(endpoint_stats)
+        self.user_commands.update(part.user_commands)
+        self.user_errors.update(part.user_errors)
+        self.lines += part.lines
+        self.skipped += part.skipped
+        if part.first_ts is not None:
+            self.first_ts = part.first_ts if self.first_ts is None else min(self.first_ts, part.first_ts)
+            self.last_ts = part.last_ts if self.last_ts is None else max(self.last_ts, part.last_ts)
+
+
+def _open_log(path: Path) -> IO[str]:
+    """Открывает файл с логами, в том числе сжатый gzip."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def analyze_file(path: Path, since: Optional[float] = None, until: Optional[float] = None) -> LogAnalyzer:
+    """Анализирует один файл с логами.
+
+    :param path: Путь к файлу
+    :param since: Учитывать события не раньше этого времени (timestamp)
+    :param until: Учитывать события раньше этого времени (timestamp)
+    :return: Анализ файла с событиями пользователей до их первой команды в heads
+    """
+    analyzer = LogAnalyzer(buffering=True)
+    with _open_log(path) as file:
+        for line in file:
+            analyzer.lines += 1
+            event = parse_line(line)
+            if event is None:
+                analyzer.skipped += 1
+            elif (since is None or event[0] >= since) and (until is None or event[0] < until):
+                analyzer.feed(event)
+    return analyzer
+
+
+def find_log_files(paths: Iterable[str]) -> List[Path]:
+    """Находит файлы с логами. Имена файлов содержат время создания, поэтому сортировка по имени хронологическая."""
+    files = list()
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(path.glob("logs_*.json"))
+            files.extend(path.glob("logs_*.json.gz"))
+        else:
+            files.append(path)
+    return sorted(files, key=lambda file: file.name)
+
+
+def analyze(
+    files: List[Path], jobs: int = 1, since: Optional[float] = None, until: Optional[float] = None
+) -> LogAnalyzer:
+    """Анализирует файлы с логами.
+
+    :param files: Файлы в хронологическом порядке
+    :param jobs: Количество процессов
+    :param since: Учитывать события не раньше этого времени (timestamp)
+    :param until: Учитывать события раньше этого времени (timestamp)
+    :return: Общий анализ
+    """
+    result = LogAnalyzer()
+    analyze_part = functools.partial(analyze_file, since=since, until=until)
+    if jobs > 1 and len(files) > 1:
+        from multiprocessing import Pool
+
+        with Pool(min(jobs, len(files))) as pool:
+            for part in pool.imap(analyze_part, files):
+                result.merge(part)
+    else:
+        for file in files:
+            result.merge(analyze_part(file))
+    return result
+
+
+def _percentiles(histogram: LogHistogram) -> str:
+    """Форматирует процентили и максимум гистограммы."""
+    values = [histogram.percentile(percent) for percent in PERCENTILES] + [histogram.max]
+    return " ".join(f"{value:>8.3f}" for value in values) if histogram.count else " ".join(["       -"] * 5)
+
+
+def format_report(analyzer: LogAnalyzer, top: int = 10) -> str:
+    """Формирует текстовый отчет.
+
+    :param analyzer: Анализ логов
+    :param top: Количество самых активных пользователей в отчете
+    :return: Текст отчета
+    """
+    percentiles = " ".join(f"{'p' + str(percent):>8}" for percent in PERCENTILES) + f"{'max':>9}"
+    period = " - ".join(
+        datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        for timestamp in (analyzer.first_ts, analyzer.last_ts)
+        if timestamp is not None
+    )
+    lines = [f"lines: {analyzer.lines}, skipped: {analyzer.skipped}, period: {period or '-'}", ""]
+    lines.append(f"{'command':<12} {'count':>6} {'done':>6} {'failed':>6} {'unfin.':>6} {'err%':>6}  {percentiles}")
+    for name, stats in sorted(analyzer.commands.items(), key=lambda item: -item[1].count):
+        error_rate = stats.failed / stats.count * 100 if stats.count else 0.0
+        row = f"{name:<12} {stats.count:>6} {stats.completed:>6} {stats.failed:>6} {stats.unfinished:>6}"
+        lines.append(f"{row} {error_rate:>6.1f}  {_percentiles(stats.total)}")
+        if stats.search.count:
+            lines.append(f"{'  search':<12} {stats.search.count:>6} {'':>6} {'':>6} {'':>6} {'':>6}  "
+                         f"{_percentiles(stats.search)}")
+    lines.extend(["", f"{'endpoint':<32} {'count':>6} {'errors':>6} {'err%':>6}  {percentiles}"])
+    for name, stats in sorted(analyzer.endpoints.items(), key=lambda item: -item[1].count):
+        attempts = stats.count + stats.errors
+        error_rate = stats.errors / attempts * 100 if attempts else 0.0
+        lines.append(
+            f"{name:<32} {stats.count:>6} {stats.errors:>6} {error_rate:>6.1f}  {_percentiles(stats.latency)}"
+        )
+    lines.extend(["", f"{'user_id':>12} {'commands':>9} {'errors':>7}"])
+    for user_id, commands in analyzer.user_commands.most_common(top):
+        lines.append(f"{user_id:>12} {commands:>9} {analyzer.user_errors[user_id]:>7}")
+    return "\n".join(lines)
+
+
+def _timestamp(value: str) -> float:
+    """Преобразует дату "YYYY-MM-DD" или "YYYY-MM-DD HH:MM" в timestamp."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main() -> None:
+    """Разбирает аргументы командной строки и выводит отчет."""
+    parser = argparse.ArgumentParser(description="Анализ логов бота: длительность команд и запросов, ошибки")
+    parser.add_argument("paths", nargs="*", default=["logs"], help="файлы или каталоги с логами (по умолчанию logs)")
+    parser.add_argument("--jobs", type=int, default=1, help="количество процессов")
+    parser.add_argument("--since", type=_timestamp, help="начало периода, например 2026-01-01 или '2026-01-01 12:00'")
+    parser.add_argument("--until", type=_timestamp, help="конец периода (не включая)")
+    parser.add_argument("--top", type=int, default=10, help="количество самых активных пользователей")
+    args = parser.parse_args()
+    result = analyze(find_log_files(args.paths), jobs=args.jobs, since=args.since, until=args.until)
+    print(format_report(result, top=args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,50 @@
-"""Модуль настройки loguru."""
+"""Модуль настройки loguru.
 
+Обработчик логера только помещает сообщение в очередь. Сериализация в JSON и запись в файл и stderr
+выполняются фоновым потоком, поэтому не задерживают поток, вызвавший логер. Файлы с логами ротируются,
+сжимаются и удаляются по истечении срока хранения. Доля сохраняемых сообщений уровня SUCCESS
+задается в настройках (LOG_SUCCESS_SAMPLE_RATE). Сообщения с keep=True (завершение команд и успешные запросы к API,
+по которым utils.log_analytics считает долю успешных команд и запросов) сохраняются всегда.
+
+Functions:
+    serialize: Сериализация сообщения loguru в JSON
+    setup_logging: Настройка обработчиков логера
+    complete: Ожидание записи сообщений из очереди
+"""
+import atexit
+import copy
 import json
+import queue
+import random
 import sys
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional, TextIO
 
 from loguru import logger
 
+from config_data import config
+
+STDERR_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> "
+    "| <yellow>User: {extra[user_id]}</yellow> | "
+    "<level>{message}</level>"
+)
+RECORD_FIELDS = (
+    "elapsed", "exception", "extra", "file", "function", "line", "module", "name", "process", "thread", "time"
+)
+SUCCESS_LEVEL_NO = logger.level("SUCCESS").no
+
+logger.remove()
+# Логер фонового потока: записывает сообщения из очереди в файл и stderr, сохраняя время и место их создания
+_writer_logger = copy.deepcopy(logger)
+_records: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+_writer_thread: Optional[threading.Thread] = None
+_current_record: Dict = dict()
+_write_lock = threading.Lock()
+_success_sample_rate = 1.0
+
 
 def serialize(record: Dict) -> str:
     """Сериализация сообщения loguru.
@@ -22,19 +61,103 @@ def serialize(record: Dict) -> str:
     return json.dumps(subset)
 
 
-def patching(record: Any) -> None:
-    """Изменение вывода сообщений loguru."""
-    record["extra"]["serialized"] = serialize(record)
+def _restore_record(record: Dict) -> None:
+    """Заменяет поля сообщения логера фонового потока полями исходного сообщения и сериализует его."""
+    record.update({field: _current_record[field] for field in RECORD_FIELDS})
+    record["extra"] = dict(record["extra"], serialized=serialize(_current_record))
 
 
-logger.remove(0)
-logger = logger.patch(patching)
-logger.add("logs/logs_{time}.json", format="{extra[serialized]}", rotation="1 hour")
-logger.add(
-    sys.stderr,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-    "<level>{level: <8}</level> | "
-    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> "
-    "| <yellow>User: {extra[user_id]}</yellow> | "
-    "<level>{message}</level>",
-)
+_restoring_logger = _writer_logger.patch(_restore_record)
+
+
+def _write(record: Dict) -> None:
+    """Записывает сообщение в файл и stderr."""
+    global _current_record
+    with _write_lock:
+        _current_record = record
+        _restoring_logger.log(record["level"].name, record["message"])
+
+
+def _writer_loop() -> None:
+    """Записывает сообщения из очереди до получения None. threading.Event в очереди отмечается как обработанное."""
+    while True:
+        item = _records.get()
+        if item is None:
+            return
+        if isinstance(item, threading.Event):
+            item.set()
+            continue
+        try:
+            _write(item)
+        except Exception as exc:
+            print(f"Logging error: {exc!r}", file=sys.stderr)
+
+
+def _enqueue(message: Any) -> None:
+    """Помещает сообщение в очередь фонового потока."""
+    _records.put(message.record)
+
+
+def _write_message(message: Any) -> None:
+    """Записывает сообщение в вызывающем потоке."""
+    _write(message.record)
+
+
+def _sample(record: Dict) -> bool:
+    """Пропускает часть сообщений уровня SUCCESS, кроме сообщений с keep=True."""
+    if record["level"].no != SUCCESS_LEVEL_NO or _success_sample_rate >= 1 or record["extra"].get("keep"):
+        return True
+    return random.random() < _success_sample_rate
+
+
+def complete() -> None:
+    """Ожидает записи сообщений, уже находящихся в очереди."""
+    if _writer_thread is not None and _writer_thread.is_alive():
+        written = threading.Event()
+        _records.put(written)
+        written.wait()
+
+
+def setup_logging(
+    log_dir: str = "logs",
+    enqueue: bool = True,
+    success_sample_rate: float = config.LOG_SUCCESS_SAMPLE_RATE,
+    stderr: TextIO = sys.stderr,
+) -> None:
+    """Настраивает обработчики логера, заменяя ранее добавленные.
+
+    :param log_dir: Каталог файлов с логами
+    :param enqueue: Записывать сообщения в фоновом потоке
+    :param success_sample_rate: Доля сохраняемых сообщений уровня SUCCESS без keep=True (от 0 до 1)
+    :param stderr: Поток для вывода сообщений в консоль
+    """
+    global _success_sample_rate, _writer_thread
+    logger.remove()
+    complete()
+    _writer_logger.remove()
+    _success_sample_rate = success_sample_rate
+    _writer_logger.add(
+        f"{log_dir}/logs_{{time}}.json",
+        format="{extra[serialized]}",
+        rotation=config.LOG_ROTATION,
+        retention=config.LOG_RETENTION,
+        compression=config.LOG_COMPRESSION or None,
+    )
+    _writer_logger.add(stderr, format=STDERR_FORMAT)
+    if enqueue and (_writer_thread is None or not _writer_thread.is_alive()):
+        _writer_thread = threading.Thread(target=_writer_loop, name="log_writer", daemon=True)
+        _writer_thread.start()
+    logger.add(_enqueue if enqueue else _write_message, format="{message}", filter=_sample)
+
+
+def _shutdown() -> None:
+    """Дожидается записи сообщений из очереди и закрывает файл с логами."""
+    logger.remove()
+    if _writer_thread is not None and _writer_thread.is_alive():
+        _records.put(None)
+        _writer_thread.join()
+    _writer_logger.remove()
+
+
+setup_logging()
+atexit.register(_shutdown)
@@ -0,0 +1,236 @@
+"""Модуль отчета о расходе памяти бота.
+
+Структуры, которые растут во время работы бота (пользователи Users.all_users, хранилище состояний,
+кэш ответов API, игровые сессии), регистрируют датчики функцией register_gauge: датчик возвращает
+количество записей и (необязательно) объем памяти структуры, посчитанный функцией deep_size.
+По команде администратора /memory трассировка выделений памяти (tracemalloc) включается и выключается,
+а отчет содержит RSS процесса, показания датчиков и строки кода, выделивших больше всего памяти
+со времени предыдущего отчета. Фоновый поток раз в MEMORY_LOG_INTERVAL минут выводит показания в лог;
+если RSS вырос с запуска бота больше чем на MEMORY_WARN_GROWTH МБ, сообщение выводится с уровнем WARNING.
+
+Classes:
+    MemoryMonitor: Периодический вывод расхода памяти в лог и сравнение снимков tracemalloc
+
+Functions:
+    register_gauge: Регистрирует датчик структуры
+    deep_size: Считает объем памяти объекта вместе с вложенными объектами
+    rss_bytes: Возвращает RSS процесса
+    read_gauges: Возвращает показания датчиков
+"""
+import resource
+import sys
+import threading
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_data.config import (MEMORY_LOG_INTERVAL, MEMORY_TRACE_FRAMES,
+                                MEMORY_WARN_GROWTH)
+from utils.logging import logger
+
+MB = 1024 * 1024
+Gauge = Callable[[], Tuple[int, Optional[int]]]
+_SKIPPED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+_gauges: Dict[str, Gauge] = dict()
+
+
+def register_gauge(name: str, gauge: Gauge) -> None:
+    """Регистрирует датчик структуры, заменяя датчик с тем же именем.
+
+    :param name: Название структуры в отчете
+    :param gauge: Функция, возвращающая количество записей и объем памяти в байтах (None, если не считается)
+    """
+    _gauges[name] = gauge
+
+
+def deep_size(obj: Any) -> int:
+    """Считает объем памяти объекта вместе с элементами контейнеров и атрибутами объектов.
+
+    Объекты, на которые есть несколько ссылок, учитываются один раз; классы, модули и функции не учитываются.
+    Контейнеры копируются перед обходом, поэтому их изменение другими потоками не прерывает подсчет.
+
+    :param obj: Объект
+    :return: Объем памяти, байт
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIPPED_TYPES):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            for key, value in list(item.items()):
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(list(item))
+        if hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return size
+
+
+def rss_bytes() -> int:
+    """Возвращает RSS процесса (на Linux - текущий, на других системах - максимальный), байт."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def read_gauges() -> Dict[str, Tuple[int, Optional[int]]]:
+    """Возвращает показания датчиков {название структуры: (количество записей, объем памяти)}.
+
+    Ошибка датчика выводится в лог, датчик пропускается.
+    """
+    readings = dict()
+    for name, gauge in list(_gauges.items()):
+        try:
+            readings[name] = gauge()
+        except Exception as exc:
+            logger.error(f"Memory gauge {name} failed: {exc!r}", user_id=0)
+    return readings
+
+
+class MemoryMonitor:
+    """Класс MemoryMonitor, описывающий периодический вывод расхода памяти в лог и сравнение снимков tracemalloc.
+
+    Attributes:
+        interval: Период вывода в лог, мин (0 - не выводить)
+        warn_growth: Рост RSS с запуска, после которого сообщение выводится с уровнем WARNING, МБ
+        start_rss: RSS при создании, байт
+    """
+
+    def __init__(self, interval: float, warn_growth: float) -> None:
+        """Создает монитор и запоминает текущий RSS."""
+        self.interval = interval
+        self.warn_growth = warn_growth
+        self.start_rss = rss_bytes()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def is_tracing() -> bool:
+        """Проверяет, включена ли трассировка выделений памяти."""
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames: int = 1) -> None:
+        """Включает трассировку выделений памяти и делает первый снимок.
+
+        :param frames: Количество сохраняемых кадров стека для каждого выделения
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                logger.info(f"Memory tracing started, {frames} frames", user_id=0)
+            self._snapshot = self._take_snapshot()
+
+    def stop_tracing(self) -> None:
+        """Выключает трассировку выделений памяти и удаляет снимок."""
+        with self._lock:
+            tracemalloc.stop()
+            self._snapshot = None
+        logger.info("Memory tracing stopped", user_id=0)
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Делает снимок tracemalloc без выделений памяти tracemalloc, этого модуля и импорта модулей."""
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+
+    def top_growth(self, top: int = 10) -> List[str]:
+        """Сравнивает новый снимок tracemalloc с предыдущим и запоминает новый.
+
+        :param top: Количество строк кода
+        :return: Строки кода с наибольшим ростом выделенной памяти (пустой список, если трассировка выключена)
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return list()
+            snapshot = self._take_snapshot()
+            previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return list()
+        lines = list()
+        for stat in snapshot.compare_to(previous, "lineno")[:top]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{frame.filename}:{frame.lineno}: {stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks), "
+                f"{stat.size / 1024:.1f} KiB"
+            )
+        return lines
+
+    def summary(self) -> Tuple[int, Dict[str, Tuple[int, Optional[int]]]]:
+        """Возвращает RSS процесса и показания датчиков."""
+        return rss_bytes(), read_gauges()
+
+    def format_report(self, top: int = 10) -> List[str]:
+        """Форматирует отчет: RSS, показания датчиков и рост памяти по строкам кода (если трассировка включена).
+
+        :param top: Количество строк кода
+        :return: Строки отчета
+        """
+        rss, gauges = self.summary()
+        text = [f"RSS: {rss / MB:.1f} МБ ({(rss - self.start_rss) / MB:+.1f} МБ с запуска)"]
+        for name, (count, size) in gauges.items():
+            text.append(f"{name}: {count}" + (f", {size / MB:.2f} МБ" if size is not None else ""))
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            text.append(f"\ntracemalloc: {traced / MB:.1f} МБ (пик {peak / MB:.1f} МБ), рост с предыдущего отчета:")
+            text.extend(self.top_growth(top) or ["первый снимок"])
+        return text
+
+    def log_summary(self) -> None:
+        """Выводит RSS и показания датчиков в лог (WARNING, если рост RSS превысил warn_growth)."""
+        rss, gauges = self.summary()
+        growth = (rss - self.start_rss) / MB
+        readings = ", ".join(
+            f"{name} {count}" + (f" ({size / MB:.2f} MB)" if size is not None else "")
+            for name, (count, size) in gauges.items()
+        )
+        message = f"Memory: RSS {rss / MB:.1f} MB ({growth:+.1f} MB since start), {readings}"
+        if self.warn_growth and growth > self.warn_growth:
+            logger.warning(message, user_id=0)
+        else:
+            logger.info(message, user_id=0)
+        for line in self.top_growth(5):
+            logger.info(f"Memory growth {line}", user_id=0)
+
+    def _loop(self) -> None:
+        """Выводит расход памяти в лог раз в interval минут до остановки монитора."""
+        while not self._stop.wait(self.interval * 60):
+            try:
+                self.log_summary()
+            except Exception as exc:
+                logger.error(f"Memory summary failed: {exc!r}", user_id=0)
+
+    def start(self) -> None:
+        """Запускает периодический вывод в лог (если interval > 0) и трассировку (если задано MEMORY_TRACE_FRAMES)."""
+        if MEMORY_TRACE_FRAMES:
+            self.start_tracing(MEMORY_TRACE_FRAMES)
+        if self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="memory_monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает периодический вывод в лог."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+memory_monitor = MemoryMonitor(MEMORY_LOG_INTERVAL, MEMORY_WARN_GROWTH)
@@ -0,0 +1,208 @@
+"""Модуль профилирования обработчиков бота и запросов к API по требованию.
+
+Профилирование включается переменной окружения PROFILE_MODE или командой администратора /profile
+и применяется к функциям, отмеченным декоратором profiled. Режимы:
+    cprofile: каждый вызов выполняется под cProfile, статистика накапливается по функциям
+        и сохраняется в файлы .pstats (python -m pstats, snakeviz);
+    sample: фоновый поток раз в PROFILE_INTERVAL секунд снимает стеки потоков, выполняющих отмеченные функции,
+        и накапливает их в формате collapsed stacks (flamegraph.pl, speedscope).
+Пока профилирование выключено, декоратор добавляет к вызову только проверку режима.
+Вложенный отмеченный вызов (api_request внутри get_search_results) профилируется в составе внешнего:
+в потоке одновременно может работать только один профилировщик.
+
+Classes:
+    Profiler: Профилировщик отмеченных функций
+
+Functions:
+    profiled: Декоратор функции, профилируемой по требованию
+"""
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_data.config import PROFILE_DIR, PROFILE_INTERVAL
+from utils.logging import logger
+
+MODES = ("cprofile", "sample")
+
+
+def _frame_name(frame: FrameType) -> str:
+    """Возвращает имя функции кадра стека с модулем для collapsed stacks (co_qualname есть с Python 3.11)."""
+    code = frame.f_code
+    return f'{frame.f_globals.get("__name__", "?")}.{getattr(code, "co_qualname", code.co_name)}'
+
+
+class Profiler:
+    """Класс Profiler, описывающий профилировщик функций, отмеченных декоратором profiled.
+
+    Attributes:
+        mode: Режим профилирования (None - выключено)
+        interval: Период снятия стеков в режиме sample, с
+        out_dir: Каталог файлов с результатами
+        started: Время включения профилирования (timestamp)
+        calls: Количество и суммарная длительность профилированных вызовов по функциям
+    """
+
+    def __init__(self, interval: float, out_dir: str) -> None:
+        """Создает выключенный профилировщик."""
+        self.mode: Optional[str] = None
+        self.interval = interval
+        self.out_dir = out_dir
+        self.started: Optional[float] = None
+        self.calls: Dict[str, Tuple[int, float]] = dict()
+        self._stats: Dict[str, pstats.Stats] = dict()
+        self._stacks: Dict[str, Dict[str, int]] = dict()
+        self._active: Dict[int, Tuple[str, FrameType]] = dict()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self, mode: str) -> None:
+        """Включает профилирование в режиме mode, удаляя накопленные результаты.
+
+        :param mode: Режим профилирования (cprofile или sample)
+        :except ValueError: Неизвестный режим
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {', '.join(MODES)}")
+        self.stop()
+        with self._lock:
+            self.calls.clear()
+            self._stats.clear()
+            self._stacks.clear()
+        self.started = time.time()
+        self.mode = mode
+        if mode == "sample":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._sampler.start()
+        logger.info(f"Profiling started in {mode} mode", user_id=0)
+
+    def stop(self) -> None:
+        """Выключает профилирование. Накопленные результаты сохраняются до следующего включения."""
+        if self.mode is None:
+            return
+        self.mode = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        logger.info("Profiling stopped", user_id=0)
+
+    def run(self, name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Выполняет и профилирует вызов функции, если в потоке не выполняется другой профилируемый вызов.
+
+        :param name: Имя функции в результатах
+        :param func: Функция
+        :return: Результат функции
+        """
+        mode = self.mode
+        if mode is None or getattr(self._local, "active", False):
+            return func(*args, **kwargs)
+        self._local.active = True
+        profile = cProfile.Profile() if mode == "cprofile" else None
+        ident = threading.get_ident()
+        if profile is None:
+            with self._lock:
+                self._active[ident] = (name, sys._getframe())
+        started = time.perf_counter()
+        try:
+            if profile is None:
+                return func(*args, **kwargs)
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            self._local.active = False
+            with self._lock:
+                self._active.pop(ident, None)
+                count, total = self.calls.get(name, (0, 0.0))
+                self.calls[name] = (count + 1, total + seconds)
+                if profile is not None:
+                    if name in self._stats:
+                        self._stats[name].add(profile)
+                    else:
+                        self._stats[name] = pstats.Stats(profile)
+
+    def _sample_loop(self) -> None:
+        """Снимает стеки потоков, выполняющих профилируемые вызовы, до выключения профилирования."""
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, (name, root) in self._active.items():
+                    frame: Optional[FrameType] = frames.get(ident)
+                    stack = list()
+                    while frame is not None and frame is not root:
+                        if frame.f_globals.get("__name__") != __name__:
+                            stack.append(_frame_name(frame))
+                        frame = frame.f_back
+                    stack.append(name)
+                    collapsed = ";".join(reversed(stack))
+                    samples = self._stacks.setdefault(name, dict())
+                    samples[collapsed] = samples.get(collapsed, 0) + 1
+
+    def hot_spots(self, top: int = 10) -> List[Tuple[str, float]]:
+        """Возвращает функции с наибольшим собственным временем (без вызванных ими функций).
+
+        :param top: Количество функций
+        :return: Список кортежей (функция, доля собственного времени от всех профилированных вызовов)
+        """
+        own: Dict[str, float] = dict()
+        with self._lock:
+            for stats in self._stats.values():
+                for (filename, line, function), (_, _, own_time, _, _) in stats.stats.items():
+                    key = f"{os.path.basename(filename)}:{line}({function})"
+                    own[key] = own.get(key, 0.0) + own_time
+            for samples in self._stacks.values():
+                for collapsed, count in samples.items():
+                    leaf = collapsed.rsplit(";", 1)[-1]
+                    own[leaf] = own.get(leaf, 0.0) + count
+        total = sum(own.values()) or 1.0
+        return [(key, value / total) for key, value in sorted(own.items(), key=lambda item: -item[1])[:top]]
+
+    def dump(self) -> List[Path]:
+        """Сохраняет накопленные результаты в файлы: <функция>.pstats и <функция>.collapsed.
+
+        :return: Пути к сохраненным файлам
+        """
+        with self._lock:
+            if not self._stats and not self._stacks:
+                return list()
+            out_dir = Path(self.out_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            prefix = f"profile_{datetime.fromtimestamp(self.started or time.time()):%Y%m%d_%H%M%S}_"
+            paths = list()
+            for name, stats in self._stats.items():
+                path = out_dir / f"{prefix}{name}.pstats"
+                stats.dump_stats(path)
+                paths.append(path)
+            for name, samples in self._stacks.items():
+                path = out_dir / f"{prefix}{name}.collapsed"
+                path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.items()))
+                paths.append(path)
+        logger.info(f"Profiling results saved: {', '.join(map(str, paths))}", user_id=0)
+        return paths
+
+
+profiler = Profiler(PROFILE_INTERVAL, PROFILE_DIR)
+
+
+def profiled(func: Callable) -> Callable:
+    """Декоратор функции, профилируемой, пока включено профилирование."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapped_func(*args: Any, **kwargs: Any) -> Any:
+        if profiler.mode is None:
+            return func(*args, **kwargs)
+        return profiler.run(name, func, *args, **kwargs)
+
+    return wrapped_func